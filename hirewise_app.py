@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import os
 from datetime import datetime
 import uuid
-import requests
+from hirewise_store import store, normalize_email
+from hirewise_services import services
+from hirewise_geocode import reverse_geocode_address, ip_location
+from hirewise_tasks import BackgroundTasks
 import webbrowser
 import smtplib
 from email.mime.text import MIMEText
@@ -23,6 +25,12 @@ try:
 except ImportError:
     HireWiseGPS = None
 
+# Placeholder location until background detection finishes
+LOCATING = "Locating..."
+# Detection methods whose coordinates come from a real lookup; the others
+# (the simulated fallback, errors) must not be saved as the user's position
+MEASURED_LOCATION_METHODS = ("Reverse Geocoding",)
+
 class HireWiseApp:
     
     def refresh_professionals_list(self, tree, service_filter, location_filter, rating_filter, price_filter):
@@ -30,33 +38,11 @@ class HireWiseApp:
         for item in tree.get_children():
             tree.delete(item)
         
-        # Load professionals
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        # Load professionals matching the filters
+        matches = self.services.professionals.filter_professionals(
+            service_filter, location_filter, rating_filter, price_filter)
         
-        # Apply filters
-        for pro_id, pro in professionals.items():
-            # Service filter
-            if service_filter != "All" and pro['service'] != service_filter:
-                continue
-            
-            # Location filter
-            if location_filter != "All" and pro['location'] != location_filter:
-                continue
-            
-            # Rating filter
-            if rating_filter != "All":
-                min_rating = float(rating_filter.replace("+", ""))
-                if pro['rating'] < min_rating:
-                    continue
-            
-            # Price filter
-            if price_filter != "All":
-                if price_filter == "300+" and not pro['price'].startswith("300") and not pro['price'].startswith("500"):
-                    continue
-                elif price_filter != "300+" and pro['price'] != price_filter:
-                    continue
-            
+        for pro_id, pro in matches:
             badge = " ✓" if pro.get('certified', False) else ""
             tree.insert('', 'end', text=pro['name'] + badge,
                        values=(pro['service'], f"{pro['rating']}⭐", pro['price'], pro['location']))
@@ -71,13 +57,10 @@ class HireWiseApp:
         
         ttk.Label(frame, text="Messages", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load messages
-        with open(self.messages_file, 'r') as f:
-            messages = json.load(f)
-        
-        # Filter user's messages
-        user_messages = {k: v for k, v in messages.items() 
-                        if v.get('sender') == self.current_user['email'] or v.get('receiver') == self.current_user['email']}
+        # Load user's messages
+        user_messages = {**self.store.find('messages', sender=self.current_user['email']),
+                         **self.store.find('messages', receiver=self.current_user['email'])}
+        user_messages = dict(sorted(user_messages.items(), key=lambda item: item[1].get('created', '')))
         
         if not user_messages:
             ttk.Label(frame, text="No messages yet").pack(pady=20)
@@ -112,16 +95,13 @@ class HireWiseApp:
                 return
             
             msg_id = str(uuid.uuid4())[:8]
-            messages[msg_id] = {
+            self.store.put('messages', msg_id, {
                 "id": msg_id,
                 "sender": self.current_user['email'],
                 "receiver": to_entry.get().strip(),
                 "content": msg_text.get("1.0", tk.END).strip(),
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.messages_file, 'w') as f:
-                json.dump(messages, f)
+            })
             
             messagebox.showinfo("Success", "Message sent!")
             msg_window.destroy()
@@ -165,11 +145,8 @@ class HireWiseApp:
             messagebox.showinfo("M-Pesa", f"STK push sent to {phone_entry.get()}\nEnter PIN to complete payment")
             
             # Save payment record
-            with open(self.payments_file, 'r') as f:
-                payments = json.load(f)
-            
             pay_id = str(uuid.uuid4())[:8]
-            payments[pay_id] = {
+            self.store.put('payments', pay_id, {
                 "id": pay_id,
                 "user": self.current_user['email'],
                 "type": "Top Up",
@@ -177,10 +154,7 @@ class HireWiseApp:
                 "method": "M-Pesa",
                 "status": "Completed",
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.payments_file, 'w') as f:
-                json.dump(payments, f)
+            })
         
         ttk.Button(mpesa_frame, text="Pay via M-Pesa", command=initiate_mpesa).pack(pady=5)
     
@@ -195,8 +169,7 @@ class HireWiseApp:
         ttk.Label(frame, text="Professional Management", font=('Arial', 16, 'bold')).pack(pady=10)
         
         # Load professionals
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        professionals = self.store.load('professionals')
         
         # Create treeview
         tree = ttk.Treeview(frame, columns=('Service', 'Rating', 'Certified', 'Status'), show='tree headings')
@@ -283,32 +256,11 @@ class HireWiseApp:
                 messagebox.showerror("Error", "Please select a rating")
                 return
             
-            # Load existing reviews
-            try:
-                with open(self.reviews_file, 'r') as f:
-                    reviews = json.load(f)
-            except:
-                reviews = {}
-            
-            # Save mutual feedback
-            review_id = str(uuid.uuid4())[:8]
-            reviews[review_id] = {
-                "id": review_id,
-                "job_id": job_id,
-                "reviewer": self.current_user['email'],
-                "reviewed": other_party_email,
-                "reviewer_type": "professional" if is_professional else "client",
-                "rating": float(rating_var.get()),
-                "review": review_text.get("1.0", tk.END).strip(),
-                "ai_suggested_rating": suggested_rating,
-                "created": datetime.now().isoformat()
-            }
-            
-            with open(self.reviews_file, 'w') as f:
-                json.dump(reviews, f)
-            
-            # Update user/professional rating
-            self.update_average_rating(other_party_email, float(rating_var.get()), is_professional)
+            # Save mutual feedback and update the other party's rating
+            self.services.ratings.submit_review(job_id, self.current_user['email'], other_party_email,
+                                                float(rating_var.get()),
+                                                review_text.get("1.0", tk.END).strip(),
+                                                is_professional, suggested_rating)
             
             messagebox.showinfo("Success", "Feedback submitted successfully!")
             feedback_window.destroy()
@@ -316,28 +268,7 @@ class HireWiseApp:
         ttk.Button(frame, text="Submit Feedback", command=submit_feedback).pack(pady=20)
     
     def update_average_rating(self, email, new_rating, is_professional_being_rated):
-        file_path = self.professionals_file if is_professional_being_rated else self.users_file
-        
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find user and update rating
-        for user_id, user in data.items():
-            if user['email'] == email:
-                current_rating = user.get('rating', 0)
-                rating_count = user.get('rating_count', 0)
-                
-                # Calculate new average
-                total_rating = (current_rating * rating_count) + new_rating
-                new_count = rating_count + 1
-                new_average = round(total_rating / new_count, 1)
-                
-                user['rating'] = new_average
-                user['rating_count'] = new_count
-                break
-        
-        with open(file_path, 'w') as f:
-            json.dump(data, f)
+        self.services.ratings.update_average_rating(email, new_rating, is_professional_being_rated)
     
     def show_job_completion(self, job_id):
         completion_window = tk.Toplevel(self.root)
@@ -350,10 +281,7 @@ class HireWiseApp:
         ttk.Label(frame, text="Job Completed!", font=('Arial', 16, 'bold')).pack(pady=20)
         
         # Load job details
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        
-        job = jobs.get(job_id, {})
+        job = self.store.get('jobs', job_id, {})
         client_email = job.get('client_email', '')
         professional_email = job.get('assigned_to', '')
         
@@ -379,12 +307,9 @@ class HireWiseApp:
         ttk.Label(frame, text="System Analytics", font=('Arial', 16, 'bold')).pack(pady=10)
         
         # Load data for analytics
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        users = self.store.load('users')
+        jobs = self.store.load('jobs')
+        professionals = self.store.load('professionals')
         
         # Statistics
         stats_frame = ttk.LabelFrame(frame, text="Platform Statistics", padding="20")
@@ -393,7 +318,7 @@ class HireWiseApp:
         total_users = len(users)
         total_jobs = len(jobs)
         total_pros = len(professionals)
-        active_jobs = len([j for j in jobs.values() if j['status'] == 'Open'])
+        active_jobs = len(self.store.find('jobs', status='Open'))
         
         ttk.Label(stats_frame, text=f"Total Users: {total_users}", font=('Arial', 12)).pack(anchor='w')
         ttk.Label(stats_frame, text=f"Total Jobs Posted: {total_jobs}", font=('Arial', 12)).pack(anchor='w')
@@ -511,64 +436,10 @@ class HireWiseApp:
     def create_static_share_file(self):
         """Create static HTML file as fallback"""
         try:
-            html_content = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>HireWise - Professional Service Platform</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f8f9fa; }
-        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; }
-        .hero { background: linear-gradient(135deg, #3498db, #2c3e50); color: white; padding: 40px; text-align: center; border-radius: 10px; }
-        .stats { display: flex; justify-content: space-around; margin: 30px 0; text-align: center; flex-wrap: wrap; }
-        .stat { background: #3498db; color: white; padding: 20px; border-radius: 8px; margin: 10px; }
-        .features { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 30px 0; }
-        .feature { background: #f8f9fa; padding: 20px; border-radius: 8px; border-left: 4px solid #3498db; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="hero">
-            <h1>🔧 HireWise Platform</h1>
-            <p>Professional Service Marketplace - Connect, Hire, Get Work Done</p>
-        </div>
-        
-        <div class="stats">
-            <div class="stat"><h3>500+</h3><p>Professionals</p></div>
-            <div class="stat"><h3>1,200+</h3><p>Jobs Completed</p></div>
-            <div class="stat"><h3>4.8⭐</h3><p>Average Rating</p></div>
-            <div class="stat"><h3>24/7</h3><p>Support</p></div>
-        </div>
-        
-        <div class="features">
-            <div class="feature">
-                <h3>🔍 Smart Matching</h3>
-                <p>AI-powered system connects clients with the best professionals.</p>
-            </div>
-            <div class="feature">
-                <h3>📍 GPS Location</h3>
-                <p>Real-time location tracking with building-level precision.</p>
-            </div>
-            <div class="feature">
-                <h3>💳 Secure Payments</h3>
-                <p>Integrated M-Pesa payments with wallet functionality.</p>
-            </div>
-            <div class="feature">
-                <h3>⭐ Mutual Ratings</h3>
-                <p>AI-assisted feedback system for quality assurance.</p>
-            </div>
-        </div>
-        
-        <div style="text-align: center; margin-top: 40px; color: #7f8c8d;">
-            <p>📞 Contact: 0727335236 | 📧 hirewise0@gmail.com</p>
-            <p>🏢 Office: Pharmaceutical building, Mtongwe road</p>
-        </div>
-    </div>
-</body>
-</html>
-            '''
-            
-            with open('hirewise_demo.html', 'w') as f:
+            from hirewise_assets import render
+            html_content = render('share_static.html')
+
+            with open('hirewise_demo.html', 'w', encoding='utf-8') as f:
                 f.write(html_content)
             
             # Show static file dialog
@@ -685,30 +556,23 @@ class HireWiseApp:
         
         ttk.Label(frame, text="📍 Jobs Near You", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Current location
-        if self.gps:
-            current_area, coords = self.gps.get_current_location()
-            ttk.Label(frame, text=f"Your Location: {current_area}", font=('Arial', 12)).pack()
+        # Current location: the coordinates resolved at login, else the GPS position
+        if self.current_user.get('lat') is not None and self.current_user.get('lng') is not None:
+            lat, lng = self.current_user['lat'], self.current_user['lng']
+            current_area = self.current_user.get('location', 'Unknown')
+        elif self.gps:
+            lat, lng = self.gps.current_location['lat'], self.gps.current_location['lng']
+            current_area = f"{lat:.4f}, {lng:.4f}"
         else:
-            ttk.Label(frame, text="GPS not available", font=('Arial', 12)).pack()
-        
-        # Load jobs
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        
-        # Filter open jobs and add distance
-        open_jobs = []
-        for job_id, job in jobs.items():
-            if job['status'] == 'Open':
-                # Simulate distance calculation
-                import random
-                distance = round(random.uniform(0.5, 15.0), 1)
-                job['distance'] = distance
-                job['id'] = job_id
-                open_jobs.append(job)
+            lat = lng = None
         
-        # Sort by distance
-        open_jobs.sort(key=lambda x: x['distance'])
+        if lat is None:
+            ttk.Label(frame, text="GPS not available", font=('Arial', 12)).pack()
+            open_jobs = []
+        else:
+            ttk.Label(frame, text=f"Your Location: {current_area}", font=('Arial', 12)).pack()
+            # Nearest open jobs from the spatial index
+            open_jobs = self.services.jobs.nearest_open_jobs(lat, lng)
         
         # Create treeview
         tree = ttk.Treeview(frame, columns=('Service', 'Distance', 'Budget', 'Timing'), show='tree headings')
@@ -722,7 +586,7 @@ class HireWiseApp:
             desc = job['description'][:30] + "..." if len(job['description']) > 30 else job['description']
             distance_color = "🟢" if job['distance'] < 5 else "🟡" if job['distance'] < 10 else "🔴"
             tree.insert('', 'end', text=desc,
-                       values=(job['service'], f"{distance_color} {job['distance']} km", job['budget'], job['timing']))
+                       values=(job['service'], f"{distance_color} {job['distance']} km", job['budget'], job.get('timing', '')))
         
         tree.pack(expand=True, fill='both', pady=10)
         
@@ -742,6 +606,9 @@ class HireWiseApp:
             self.root.geometry("600x600")
             self.root.minsize(500, 500)
             
+            # Network lookups run here instead of blocking the GUI
+            self.tasks = BackgroundTasks(self.root)
+            
             # Data storage
             self.users_file = "hirewise_users.json"
             self.jobs_file = "hirewise_jobs.json"
@@ -751,6 +618,8 @@ class HireWiseApp:
             self.payments_file = "hirewise_payments.json"
             self.reviews_file = "hirewise_reviews.json"
             self.notifications_file = "hirewise_notifications.json"
+            self.store = store
+            self.services = services
             
             # Phase 2 features
             self.phase2 = None
@@ -768,13 +637,7 @@ class HireWiseApp:
             # Load or create data files
             files = [self.users_file, self.jobs_file, self.professionals_file, self.quotes_file, 
                     self.messages_file, self.payments_file, self.reviews_file, self.notifications_file]
-            for file in files:
-                try:
-                    if not os.path.exists(file):
-                        with open(file, 'w') as f:
-                            json.dump({}, f)
-                except Exception as e:
-                    print(f"Error creating file {file}: {e}")
+            self.store.ensure_files(files)
         except Exception as e:
             print(f"Error loading data: {e}")
         
@@ -785,8 +648,7 @@ class HireWiseApp:
                 "pro2": {"name": "Mary Cleaner", "service": "Cleaner", "rating": 4.9, "price": "30-60", "location": "Nairobi", "certified": True, "bio": "Professional cleaning services"},
                 "pro3": {"name": "Tech Mike", "service": "Web Designer", "rating": 4.7, "price": "100-300", "location": "Nairobi", "certified": False, "bio": "Modern web design solutions"}
             }
-            with open(self.professionals_file, 'w') as f:
-                json.dump(sample_pros, f)
+            self.store.save('professionals', sample_pros)
     
     def create_main_interface(self):
         # Clear window
@@ -842,10 +704,10 @@ class HireWiseApp:
         try:
             # Method 1: Try reverse geocoding for precise address
             try:
-                response = requests.get('http://ipapi.co/json/', timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    lat, lng = data.get('latitude', 0), data.get('longitude', 0)
+                # Pooled, rate limited and skipped while the provider is down
+                coords = ip_location()
+                if coords is not None:
+                    lat, lng = coords
                     
                     # Get precise address using reverse geocoding
                     precise_address = self.reverse_geocode(lat, lng)
@@ -900,17 +762,10 @@ class HireWiseApp:
     def reverse_geocode(self, lat, lng):
         """Convert GPS coordinates to precise address"""
         try:
-            # Try OpenStreetMap Nominatim for reverse geocoding
-            url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lng}&zoom=18&addressdetails=1"
-            headers = {'User-Agent': 'HireWise App'}
-            
-            response = requests.get(url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                
+            # Try OpenStreetMap Nominatim for reverse geocoding (cached)
+            address_parts = reverse_geocode_address(lat, lng, zoom=18)
+            if address_parts is not None:
                 # Extract building and road information
-                address_parts = data.get('address', {})
-                
                 building = (address_parts.get('building') or 
                            address_parts.get('house_name') or 
                            address_parts.get('amenity') or
@@ -1018,28 +873,48 @@ class HireWiseApp:
             messagebox.showerror("Error", "Please fill in all fields")
             return
         
-        # Get location
-        location_data = self.get_precise_address_location()
-        auto_location = location_data['address']
-        
-        # Load users
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
-        # Create or update user
-        users[email] = {
-            "name": name, 
-            "email": email, 
-            "contact": contact,
-            "location": auto_location, 
-            "type": self.user_type.get()
-        }
+        # Create or update user, matching the email regardless of case
+        user_id, existing = self.store.get_by_email('users', email)
+        if user_id is None:
+            user_id = normalize_email(email)
         
-        with open(self.users_file, 'w') as f:
-            json.dump(users, f)
+        # Log in straight away with the last known location; the precise
+        # location is looked up in the background
+        user = dict(existing or {},
+                    name=name,
+                    email=user_id,
+                    contact=contact,
+                    type=self.user_type.get())
+        user.setdefault('location', LOCATING)
         
-        self.current_user = users[email]
+        self.store.put('users', user_id, user)
+        
+        self.current_user = user
         self.create_main_interface()
+        self.resolve_location_later(user_id)
+    
+    def resolve_location_later(self, user_id):
+        """Detect the user's precise location in a background worker and
+        save it to their account when it arrives"""
+        def location_resolved(location_data):
+            if location_data.get('method') in MEASURED_LOCATION_METHODS:
+                # Keep the resolved coordinates so posted jobs can be ranked by distance
+                update = {'location': location_data['address'],
+                          'lat': location_data['lat'], 'lng': location_data['lng']}
+            else:
+                # Failed or simulated detection: no real coordinates to keep
+                update = {'location': location_data['address']}
+            
+            user = self.store.get('users', user_id)
+            if user is not None:
+                if 'lat' not in update and user.get('location') != LOCATING:
+                    # Nothing measured; keep the last known location
+                    return
+                self.store.put('users', user_id, dict(user, **update))
+            if self.current_user and self.current_user.get('email') == user_id:
+                self.current_user.update(update)
+        
+        self.tasks.submit(self.get_precise_address_location, on_done=location_resolved)
     
     def signup_user(self):
         name = self.name_entry.get().strip()
@@ -1051,10 +926,7 @@ class HireWiseApp:
             return
         
         # Check if user already exists
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
-        if email in users:
+        if self.store.get_by_email('users', email)[0] is not None:
             messagebox.showerror("Error", "Email already registered. Please login instead.")
             return
         
@@ -1128,33 +1000,27 @@ class HireWiseApp:
         def verify_code():
             entered_code = code_entry.get().strip().upper()
             if entered_code == verification_code:
-                # Get location
-                location_data = self.get_precise_address_location()
-                auto_location = location_data['address']
-                
-                # Create user account
-                with open(self.users_file, 'r') as f:
-                    users = json.load(f)
-                
-                users[email] = {
+                # Create user account; the location is filled in once detected
+                email_id = normalize_email(email)
+                user = {
                     "name": name,
-                    "email": email,
+                    "email": email_id,
                     "contact": contact,
-                    "location": auto_location,
+                    "location": LOCATING,
                     "type": self.user_type.get(),
                     "verified": True,
                     "created": datetime.now().isoformat()
                 }
                 
-                with open(self.users_file, 'w') as f:
-                    json.dump(users, f)
+                self.store.put('users', email_id, user)
                 
                 messagebox.showinfo("Success", "Account created successfully!")
                 verify_window.destroy()
                 
                 # Auto login
-                self.current_user = users[email]
+                self.current_user = user
                 self.create_main_interface()
+                self.resolve_location_later(email_id)
             else:
                 messagebox.showerror("Error", "Invalid verification code. Please try again.")
         
@@ -1305,24 +1171,9 @@ class HireWiseApp:
                 messagebox.showerror("Error", "Please fill in service type and description")
                 return
             
-            # Load jobs
-            with open(self.jobs_file, 'r') as f:
-                jobs = json.load(f)
-            
-            job_id = str(uuid.uuid4())[:8]
-            jobs[job_id] = {
-                "id": job_id,
-                "client": self.current_user['email'],
-                "service": service_var.get(),
-                "description": desc_text.get("1.0", tk.END).strip(),
-                "budget": budget_var.get(),
-                "timing": timing_var.get(),
-                "status": "Open",
-                "created": datetime.now().isoformat()
-            }
-            
-            with open(self.jobs_file, 'w') as f:
-                json.dump(jobs, f)
+            self.services.jobs.post_job(self.current_user['email'], service_var.get(),
+                                        desc_text.get("1.0", tk.END).strip(),
+                                        budget_var.get(), timing_var.get())
             
             messagebox.showinfo("Success", "Job posted successfully!")
             job_window.destroy()
@@ -1373,8 +1224,7 @@ class HireWiseApp:
         ttk.Button(filter_frame, text="Apply Filters", command=apply_filters).grid(row=2, column=1, pady=10)
         
         # Load professionals
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        professionals = self.store.load('professionals')
         
         # Create treeview
         tree = ttk.Treeview(frame, columns=('Service', 'Rating', 'Price', 'Location'), show='tree headings')
@@ -1452,29 +1302,13 @@ class HireWiseApp:
                 messagebox.showerror("Error", "Please fill in service and bio")
                 return
             
-            # Load professionals
-            with open(self.professionals_file, 'r') as f:
-                professionals = json.load(f)
-            
-            pro_id = self.current_user['email']
-            certified = bool(id_entry.get().strip() and len(id_entry.get().strip()) >= 8)
-            
-            professionals[pro_id] = {
-                "name": self.current_user['name'],
-                "service": service_var.get(),
-                "bio": bio_text.get("1.0", tk.END).strip(),
-                "price": price_var.get(),
-                "location": self.current_user['location'],
-                "rating": 5.0,
-                "certified": certified,
-                "id_number": id_entry.get().strip(),
-                "license": license_entry.get().strip()
-            }
-            
-            with open(self.professionals_file, 'w') as f:
-                json.dump(professionals, f)
+            profile = self.services.professionals.save_profile(
+                self.current_user['email'], self.current_user['name'], self.current_user['location'],
+                service_var.get(), bio_text.get("1.0", tk.END).strip(), price_var.get(),
+                id_entry.get().strip(), license_entry.get().strip(),
+                self.current_user.get('lat'), self.current_user.get('lng'))
             
-            badge = " ✓ HireWise Certified" if certified else ""
+            badge = " ✓ HireWise Certified" if profile['certified'] else ""
             messagebox.showinfo("Success", f"Profile saved successfully!{badge}")
             profile_window.destroy()
         
@@ -1490,12 +1324,8 @@ class HireWiseApp:
         
         ttk.Label(frame, text="Available Jobs", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load jobs
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        
-        # Filter open jobs
-        open_jobs = {k: v for k, v in jobs.items() if v['status'] == 'Open'}
+        # Load open jobs with their clients
+        open_jobs = self.services.jobs.available_jobs()
         
         if not open_jobs:
             ttk.Label(frame, text="No jobs available").pack(pady=20)
@@ -1509,13 +1339,9 @@ class HireWiseApp:
         tree.heading('Timing', text='Timing')
         tree.heading('Location', text='Client Location')
         
-        # Load users to get client locations
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
-        for job_id, job in open_jobs.items():
+        for job_id, job, client in open_jobs:
             desc = job['description'][:30] + "..." if len(job['description']) > 30 else job['description']
-            client_location = users.get(job['client'], {}).get('location', 'Location not set')
+            client_location = client.get('location', 'Location not set')
             tree.insert('', 'end', text=desc, values=(job['service'], job['budget'], job['timing'], client_location))
         
         tree.pack(expand=True, fill='both', pady=10)
@@ -1562,24 +1388,8 @@ class HireWiseApp:
                 messagebox.showerror("Error", "Please fill in amount and message")
                 return
             
-            # Load quotes
-            with open(self.quotes_file, 'r') as f:
-                quotes = json.load(f)
-            
-            quote_id = str(uuid.uuid4())[:8]
-            quotes[quote_id] = {
-                "id": quote_id,
-                "job_id": job_id,
-                "professional": self.current_user['email'],
-                "amount": amount_entry.get().strip(),
-                "message": message_text.get("1.0", tk.END).strip(),
-                "availability": avail_var.get(),
-                "status": "Sent",
-                "created": datetime.now().isoformat()
-            }
-            
-            with open(self.quotes_file, 'w') as f:
-                json.dump(quotes, f)
+            self.services.quotes.send_quote(job_id, self.current_user['email'], amount_entry.get().strip(),
+                                            message_text.get("1.0", tk.END).strip(), avail_var.get())
             
             messagebox.showinfo("Success", "Quote sent successfully!")
             quote_window.destroy()
@@ -1596,23 +1406,13 @@ class HireWiseApp:
         
         ttk.Label(frame, text="My Quotes", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load quotes
-        with open(self.quotes_file, 'r') as f:
-            quotes = json.load(f)
-        
-        # Filter user's quotes
-        user_quotes = {k: v for k, v in quotes.items() if v['professional'] == self.current_user['email']}
+        # Load user's quotes with their jobs and clients
+        user_quotes = self.services.quotes.professional_quotes(self.current_user['email'])
         
         if not user_quotes:
             ttk.Label(frame, text="No quotes sent yet").pack(pady=20)
             return
         
-        # Load jobs and users for client location
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
         # Create treeview
         tree = ttk.Treeview(frame, columns=('Amount', 'Status', 'Client Location', 'Date'), show='tree headings')
         tree.heading('#0', text='Client Name')
@@ -1621,12 +1421,10 @@ class HireWiseApp:
         tree.heading('Client Location', text='Client Location')
         tree.heading('Date', text='Date')
         
-        for quote_id, quote in user_quotes.items():
+        for quote_id, quote, job, client in user_quotes:
             date = datetime.fromisoformat(quote['created']).strftime('%Y-%m-%d')
-            job = jobs.get(quote['job_id'], {})
-            client_email = job.get('client', '')
-            client_name = users.get(client_email, {}).get('name', 'Unknown Client')
-            client_location = users.get(client_email, {}).get('location', 'Unknown')
+            client_name = client.get('name', 'Unknown Client')
+            client_location = client.get('location', 'Unknown')
             tree.insert('', 'end', text=client_name,
                        values=(quote['amount'], quote['status'], client_location, date))
         
@@ -1657,12 +1455,8 @@ class HireWiseApp:
         
         ttk.Label(frame, text="My Posted Jobs", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load jobs
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        
-        # Filter user's jobs
-        user_jobs = {k: v for k, v in jobs.items() if v['client'] == self.current_user['email']}
+        # Load user's jobs
+        user_jobs = self.services.jobs.client_jobs(self.current_user['email'])
         
         if not user_jobs:
             ttk.Label(frame, text="No jobs posted yet").pack(pady=20)
@@ -1705,12 +1499,8 @@ class HireWiseApp:
         
         ttk.Label(frame, text="Quotes for Job", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load quotes
-        with open(self.quotes_file, 'r') as f:
-            quotes = json.load(f)
-        
-        # Filter quotes for this job
-        job_quotes = {k: v for k, v in quotes.items() if v['job_id'] == job_id}
+        # Load quotes for this job
+        job_quotes = self.services.quotes.job_quotes(job_id)
         
         if not job_quotes:
             ttk.Label(frame, text="No quotes received yet").pack(pady=20)
@@ -1739,29 +1529,11 @@ class HireWiseApp:
             # Get selected quote
             selected_quote = list(job_quotes.values())[tree.index(selection[0])]
             
-            # Update job status to 'Assigned'
-            with open(self.jobs_file, 'r') as f:
-                jobs = json.load(f)
-            
-            jobs[job_id]['status'] = 'Assigned'
-            jobs[job_id]['assigned_to'] = selected_quote['professional']
-            
-            with open(self.jobs_file, 'w') as f:
-                json.dump(jobs, f)
-            
-            # Update quote status
-            with open(self.quotes_file, 'r') as f:
-                quotes = json.load(f)
-            
-            for q_id, quote in quotes.items():
-                if quote['job_id'] == job_id:
-                    if quote['professional'] == selected_quote['professional']:
-                        quotes[q_id]['status'] = 'Accepted'
-                    else:
-                        quotes[q_id]['status'] = 'Rejected'
-            
-            with open(self.quotes_file, 'w') as f:
-                json.dump(quotes, f)
+            # Assign the job and update quote statuses
+            if not self.services.quotes.accept_quote(job_id, selected_quote['professional']):
+                messagebox.showerror("Error", "This job has already been assigned")
+                quotes_window.destroy()
+                return
             
             messagebox.showinfo("Success", "Quote accepted! Professional will be notified.")
             quotes_window.destroy()
@@ -1845,10 +1617,7 @@ if __name__ == "__main__":
             return
         
         # Check if user already exists
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
-        if email in users:
+        if self.store.get_by_email('users', email)[0] is not None:
             messagebox.showerror("Error", "Email already registered. Please login instead.")
             return
         
@@ -1878,33 +1647,27 @@ if __name__ == "__main__":
         def verify_code():
             entered_code = code_entry.get().strip().upper()
             if entered_code == verification_code:
-                # Get location
-                location_data = self.get_precise_address_location()
-                auto_location = location_data['address']
-                
-                # Create user account
-                with open(self.users_file, 'r') as f:
-                    users = json.load(f)
-                
-                users[email] = {
+                # Create user account; the location is filled in once detected
+                email_id = normalize_email(email)
+                user = {
                     "name": name,
-                    "email": email,
+                    "email": email_id,
                     "contact": contact,
-                    "location": auto_location,
+                    "location": LOCATING,
                     "type": self.user_type.get(),
                     "verified": True,
                     "created": datetime.now().isoformat()
                 }
                 
-                with open(self.users_file, 'w') as f:
-                    json.dump(users, f)
+                self.store.put('users', email_id, user)
                 
                 messagebox.showinfo("Success", "Account created successfully!")
                 verify_window.destroy()
                 
                 # Auto login
-                self.current_user = users[email]
+                self.current_user = user
                 self.create_main_interface()
+                self.resolve_location_later(email_id)
             else:
                 messagebox.showerror("Error", "Invalid verification code. Please try again.")
         
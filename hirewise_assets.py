@@ -0,0 +1,184 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(ASSET_ROOT, 'templates')
+STATIC_DIR = os.path.join(ASSET_ROOT, 'static')
+# Output of `python hirewise_assets.py build`; used when present
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+ASSET_URL_PREFIX = '/assets/'
+# Hashed names change with the content, so clients can keep them for a year
+ASSET_MAX_AGE = 365 * 24 * 3600
+# Smaller files are not worth a compressed variant
+MIN_COMPRESS_SIZE = 256
+
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.png': 'image/png',
+    '.ico': 'image/x-icon',
+}
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+class Asset:
+    """A static file with a content-hashed name and its precompressed variants"""
+    __slots__ = ('name', 'hashed_name', 'content_type', 'etag', 'variants')
+
+    def __init__(self, name, body, dist_dir=None):
+        digest = hashlib.sha256(body).hexdigest()
+        stem, ext = os.path.splitext(name)
+        self.name = name
+        self.hashed_name = f"{stem}.{digest[:10]}{ext}"
+        self.content_type = CONTENT_TYPES.get(ext, 'application/octet-stream')
+        self.etag = digest[:20]
+        self.variants = {'identity': body}
+        if len(body) < MIN_COMPRESS_SIZE:
+            return
+        for encoding, compressed in self._compressed(body, dist_dir):
+            # Keep a variant only if it actually saves bytes
+            if compressed is not None and len(compressed) < len(body):
+                self.variants[encoding] = compressed
+
+    def _compressed(self, body, dist_dir):
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            prebuilt = dist_dir and os.path.join(dist_dir, self.hashed_name + suffix)
+            if prebuilt and os.path.exists(prebuilt):
+                with open(prebuilt, 'rb') as f:
+                    yield encoding, f.read()
+            else:
+                yield encoding, compress(body, encoding)
+
+    def negotiate(self, accept_encodings):
+        """(encoding, body) for the best variant the client accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accept_encodings:
+                return encoding, self.variants[encoding]
+        return 'identity', self.variants['identity']
+
+def compress(body, encoding):
+    if encoding == 'gzip':
+        # Fixed mtime so rebuilds produce identical files
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=11)
+    return None
+
+def accepted_encodings(header):
+    """Encodings listed in an Accept-Encoding header, minus those with q=0"""
+    encodings = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            encodings.add(coding.strip().lower())
+    return encodings
+
+class StaticAssets:
+    """The files in static/, read, hashed and compressed once at startup.
+
+    Pages link to them through url(), which returns the hashed name, so the
+    responses can be cached for a year and a deploy with changed files is
+    picked up by clients through the new names.
+    """
+
+    def __init__(self, static_dir=STATIC_DIR, dist_dir=DIST_DIR, prefix=ASSET_URL_PREFIX):
+        self.static_dir = static_dir
+        self.prefix = prefix
+        self.by_name = {}
+        self.by_hash = {}
+        if not os.path.isdir(dist_dir):
+            dist_dir = None
+        for entry in sorted(os.scandir(static_dir), key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            with open(entry.path, 'rb') as f:
+                asset = Asset(entry.name, f.read(), dist_dir)
+            self.by_name[asset.name] = asset
+            self.by_hash[asset.hashed_name] = asset
+
+    def url(self, name):
+        return self.prefix + self.by_name[name].hashed_name
+
+    def text(self, name):
+        return self.by_name[name].variants['identity'].decode('utf-8')
+
+    def get(self, hashed_name):
+        return self.by_hash.get(hashed_name)
+
+    def response(self, hashed_name, accept_encoding=None, if_none_match=None):
+        """(status, headers, body) for a request for a hashed asset name"""
+        asset = self.get(hashed_name)
+        if asset is None:
+            return 404, [('Content-Type', 'text/plain; charset=utf-8')], b'Not found'
+        headers = [
+            ('Cache-Control', f'public, max-age={ASSET_MAX_AGE}, immutable'),
+            ('ETag', f'"{asset.etag}"'),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if if_none_match and f'"{asset.etag}"' in if_none_match:
+            return 304, headers, b''
+        encoding, body = asset.negotiate(accepted_encodings(accept_encoding))
+        headers.append(('Content-Type', asset.content_type))
+        headers.append(('Content-Length', str(len(body))))
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        return 200, headers, body
+
+    def build(self, out_dir=DIST_DIR):
+        """Write the hashed files, their compressed variants and a manifest"""
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {}
+        for asset in self.by_name.values():
+            manifest[asset.name] = asset.hashed_name
+            for encoding, body in asset.variants.items():
+                path = os.path.join(out_dir, asset.hashed_name + ENCODING_SUFFIXES.get(encoding, ''))
+                with open(path, 'wb') as f:
+                    f.write(body)
+        with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+assets = StaticAssets()
+
+templates = Environment(loader=FileSystemLoader(TEMPLATE_DIR),
+                        autoescape=select_autoescape(['html']),
+                        auto_reload=False)
+templates.globals['asset_url'] = assets.url
+# Compile every template now rather than on first request
+_compiled = {name: templates.get_template(name) for name in templates.list_templates()
+             if not os.path.basename(name).startswith('_')}
+
+def render(name, **context):
+    return _compiled[name].render(**context)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HireWise static asset tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Write hashed and precompressed assets")
+    build_parser.add_argument('--out-dir', default=DIST_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        for name, hashed_name in assets.build(args.out_dir).items():
+            variants = ', '.join(sorted(assets.by_name[name].variants))
+            print(f"{name} -> {hashed_name} ({variants})")
+        if brotli is None:
+            print("brotli is not installed; only gzip variants were written")
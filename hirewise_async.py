@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from itsdangerous import BadSignature
+
+from hirewise_assets import ASSET_URL_PREFIX, assets, render
+from hirewise_compress import CompressionMiddleware
+from hirewise_store import normalize_email
+from hirewise_webcache import CachedResponse, ResponseCache
+from hirewise_web import app, json_bytes, professionals_page, save_login
+
+# Threads for blocking storage calls; connections never wait on them directly
+STORAGE_WORKERS = 16
+# Storage calls allowed to wait for a thread before requests queue in the loop
+MAX_PENDING = 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 15
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+LISTEN_BACKLOG = 2048
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'args', 'headers', 'body', 'keep_alive')
+
+    def __init__(self, method, target, version, headers, body=b''):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = parse_qsl(url.query, keep_blank_values=True)
+        # First value wins, as with Flask's request.args.get
+        self.args = {}
+        for name, value in self.query:
+            self.args.setdefault(name, value)
+        self.headers = headers
+        self.body = body
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            self.keep_alive = connection == 'keep-alive'
+        else:
+            self.keep_alive = connection != 'close'
+
+    def json(self):
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Request body must be JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+        return data
+
+class AsyncHireWiseServer:
+    """The HireWise web routes on asyncio instead of Flask.
+
+    Each connection is a coroutine, so idle keep-alive clients cost a few
+    KB rather than a worker thread. Storage calls, which block on file or
+    database I/O, run on a fixed pool of threads; at most MAX_PENDING wait
+    for a thread, and further requests wait in the event loop.
+
+    Sessions use the Flask app's signed cookie, so a login on either server
+    is valid on the other, and /api/professionals shares the Flask view's
+    code, response caching and compression settings.
+    """
+
+    def __init__(self, store, services, storage_workers=STORAGE_WORKERS, max_pending=MAX_PENDING,
+                 keepalive_timeout=KEEPALIVE_TIMEOUT):
+        self.store = store
+        self.services = services
+        self.keepalive_timeout = keepalive_timeout
+        self.executor = ThreadPoolExecutor(max_workers=storage_workers, thread_name_prefix='hirewise-storage')
+        self.max_pending = max_pending
+        self.response_cache = ResponseCache()
+        self.compression = CompressionMiddleware(None)
+        self.sessions = app.session_interface.get_signing_serializer(app)
+        self.session_max_age = int(app.permanent_session_lifetime.total_seconds())
+        self.home = CachedResponse(None, render('home.html').encode('utf-8'), 'text/html; charset=utf-8')
+        self.connections = 0
+        self.requests = 0
+        self._pending = None
+
+    async def storage(self, func, *args):
+        """Run a blocking storage call on the executor"""
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def serve(self, host='0.0.0.0', port=8000):
+        self._pending = asyncio.Semaphore(self.max_pending)
+        server = await asyncio.start_server(self.handle_connection, host, port,
+                                            limit=MAX_HEADER_BYTES, backlog=LISTEN_BACKLOG)
+        print(f"HireWise async server on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), self.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    await self.write_response(writer, e.status, [('Content-Type', 'application/json')],
+                                              self.error_body(e), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                self.requests += 1
+                try:
+                    status, headers, body = await self.dispatch(request)
+                except HttpError as e:
+                    status, headers, body = e.status, [('Content-Type', 'application/json')], self.error_body(e)
+                except Exception as e:
+                    print(f"Error handling {request.method} {request.path}: {e!r}")
+                    status, headers, body = 500, [('Content-Type', 'application/json')], \
+                        self.error_body(HttpError(500))
+                await self.write_response(writer, status, headers, body, request.keep_alive,
+                                          head=request.method == 'HEAD')
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def read_request(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HttpError(400)
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431)
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HttpError(400)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HttpError(411)
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400)
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413)
+        body = await reader.readexactly(length) if length else b''
+        return Request(method, target, version, headers, body)
+
+    async def dispatch(self, request):
+        path = request.path
+        if path == '/':
+            self.allow(request, 'GET', 'HEAD')
+            return self.cached(request, self.home)
+        if path.startswith(ASSET_URL_PREFIX):
+            self.allow(request, 'GET', 'HEAD')
+            return assets.response(path[len(ASSET_URL_PREFIX):], request.headers.get('accept-encoding'),
+                                   request.headers.get('if-none-match'))
+        if path == '/api/professionals':
+            self.allow(request, 'GET', 'HEAD')
+            return await self.storage(self.professionals, request)
+        if path == '/api/jobs':
+            self.allow(request, 'POST')
+            return await self.create_job(request)
+        if path == '/api/login':
+            self.allow(request, 'POST')
+            return await self.login(request)
+        raise HttpError(404)
+
+    @staticmethod
+    def allow(request, *methods):
+        if request.method not in methods:
+            raise HttpError(405)
+
+    def professionals(self, request):
+        """Runs on the storage executor: the store may read files to check versions"""
+        versions = (self.store.version('professionals'),)
+        if None in versions:
+            payload, status = professionals_page(self.services, request.args)
+            return self.json_response(payload, status)
+        key = (request.path, tuple(sorted(request.query)))
+        entry = self.response_cache.get(key, versions)
+        if entry is None:
+            payload, status = professionals_page(self.services, request.args)
+            if status != 200:
+                return self.json_response(payload, status)
+            entry = self.response_cache.put(key, versions, json_bytes(payload), 'application/json')
+        return self.cached(request, entry, f"public, max-age={self.response_cache.max_age}, must-revalidate")
+
+    async def create_job(self, request):
+        job_data = request.json()
+        client = self.session(request).get('user', {}).get('email')
+        try:
+            args = (client and normalize_email(client), job_data['service'],
+                    job_data['description'], job_data['budget'])
+        except KeyError as e:
+            raise HttpError(400, f"Missing field {e.args[0]}")
+        job_id, job = await self.storage(self.services.jobs.post_job, *args)
+        return self.json_response({'success': True, 'job_id': job_id})
+
+    async def login(self, request):
+        user_data = request.json()
+        missing = [field for field in ('name', 'email', 'contact', 'type') if field not in user_data]
+        if missing:
+            raise HttpError(400, f"Missing field {missing[0]}")
+        await self.storage(save_login, self.store, user_data)
+        status, headers, body = self.json_response({'success': True})
+        cookie = SimpleCookie()
+        cookie[app.config['SESSION_COOKIE_NAME']] = self.sessions.dumps({'user': user_data})
+        morsel = cookie[app.config['SESSION_COOKIE_NAME']]
+        morsel['path'] = '/'
+        morsel['httponly'] = True
+        headers.append(('Set-Cookie', morsel.OutputString()))
+        headers.append(('Vary', 'Cookie'))
+        return status, headers, body
+
+    def session(self, request):
+        cookie = SimpleCookie()
+        try:
+            cookie.load(request.headers.get('cookie', ''))
+            value = cookie[app.config['SESSION_COOKIE_NAME']].value
+            return self.sessions.loads(value, max_age=self.session_max_age)
+        except (KeyError, BadSignature, ValueError):
+            return {}
+
+    def cached(self, request, entry, cache_control=None):
+        """(status, headers, body) for a serialized response, or a 304 if the
+        client has it; compressed bodies are reused through the ETag"""
+        etag = f'"{entry.etag}"'
+        headers = [('ETag', etag)]
+        if cache_control:
+            headers.append(('Cache-Control', cache_control))
+        if entry.etag in request.headers.get('if-none-match', ''):
+            return 304, headers, b''
+        headers.append(('Content-Type', entry.mimetype))
+        body = entry.body
+        encoding = self.compression.choose_encoding({'REQUEST_METHOD': request.method,
+                                                     'HTTP_ACCEPT_ENCODING': request.headers.get('accept-encoding')})
+        headers.append(('Vary', 'Accept-Encoding'))
+        if encoding and len(body) >= self.compression.min_size:
+            body = self.compression.compress(body, encoding, etag)
+            headers[0] = ('ETag', 'W/' + etag)
+            headers.append(('Content-Encoding', encoding))
+        return 200, headers, body
+
+    @staticmethod
+    def json_response(payload, status=200):
+        return status, [('Content-Type', 'application/json')], json_bytes(payload)
+
+    @staticmethod
+    def error_body(error):
+        return json_bytes({'error': str(error)})
+
+    @staticmethod
+    async def write_response(writer, status, headers, body, keep_alive, head=False):
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers if name.lower() != 'content-length']
+        if status != 304:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if body and not head and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+def raise_open_file_limit():
+    """Raise the soft open-file limit to the hard limit; each connection is a file"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the HireWise web API on asyncio")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--storage-workers', type=int, default=STORAGE_WORKERS,
+                        help="Threads for storage calls (default %(default)s)")
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING,
+                        help="Storage calls allowed to queue for a thread (default %(default)s)")
+    parser.add_argument('--keepalive-timeout', type=float, default=KEEPALIVE_TIMEOUT)
+    args = parser.parse_args()
+
+    from hirewise_store import store
+    from hirewise_services import services
+
+    limit = raise_open_file_limit()
+    if limit is not None:
+        print(f"Open file limit: {limit}")
+    server = AsyncHireWiseServer(store, services, args.storage_workers, args.max_pending,
+                                 args.keepalive_timeout)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
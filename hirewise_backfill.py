@@ -0,0 +1,134 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from hirewise_gazetteer import gazetteer
+from hirewise_geocode import geocode_address
+
+BACKFILL_COLLECTIONS = ('users', 'professionals')
+# Placeholder locations that are not addresses
+SKIP_LOCATIONS = {"", "Locating...", "Location detection failed"}
+
+WORKERS = 4
+BATCH_SIZE = 1000
+FLUSH_SECONDS = 5
+
+def has_coords(record):
+    return record.get('lat') is not None and record.get('lng') is not None
+
+def resolve_address(address, online=False):
+    """(lat, lng) for an address from the offline gazetteer, then, if
+    online, from Nominatim through the geocode cache; None if unresolved"""
+    coords = gazetteer.coords(address)
+    if coords is None and online:
+        coords = geocode_address(address)
+    return coords
+
+class AddressBackfill:
+    """Adds lat/lng to stored users and professionals from their location text.
+
+    Records sharing an address are geocoded once. Lookups run on a bounded
+    worker pool and results are written back in batches as they arrive, so
+    an interrupted run keeps its progress. Rerunning is cheap: records that
+    have coordinates are skipped, the gazetteer is offline, and online
+    lookups (including misses) are cached on disk.
+    """
+
+    def __init__(self, store, online=False, workers=WORKERS, batch_size=BATCH_SIZE,
+                 flush_seconds=FLUSH_SECONDS, collections=BACKFILL_COLLECTIONS):
+        self.store = store
+        self.online = online
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.collections = collections
+        self.stats = {'addresses': 0, 'resolved': 0, 'unresolved': 0, 'records': 0}
+        self._updates = {}  # collection -> {record_id: (address, lat, lng)}
+        self._queued = 0
+        self._last_flush = time.monotonic()
+
+    def pending(self):
+        """address -> [(collection, record_id)] for records without coordinates"""
+        addresses = {}
+        for name in self.collections:
+            for record_id, record in self.store.load(name).items():
+                address = record.get('location')
+                if has_coords(record) or not isinstance(address, str) or address.strip() in SKIP_LOCATIONS:
+                    continue
+                addresses.setdefault(address, []).append((name, record_id))
+        return addresses
+
+    def run(self, limit=None, verbose=False):
+        """Geocode pending addresses (at most `limit`) and return the stats"""
+        addresses = self.pending()
+        queue = iter(list(addresses.items())[:limit])
+        if verbose:
+            print(f"{len(addresses):,} distinct addresses to geocode")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = {}
+            while True:
+                # Keep a bounded number of lookups queued
+                for address, records in queue:
+                    in_flight[executor.submit(resolve_address, address, self.online)] = (address, records)
+                    if len(in_flight) >= self.workers * 4:
+                        break
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    address, records = in_flight.pop(future)
+                    self._record(address, records, future.result())
+                if self._queued >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+                    self.flush()
+                    if verbose:
+                        print(f"  {self.stats['addresses']:,} addresses, {self.stats['records']:,} records updated")
+        self.flush()
+        return self.stats
+
+    def _record(self, address, records, coords):
+        self.stats['addresses'] += 1
+        if coords is None:
+            self.stats['unresolved'] += 1
+            return
+        self.stats['resolved'] += 1
+        for name, record_id in records:
+            self._updates.setdefault(name, {})[record_id] = (address,) + tuple(coords)
+            self._queued += 1
+
+    def flush(self):
+        """Write the coordinates found so far"""
+        for name, updates in self._updates.items():
+            def update(record_id, record):
+                address, lat, lng = updates[record_id]
+                # Skip records edited since the scan
+                if has_coords(record) or record.get('location') != address:
+                    return None
+                return dict(record, lat=lat, lng=lng)
+            self.stats['records'] += self.store.update_many(name, list(updates), update)
+        self._updates = {}
+        self._queued = 0
+        self._last_flush = time.monotonic()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add coordinates to stored user and professional addresses")
+    parser.add_argument('--online', action='store_true',
+                        help="Look up addresses the offline gazetteer cannot resolve on Nominatim (1 request/s)")
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="Records per write-back (default %(default)s)")
+    parser.add_argument('--limit', type=int, help="Geocode at most this many addresses")
+    parser.add_argument('--data-dir', help="Backfill a generated dataset instead of the configured store")
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    args = parser.parse_args()
+
+    if args.data_dir:
+        from hirewise_datagen import open_store
+        store = open_store(args.backend, args.data_dir)
+    else:
+        from hirewise_store import store
+
+    start = time.perf_counter()
+    stats = AddressBackfill(store, args.online, args.workers, args.batch_size).run(args.limit, verbose=True)
+    print(f"Done in {time.perf_counter() - start:.1f}s: {stats['resolved']:,} of {stats['addresses']:,} "
+          f"addresses resolved, {stats['records']:,} records updated")
@@ -0,0 +1,312 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import hirewise_web
+from hirewise_app import HireWiseApp
+from hirewise_datagen import MarketplaceGenerator, counts_for_size, open_store, SERVICES
+from hirewise_gps import HireWiseGPS, NEAREST_LIMIT
+from hirewise_records import INTERNED_FIELDS, intern_fields
+from hirewise_services import HireWiseServices
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+PROFESSIONAL_FILTERS = [
+    ("All", "All", "All", "All"),
+    ("Plumber", "All", "All", "All"),
+    ("All", "All", "4.5+", "All"),
+    ("Cleaner", "All", "4.0+", "300+"),
+    ("Electrician", "All", "All", "50-100")
+]
+
+class _HeadlessTree:
+    """Stand-in for the ttk.Treeview that refresh_professionals_list fills"""
+
+    def __init__(self):
+        self.rows = []
+
+    def get_children(self):
+        return list(range(len(self.rows)))
+
+    def delete(self, item):
+        pass
+
+    def insert(self, parent, index, text='', values=()):
+        self.rows.append((text, values))
+
+class _HeadlessApp:
+    """The parts of HireWiseApp the timed methods use, without a Tk root"""
+
+    refresh_professionals_list = HireWiseApp.refresh_professionals_list
+
+    def __init__(self, services, current_user=None):
+        self.store = services.store
+        self.services = services
+        self.current_user = current_user
+
+@contextmanager
+def web_services(services):
+    """Serve the Flask app's routes from the benchmark dataset"""
+    previous = hirewise_web.store, hirewise_web.services
+    hirewise_web.store, hirewise_web.services = services.store, services
+    try:
+        yield hirewise_web.app.test_client()
+    finally:
+        hirewise_web.store, hirewise_web.services = previous
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def measure(func, iterations, warmup=3, max_seconds=None):
+    """Run func() repeatedly and summarize its latency in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if max_seconds and time.perf_counter() - start > max_seconds:
+            break
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'iterations': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 4),
+        'p99_ms': round(percentile(latencies, 99), 4),
+        'mean_ms': round(statistics.fmean(latencies), 4),
+        'max_ms': round(latencies[-1], 4),
+        'ops_per_sec': round(len(latencies) / elapsed, 2) if elapsed else 0.0
+    }
+
+def build_cases(services, generator, rng):
+    """Benchmark name -> zero-argument callable over the given dataset"""
+    store = services.store
+    counts = generator.counts
+    app = _HeadlessApp(services)
+    gps = HireWiseGPS()
+    gps.store = store
+    filters = iter(lambda: rng.choice(PROFESSIONAL_FILTERS), None)
+
+    def refresh_professionals():
+        app.refresh_professionals_list(_HeadlessTree(), *next(filters))
+
+    def nearest_professionals():
+        gps.current_location = {"lat": -1.2921 + rng.uniform(-0.05, 0.05),
+                                "lng": 36.8172 + rng.uniform(-0.05, 0.05)}
+        version = store.version('professionals')
+        gps.find_nearest_professionals(store.load('professionals'), rng.choice(SERVICES + ["All"]),
+                                       NEAREST_LIMIT, version)
+
+    def nearby_professionals():
+        gps.current_location = {"lat": -1.2921 + rng.uniform(-0.05, 0.05),
+                                "lng": 36.8172 + rng.uniform(-0.05, 0.05)}
+        gps.nearby_professionals(rng.choice(SERVICES + ["All"]), NEAREST_LIMIT)
+
+    def refresh_location():
+        # Refresh Location after GPS jitter of about 100 m
+        gps.current_location = {"lat": -1.2921 + rng.uniform(-0.001, 0.001),
+                                "lng": 36.7872 + rng.uniform(-0.001, 0.001)}
+        gps.nearby_professionals(rng.choice(SERVICES + ["All"]), NEAREST_LIMIT)
+
+    def nearest_open_jobs():
+        services.jobs.nearest_open_jobs(-1.2921 + rng.uniform(-0.05, 0.05), 36.8172 + rng.uniform(-0.05, 0.05))
+
+    def show_available_jobs():
+        services.jobs.available_jobs()
+
+    def show_my_quotes():
+        services.quotes.professional_quotes(generator.pro_email(rng.randrange(counts['professionals'])))
+
+    def accept_quote():
+        services.quotes.accept_quote(generator.job_id(rng.randrange(counts['jobs'])),
+                                     generator.pro_email(rng.randrange(counts['professionals'])))
+
+    def update_average_rating():
+        services.ratings.update_average_rating(generator.pro_email(rng.randrange(counts['professionals'])),
+                                               float(rng.randint(1, 5)), True)
+
+    return {
+        'refresh_professionals_list': refresh_professionals,
+        'find_nearest_professionals': nearest_professionals,
+        'nearby_professionals': nearby_professionals,
+        'refresh_location': refresh_location,
+        'nearest_open_jobs': nearest_open_jobs,
+        'show_available_jobs': show_available_jobs,
+        'show_my_quotes': show_my_quotes,
+        'accept_quote': accept_quote,
+        'update_average_rating': update_average_rating
+    }
+
+def build_web_cases(client, rng):
+    def api_professionals():
+        service, location, rating, price = rng.choice(PROFESSIONAL_FILTERS)
+        params = {'service': service, 'price': price, 'sort': rng.choice(['rating', 'price', 'name'])}
+        if rating != "All":
+            params['min_rating'] = rating.rstrip('+')
+        response = client.get('/api/professionals', query_string=params)
+        assert response.status_code == 200
+
+    def api_jobs():
+        response = client.post('/api/jobs', json={
+            'service': rng.choice(SERVICES),
+            'description': "Benchmark job",
+            'budget': "50-100"
+        })
+        assert response.status_code == 200
+
+    return {'api_professionals': api_professionals, 'api_jobs': api_jobs}
+
+def run_size(size, iterations, seed=42, backend='json', only=None, max_seconds=None, data_dir=None, verbose=True):
+    work_dir = data_dir or tempfile.mkdtemp(prefix=f'hirewise_bench_{size}_')
+    try:
+        store = open_store(backend, work_dir)
+        generator = MarketplaceGenerator(counts_for_size(size), seed)
+        start = time.perf_counter()
+        generator.write(store)
+        if verbose:
+            print(f"\n== size {size:,} ({backend}) - data generated in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(seed)
+        results = {}
+        services = HireWiseServices(store)
+        with web_services(services) as client:
+            cases = dict(build_cases(services, generator, rng), **build_web_cases(client, rng))
+            for name, func in cases.items():
+                if only and name not in only:
+                    continue
+                results[name] = measure(func, iterations, max_seconds=max_seconds)
+                if verbose:
+                    r = results[name]
+                    print(f"  {name:<28} p50 {r['p50_ms']:>10.3f} ms   p99 {r['p99_ms']:>10.3f} ms   "
+                          f"{r['ops_per_sec']:>10.1f} ops/s  (n={r['iterations']})")
+        return results
+    finally:
+        if data_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def run(sizes, iterations, seed=42, backend='json', only=None, max_seconds=None, verbose=True):
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': backend,
+            'seed': seed,
+            'iterations': iterations
+        },
+        'results': {
+            str(size): run_size(size, iterations, seed, backend, only, max_seconds, verbose=verbose)
+            for size in sizes
+        }
+    }
+
+def compare(baseline, current, threshold=0.10, metric='p50_ms'):
+    """Print metric changes between two result files; return the regressions"""
+    regressions = []
+    print(f"\n{'size':>8}  {'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>9}")
+    for size, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            before = baseline['results'].get(size, {}).get(name)
+            if not before:
+                continue
+            old, new = before[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append((size, name, old, new))
+            print(f"{size:>8}  {name:<28} {old:>12.3f} {new:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+class _SlotsJob:
+    """A job as a __slots__ object, to compare with the dicts the stores keep"""
+    __slots__ = ('id', 'client', 'service', 'description', 'budget', 'timing', 'status',
+                 'created', 'assigned_to', 'lat', 'lng')
+
+    def __init__(self, data):
+        for key, value in data.items():
+            setattr(self, key, sys.intern(value) if key in INTERNED_FIELDS['jobs'] else value)
+
+def _allocated(build):
+    """Bytes still allocated by the structure build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+def memory_per_job(count, seed=42):
+    """Bytes per job record held as parsed dicts, as the stores' interned
+    dicts, and as __slots__ objects"""
+    text = json.dumps(dict(MarketplaceGenerator(dict(counts_for_size(count), jobs=count), seed).jobs()))
+    builds = {
+        'dict': lambda: json.loads(text),
+        'dict (interned)': lambda: {job_id: intern_fields(job, INTERNED_FIELDS['jobs'])
+                                    for job_id, job in json.loads(text).items()},
+        '__slots__': lambda: {job_id: _SlotsJob(job) for job_id, job in json.loads(text).items()}
+    }
+    results = {}
+    for label, build in builds.items():
+        size, data = _allocated(build)
+        results[label] = size / count
+        del data
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the HireWise hot paths")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated dataset sizes (default %(default)s)")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--max-seconds', type=float, default=30.0,
+                        help="Stop a benchmark early after this long (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--only', help="Comma-separated benchmark names to run")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="Compare with a previous results file")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative p50 slowdown reported as a regression (default %(default)s)")
+    parser.add_argument('--memory', type=int, metavar='JOBS',
+                        help="Only report the memory per job record at this many jobs")
+    args = parser.parse_args()
+
+    if args.memory:
+        print(f"Memory per job record at {args.memory:,} jobs:")
+        for label, per_record in memory_per_job(args.memory, args.seed).items():
+            print(f"  {label:<16} {per_record:8.0f} bytes")
+        sys.exit(0)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    only = set(args.only.split(',')) if args.only else None
+    results = run(sizes, args.iterations, args.seed, args.backend, only, args.max_seconds)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
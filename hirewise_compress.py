@@ -0,0 +1,159 @@
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from hirewise_assets import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this go out as they are
+COMPRESS_MIN_SIZE = int(os.environ.get('HIREWISE_COMPRESS_MIN_SIZE', 500))
+GZIP_LEVEL = int(os.environ.get('HIREWISE_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('HIREWISE_BROTLI_QUALITY', 5))
+# Compressed bodies of responses with an ETag, reused while it is unchanged
+COMPRESSED_CACHE_SIZE = 256
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+class CompressionMiddleware:
+    """WSGI middleware that gzip or brotli encodes responses for clients that
+    accept it.
+
+    Only responses with a Content-Length are compressed; streamed responses
+    (no length) and ones that already have a Content-Encoding, like the
+    precompressed assets, pass through untouched. A response with an ETag,
+    such as those from the response cache, is compressed once per encoding
+    and the compressed body is reused for later requests with the same ETag.
+    """
+
+    def __init__(self, app, min_size=COMPRESS_MIN_SIZE, gzip_level=GZIP_LEVEL,
+                 brotli_quality=BROTLI_QUALITY, cache_size=COMPRESSED_CACHE_SIZE):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._compressed = OrderedDict()  # (etag, encoding) -> body
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        encoding = self.choose_encoding(environ)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        captured = {}
+        written = []
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            # Headers are sent once the body has been seen
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        status, headers = captured['status'], captured['headers']
+        if not self.compressible(status, headers) and not written:
+            if self.varies(headers):
+                headers = add_vary(headers)
+            start_response(status, headers, captured['exc_info'])
+            return app_iter
+
+        try:
+            body = b''.join(written) + b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        if not self.compressible(status, headers):
+            start_response(status, add_vary(headers) if self.varies(headers) else headers,
+                           captured['exc_info'])
+            return [body]
+
+        if len(body) < self.min_size:
+            start_response(status, add_vary(headers), captured['exc_info'])
+            return [body]
+
+        etag = header(headers, 'ETag')
+        body = self.compress(body, encoding, etag)
+        headers = [(name, value) for name, value in add_vary(headers)
+                   if name.lower() not in ('content-length', 'etag')]
+        headers += [('Content-Encoding', encoding), ('Content-Length', str(len(body)))]
+        if etag:
+            # The encoded bytes differ from the original, so the validator
+            # becomes weak; If-None-Match still matches it
+            headers.append(('ETag', etag if etag.startswith('W/') else 'W/' + etag))
+        start_response(status, headers, captured['exc_info'])
+        return [body]
+
+    def choose_encoding(self, environ):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return None
+        accepted = accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING'))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def varies(headers):
+        content_type = (header(headers, 'Content-Type') or '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def compressible(self, status, headers):
+        if not status.startswith('200') or header(headers, 'Content-Length') is None:
+            return False
+        if header(headers, 'Content-Encoding') or header(headers, 'Content-Range'):
+            return False
+        if 'no-transform' in (header(headers, 'Cache-Control') or ''):
+            return False
+        content_type = (header(headers, 'Content-Type') or '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def compress(self, body, encoding, etag=None):
+        if etag is None:
+            return self._encode(body, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            compressed = self._compressed.get(key)
+            if compressed is not None:
+                self.hits += 1
+                self._compressed.move_to_end(key)
+                return compressed
+            self.misses += 1
+        compressed = self._encode(body, encoding)
+        with self._lock:
+            self._compressed[key] = compressed
+            while len(self._compressed) > self.cache_size:
+                self._compressed.popitem(last=False)
+        return compressed
+
+    def _encode(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._compressed)}
+
+def header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def add_vary(headers):
+    """headers with Accept-Encoding added to Vary"""
+    vary = header(headers, 'Vary')
+    if vary is None:
+        return headers + [('Vary', 'Accept-Encoding')]
+    if 'accept-encoding' in vary.lower() or vary.strip() == '*':
+        return headers
+    return [(name, f"{value}, Accept-Encoding" if name.lower() == 'vary' else value)
+            for name, value in headers]
@@ -1,7 +1,5 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import os
 from datetime import datetime
 import uuid
 
@@ -13,33 +11,11 @@ class HireWiseCoreFeatures:
         for item in tree.get_children():
             tree.delete(item)
         
-        # Load professionals
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        # Load professionals matching the filters
+        matches = self.services.professionals.filter_professionals(
+            service_filter, location_filter, rating_filter, price_filter)
         
-        # Apply filters
-        for pro_id, pro in professionals.items():
-            # Service filter
-            if service_filter != "All" and pro['service'] != service_filter:
-                continue
-            
-            # Location filter
-            if location_filter != "All" and pro['location'] != location_filter:
-                continue
-            
-            # Rating filter
-            if rating_filter != "All":
-                min_rating = float(rating_filter.replace("+", ""))
-                if pro['rating'] < min_rating:
-                    continue
-            
-            # Price filter
-            if price_filter != "All":
-                if price_filter == "300+" and not pro['price'].startswith("300") and not pro['price'].startswith("500"):
-                    continue
-                elif price_filter != "300+" and pro['price'] != price_filter:
-                    continue
-            
+        for pro_id, pro in matches:
             badge = " ✓" if pro.get('certified', False) else ""
             tree.insert('', 'end', text=pro['name'] + badge,
                        values=(pro['service'], f"{pro['rating']}⭐", pro['price'], pro['location']))
@@ -54,13 +30,10 @@ class HireWiseCoreFeatures:
         
         ttk.Label(frame, text="Messages", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Load messages
-        with open(self.messages_file, 'r') as f:
-            messages = json.load(f)
-        
-        # Filter user's messages
-        user_messages = {k: v for k, v in messages.items() 
-                        if v.get('sender') == self.current_user['email'] or v.get('receiver') == self.current_user['email']}
+        # Load user's messages
+        user_messages = {**self.store.find('messages', sender=self.current_user['email']),
+                         **self.store.find('messages', receiver=self.current_user['email'])}
+        user_messages = dict(sorted(user_messages.items(), key=lambda item: item[1].get('created', '')))
         
         if not user_messages:
             ttk.Label(frame, text="No messages yet").pack(pady=20)
@@ -95,16 +68,13 @@ class HireWiseCoreFeatures:
                 return
             
             msg_id = str(uuid.uuid4())[:8]
-            messages[msg_id] = {
+            self.store.put('messages', msg_id, {
                 "id": msg_id,
                 "sender": self.current_user['email'],
                 "receiver": to_entry.get().strip(),
                 "content": msg_text.get("1.0", tk.END).strip(),
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.messages_file, 'w') as f:
-                json.dump(messages, f)
+            })
             
             messagebox.showinfo("Success", "Message sent!")
             msg_window.destroy()
@@ -148,11 +118,8 @@ class HireWiseCoreFeatures:
             messagebox.showinfo("M-Pesa", f"STK push sent to {phone_entry.get()}\\nEnter PIN to complete payment")
             
             # Save payment record
-            with open(self.payments_file, 'r') as f:
-                payments = json.load(f)
-            
             pay_id = str(uuid.uuid4())[:8]
-            payments[pay_id] = {
+            self.store.put('payments', pay_id, {
                 "id": pay_id,
                 "user": self.current_user['email'],
                 "type": "Top Up",
@@ -160,10 +127,7 @@ class HireWiseCoreFeatures:
                 "method": "M-Pesa",
                 "status": "Completed",
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.payments_file, 'w') as f:
-                json.dump(payments, f)
+            })
         
         ttk.Button(mpesa_frame, text="Pay via M-Pesa", command=initiate_mpesa).pack(pady=5)
         
@@ -172,10 +136,7 @@ class HireWiseCoreFeatures:
         history_frame.pack(expand=True, fill='both', pady=10)
         
         # Load payment history
-        with open(self.payments_file, 'r') as f:
-            payments = json.load(f)
-        
-        user_payments = {k: v for k, v in payments.items() if v.get('user') == self.current_user['email']}
+        user_payments = self.store.find('payments', user=self.current_user['email'])
         
         if user_payments:
             tree = ttk.Treeview(history_frame, columns=('Type', 'Amount', 'Method', 'Status'), show='tree headings')
@@ -203,8 +164,7 @@ class HireWiseCoreFeatures:
         ttk.Label(frame, text="Professional Management", font=('Arial', 16, 'bold')).pack(pady=10)
         
         # Load professionals
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        professionals = self.store.load('professionals')
         
         # Create treeview
         tree = ttk.Treeview(frame, columns=('Service', 'Rating', 'Certified', 'Status'), show='tree headings')
@@ -255,12 +215,9 @@ class HireWiseCoreFeatures:
         ttk.Label(frame, text="System Analytics", font=('Arial', 16, 'bold')).pack(pady=10)
         
         # Load data for analytics
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        with open(self.jobs_file, 'r') as f:
-            jobs = json.load(f)
-        with open(self.professionals_file, 'r') as f:
-            professionals = json.load(f)
+        users = self.store.load('users')
+        jobs = self.store.load('jobs')
+        professionals = self.store.load('professionals')
         
         # Statistics
         stats_frame = ttk.LabelFrame(frame, text="Platform Statistics", padding="20")
@@ -269,7 +226,7 @@ class HireWiseCoreFeatures:
         total_users = len(users)
         total_jobs = len(jobs)
         total_pros = len(professionals)
-        active_jobs = len([j for j in jobs.values() if j['status'] == 'Open'])
+        active_jobs = len(self.store.find('jobs', status='Open'))
         
         ttk.Label(stats_frame, text=f"Total Users: {total_users}", font=('Arial', 12)).pack(anchor='w')
         ttk.Label(stats_frame, text=f"Total Jobs Posted: {total_jobs}", font=('Arial', 12)).pack(anchor='w')
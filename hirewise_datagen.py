@@ -0,0 +1,246 @@
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from hirewise_gps import HireWiseGPS
+from hirewise_store import DATA_FILES, HireWiseStore
+
+SERVICES = ["Plumber", "Cleaner", "Web Designer", "Electrician", "Carpenter"]
+PRICES = ["0-50", "50-100", "100-300", "300-500", "500+"]
+FIRST_NAMES = ["Sam", "Mary", "John", "Grace", "Peter", "Faith", "James", "Mercy", "Brian", "Wanjiku",
+               "Otieno", "Achieng", "Kamau", "Njeri", "Mwangi", "Akinyi", "Kiprop", "Chebet"]
+LAST_NAMES = ["Njoroge", "Mutua", "Odhiambo", "Wambui", "Kariuki", "Ochieng", "Kiptoo", "Muthoni",
+              "Otieno", "Wafula", "Kimani", "Nyambura"]
+ROADS = ["NGONG ROAD", "WAIYAKI WAY", "THIKA ROAD", "KIAMBU ROAD", "MOMBASA ROAD", "UHURU HIGHWAY"]
+BUILDINGS = ["Jabulani Villa", "Sunrise Apartments", "Garden Court", "Palm Heights", "Valley Arcade"]
+JOB_TASKS = {
+    "Plumber": ["fix a leaking sink", "unblock a drain", "replace a water heater"],
+    "Cleaner": ["deep clean a 2 bedroom apartment", "clean carpets and sofas", "post-construction cleaning"],
+    "Web Designer": ["build a small business website", "redesign an online shop", "set up a landing page"],
+    "Electrician": ["fix faulty sockets", "install security lights", "rewire a kitchen"],
+    "Carpenter": ["build kitchen cabinets", "repair a wooden door", "make a wardrobe"]
+}
+
+# Records per collection for a given --size
+RATIOS = {
+    'users': 1.0,
+    'professionals': 0.2,
+    'jobs': 1.0,
+    'quotes': 2.0,
+    'messages': 1.0,
+    'payments': 0.5,
+    'reviews': 0.5
+}
+
+START_DATE = datetime(2025, 1, 1)
+
+def counts_for_size(size):
+    return {name: max(1, int(size * ratio)) for name, ratio in RATIOS.items()}
+
+class MarketplaceGenerator:
+    """Seeded generator of realistic HireWise marketplace data.
+
+    Each collection is produced as a stream of (record_id, record) pairs so
+    datasets far larger than memory can be written. Ids are derived from
+    record numbers, so quotes, messages, payments and reviews refer to
+    jobs and accounts that exist in the same dataset.
+    """
+
+    def __init__(self, counts, seed=42):
+        self.counts = dict(counts)
+        # Every professional also has a user account
+        self.counts['users'] = max(self.counts['users'], self.counts['professionals'])
+        self.seed = seed
+        self.locations = HireWiseGPS().locations
+        self.areas = list(self.locations)
+
+    def _rng(self, name):
+        return random.Random(f"{self.seed}:{name}")
+
+    def _created(self, rng):
+        return (START_DATE + timedelta(seconds=rng.randrange(300 * 86400))).isoformat()
+
+    def _place(self, rng):
+        area = rng.choice(self.areas)
+        coords = self.locations[area]
+        # Spread people over roughly 1 km around the area centre
+        lat = round(coords['lat'] + rng.uniform(-0.01, 0.01), 6)
+        lng = round(coords['lng'] + rng.uniform(-0.01, 0.01), 6)
+        return area, lat, lng
+
+    def pro_email(self, i):
+        return f"pro{i}@hirewise.test"
+
+    def user_email(self, i):
+        return self.pro_email(i) if i < self.counts['professionals'] else f"client{i}@hirewise.test"
+
+    def job_id(self, i):
+        return f"{i:08x}"
+
+    def _name(self, rng):
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def users(self):
+        rng = self._rng('users')
+        for i in range(self.counts['users']):
+            email = self.user_email(i)
+            area, lat, lng = self._place(rng)
+            yield email, {
+                "name": self._name(rng),
+                "email": email,
+                "contact": f"07{rng.randrange(10**8):08d}",
+                "location": f"{rng.choice(BUILDINGS)}, {rng.choice(ROADS)}",
+                "type": "Professional" if i < self.counts['professionals'] else "Client",
+                "lat": lat,
+                "lng": lng,
+                "verified": rng.random() < 0.8,
+                "created": self._created(rng)
+            }
+
+    def professionals(self):
+        rng = self._rng('professionals')
+        for i in range(self.counts['professionals']):
+            area, lat, lng = self._place(rng)
+            service = rng.choice(SERVICES)
+            id_number = str(rng.randrange(10**7, 10**8)) if rng.random() < 0.7 else ""
+            yield self.pro_email(i), {
+                "name": self._name(rng),
+                "service": service,
+                "bio": f"Experienced {service.lower()} with {rng.randint(1, 15)} years in {area}",
+                "price": rng.choice(PRICES),
+                "location": area,
+                "lat": lat,
+                "lng": lng,
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "rating_count": rng.randint(0, 200),
+                "certified": bool(id_number),
+                "id_number": id_number,
+                "license": str(rng.randrange(10**7, 10**8)) if rng.random() < 0.4 else ""
+            }
+
+    def jobs(self):
+        rng = self._rng('jobs')
+        for i in range(self.counts['jobs']):
+            job_id = self.job_id(i)
+            service = rng.choice(SERVICES)
+            area, lat, lng = self._place(rng)
+            job = {
+                "id": job_id,
+                "client": self.user_email(rng.randrange(self.counts['users'])),
+                "service": service,
+                "description": f"I need a {service.lower()} to {rng.choice(JOB_TASKS[service])} in {area}",
+                "budget": rng.choice(PRICES),
+                "timing": rng.choice(["Urgent", "Scheduled"]),
+                "status": "Open",
+                "lat": lat,
+                "lng": lng,
+                "created": self._created(rng)
+            }
+            if rng.random() < 0.4:
+                job["status"] = "Assigned"
+                job["assigned_to"] = self.pro_email(rng.randrange(self.counts['professionals']))
+            yield job_id, job
+
+    def quotes(self):
+        rng = self._rng('quotes')
+        for i in range(self.counts['quotes']):
+            quote_id = f"q{i:07x}"
+            yield quote_id, {
+                "id": quote_id,
+                "job_id": self.job_id(rng.randrange(self.counts['jobs'])),
+                "professional": self.pro_email(rng.randrange(self.counts['professionals'])),
+                "amount": str(rng.randrange(500, 20000, 50)),
+                "message": rng.choice(["I am available today", "Can start tomorrow morning",
+                                       "I have done similar work nearby", "Call me to discuss"]),
+                "availability": rng.choice(["Immediately", "24 hours", "1 week"]),
+                "status": rng.choice(["Sent", "Sent", "Accepted", "Rejected"]),
+                "created": self._created(rng)
+            }
+
+    def messages(self):
+        rng = self._rng('messages')
+        users = self.counts['users']
+        for i in range(self.counts['messages']):
+            msg_id = f"m{i:07x}"
+            yield msg_id, {
+                "id": msg_id,
+                "sender": self.user_email(rng.randrange(users)),
+                "receiver": self.user_email(rng.randrange(users)),
+                "content": rng.choice(["Are you available this week?", "Please share your quote",
+                                       "On my way", "Job done, thank you!"]),
+                "created": self._created(rng)
+            }
+
+    def payments(self):
+        rng = self._rng('payments')
+        for i in range(self.counts['payments']):
+            pay_id = f"p{i:07x}"
+            yield pay_id, {
+                "id": pay_id,
+                "user": self.user_email(rng.randrange(self.counts['users'])),
+                "type": rng.choice(["Top Up", "Payment"]),
+                "amount": str(rng.randrange(100, 10000, 50)),
+                "method": "M-Pesa",
+                "status": rng.choice(["Completed", "Completed", "Pending"]),
+                "created": self._created(rng)
+            }
+
+    def reviews(self):
+        rng = self._rng('reviews')
+        for i in range(self.counts['reviews']):
+            review_id = f"r{i:07x}"
+            rating = float(rng.choice([3, 4, 4, 5, 5, 5]))
+            yield review_id, {
+                "id": review_id,
+                "job_id": self.job_id(rng.randrange(self.counts['jobs'])),
+                "reviewer": self.user_email(rng.randrange(self.counts['users'])),
+                "reviewed": self.pro_email(rng.randrange(self.counts['professionals'])),
+                "reviewer_type": "client",
+                "rating": rating,
+                "review": "Excellent service!" if rating >= 4.5 else "Good service overall.",
+                "created": self._created(rng)
+            }
+
+    def write(self, store, verbose=False):
+        """Write every collection through a store's bulk_load()"""
+        for name in RATIOS:
+            start = time.perf_counter()
+            count = store.bulk_load(name, getattr(self, name)())
+            if verbose:
+                print(f"{name}: {count:,} records in {time.perf_counter() - start:.1f}s")
+
+def open_store(backend, out_dir, database_url=None):
+    """Store writing into out_dir, in the JSON layout or the SQLite backend"""
+    os.makedirs(out_dir, exist_ok=True)
+    data_files = {name: os.path.join(out_dir, filename) for name, filename in DATA_FILES.items()}
+    if backend == 'sqlite':
+        from hirewise_sqlite import HireWiseSQLStore
+        url = database_url or f"sqlite:///{os.path.join(out_dir, 'hirewise.db')}"
+        return HireWiseSQLStore(url, data_files=data_files)
+    return HireWiseStore(data_files=data_files)
+
+def generate_dataset(out_dir, size, seed=42, backend='json', database_url=None, counts=None, verbose=False):
+    store = open_store(backend, out_dir, database_url)
+    MarketplaceGenerator(counts or counts_for_size(size), seed).write(store, verbose)
+    return store
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic HireWise marketplace data")
+    parser.add_argument('--size', type=int, default=1000,
+                        help="Base size; other collections scale from it (default 1000)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out-dir', default='hirewise_data')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--database-url', help="Database for --backend sqlite (default: <out-dir>/hirewise.db)")
+    for name in RATIOS:
+        parser.add_argument(f'--{name}', type=int, help=f"Number of {name} (overrides --size)")
+    args = parser.parse_args()
+
+    counts = counts_for_size(args.size)
+    for name in RATIOS:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    generate_dataset(args.out_dir, args.size, args.seed, args.backend, args.database_url, counts, verbose=True)
@@ -0,0 +1,184 @@
+import json
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from hirewise_spatial import haversine
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hirewise_gazetteer.json')
+
+# Minimum trigram similarity (Dice coefficient) for a fuzzy match, over the
+# whole name and over its distinctive words
+MIN_SCORE = 0.5
+MIN_DISTINCTIVE_SCORE = 0.7
+# Places further than this from the CBD, like Thika or Mombasa, are known
+# names but resolve to None: their coordinates are no use for Nairobi jobs
+SERVICE_CENTRE = (-1.2864, 36.8172)
+SERVICE_RADIUS_KM = 35
+RESOLVE_CACHE_SIZE = 4096
+
+ABBREVIATIONS = {
+    'rd': 'road',
+    'ave': 'avenue',
+    'av': 'avenue',
+    'hwy': 'highway',
+    'st': 'street',
+    'dr': 'drive',
+    'est': 'estate'
+}
+# Words that say what kind of place a name is rather than which one. A match
+# must agree on them and closely match the other words, so "Foo Road" is not
+# Jogoo Road, "Westlands Road" is not the Westlands estate and a placeholder
+# like "Building, ROAD" matches nothing
+GENERIC_WORDS = frozenset(ABBREVIATIONS.values()) | {
+    'way', 'lane', 'close', 'crescent', 'bypass', 'building',
+    'centre', 'center', 'mall', 'market', 'airport', 'hospital'}
+# Generic words a place of a kind may be called by without them in its name
+KIND_WORDS = {'estate': {'estate'}}
+
+Place = namedtuple('Place', 'name kind lat lng score')
+_Name = namedtuple('_Name', 'key gram_count place core_grams generic')
+
+def normalize(text):
+    """Lowercase words with punctuation dropped and road abbreviations expanded"""
+    words = re.sub(r"[^a-z0-9]+", " ", str(text).lower().replace("'", "")).split()
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words)
+
+def generic_word(word):
+    """The generic word that word is, or is cut short from ("roa"), or None"""
+    if word in GENERIC_WORDS:
+        return word
+    if len(word) >= 3:
+        for full in GENERIC_WORDS:
+            if full.startswith(word):
+                return full
+    return None
+
+def distinctive(key):
+    """A normalized name without its generic words"""
+    return " ".join(word for word in key.split() if generic_word(word) is None)
+
+def generic(key):
+    return frozenset(filter(None, map(generic_word, key.split())))
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b))
+
+class Gazetteer:
+    """Offline lookup of Nairobi estates, roads and landmarks.
+
+    Names and aliases are indexed by character trigram, so misspelt or
+    partial locations ("kileleshwa", "Westgate Apartments, WAIYAKI WAY")
+    resolve without a network call. Each comma-separated part of a location
+    is tried in turn, most specific first, and the first part that matches
+    well enough wins. A location that only looks like a known name, such as
+    "Muthama" next to Muthaiga, resolves to None rather than the wrong place.
+    """
+
+    def __init__(self, places, min_score=MIN_SCORE):
+        self.places = places
+        self.min_score = min_score
+        self.exact = {}  # normalized name -> place
+        self.names = []  # _Name per name and alias
+        self.grams = {}  # trigram -> [name number]
+        for place in places:
+            for name in [place['name']] + place.get('aliases', []):
+                key = normalize(name)
+                if not key or key in self.exact:
+                    continue
+                self.exact[key] = place
+                grams = trigrams(key)
+                for gram in grams:
+                    self.grams.setdefault(gram, []).append(len(self.names))
+                self.names.append(_Name(key, len(grams), place, trigrams(distinctive(key) or key),
+                                        generic(key) | KIND_WORDS.get(place['kind'], set())))
+        self.resolve = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_FILE):
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f)['places'])
+        except (OSError, ValueError, KeyError):
+            return cls([])
+
+    def __len__(self):
+        return len(self.places)
+
+    def match(self, text):
+        """(place, score) of the closest name to text, or (None, 0.0)"""
+        key = normalize(text)
+        if not key:
+            return None, 0.0
+        place = self.exact.get(key)
+        if place is not None:
+            return place, 1.0
+        core = distinctive(key)
+        if not core:
+            return None, 0.0
+
+        grams = trigrams(key)
+        core_grams = trigrams(core)
+        kinds = generic(key)
+        shared = {}
+        for gram in grams:
+            for number in self.grams.get(gram, ()):
+                shared[number] = shared.get(number, 0) + 1
+        best, best_score = None, 0.0
+        for number, count in shared.items():
+            name = self.names[number]
+            score = 2 * count / (len(grams) + name.gram_count)
+            # "Rhapta" may be Rhapta Road, but "Westlands Road" is not Westlands
+            if (score > best_score and kinds <= name.generic
+                    and dice(core_grams, name.core_grams) >= MIN_DISTINCTIVE_SCORE):
+                best, best_score = name.place, score
+        return best, best_score
+
+    def _resolve(self, text):
+        """Place for a free-text location, or None if nothing matches"""
+        if not text:
+            return None
+        parts = [key for key in map(normalize, [text] + str(text).split(',')) if key]
+        # An exact name anywhere beats a name inside a part, which beats a fuzzy match
+        for key in parts:
+            if key in self.exact:
+                return self._place(self.exact[key], 1.0)
+        for key in parts[1:]:
+            padded = f" {key} "
+            contained = [name.key for name in self.names if self._contains(padded, name)]
+            if contained:
+                return self._place(self.exact[max(contained, key=len)], 1.0)
+        for key in parts[1:]:
+            place, score = self.match(key)
+            if place is not None and score >= self.min_score:
+                return self._place(place, score)
+        return None
+
+    @staticmethod
+    def _contains(padded, name):
+        """Whether a padded part mentions name, and not a road or the like
+        named after it"""
+        start = padded.find(f" {name.key} ")
+        if start < 0:
+            return False
+        following = padded[start + len(name.key) + 2:].split()
+        kind = following and generic_word(following[0])
+        return not kind or kind in name.generic
+
+    @staticmethod
+    def _place(place, score):
+        if haversine(*SERVICE_CENTRE, place['lat'], place['lng']) > SERVICE_RADIUS_KM:
+            return None
+        return Place(place['name'], place['kind'], place['lat'], place['lng'], round(score, 3))
+
+    def coords(self, text):
+        """(lat, lng) for a free-text location, or None"""
+        place = self.resolve(text)
+        return (place.lat, place.lng) if place else None
+
+gazetteer = Gazetteer.load()
@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from hirewise_http import http_client, requests
+
+NOMINATIM_URL = os.environ.get('HIREWISE_NOMINATIM_URL', 'https://nominatim.openstreetmap.org')
+GEOCODE_TIMEOUT = 5
+# Nominatim's usage policy allows at most one request per second; the
+# spacing is kept in this file so all processes on the host share it
+NOMINATIM_INTERVAL = 1.0
+NOMINATIM_RATE_FILE = os.environ.get('HIREWISE_NOMINATIM_RATE_FILE', 'hirewise_nominatim.lock')
+
+IP_LOCATION_URL = os.environ.get('HIREWISE_IP_LOCATION_URL', 'https://ipapi.co/json/')
+IP_LOCATION_TIMEOUT = 5
+
+GEOCODE_CACHE_FILE = 'hirewise_geocode_cache.db'
+GEOCODE_CACHE_SIZE = 10000
+GEOCODE_CACHE_TTL = 30 * 24 * 3600  # 30 days
+# 4 decimal places is about 11 m, roughly one building
+GEOCODE_PRECISION = 4
+# How often a hit refreshes an entry's last-access time on disk
+TOUCH_INTERVAL = 3600
+
+class GeocodeCache:
+    """LRU cache of reverse geocoding results with a TTL, backed by SQLite.
+
+    Entries are keyed on coordinates rounded to `precision` decimal places
+    (plus the Nominatim zoom level), so repeated logins from the same
+    building share one lookup; forward lookups use their own 'q:' keys.
+    Recently used entries are kept in memory, and the SQLite file keeps
+    results across restarts and is shared by every process using the same
+    path. Pass path=None for a memory-only cache.
+    """
+
+    def __init__(self, path=GEOCODE_CACHE_FILE, max_entries=GEOCODE_CACHE_SIZE, ttl=GEOCODE_CACHE_TTL,
+                 precision=GEOCODE_PRECISION):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._memory = OrderedDict()  # key -> [created, value, touched], least recently used first
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None and self.path:
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_geocode_accessed ON geocode (accessed)")
+            self._db.commit()
+        return self._db
+
+    def key(self, lat, lng, zoom=18):
+        return f"{round(float(lat), self.precision):.{self.precision}f},{round(float(lng), self.precision):.{self.precision}f},{zoom}"
+
+    def get(self, lat, lng, zoom=18):
+        """Cached value for the coordinates, or None on a miss"""
+        return self.lookup(self.key(lat, lng, zoom))
+
+    def lookup(self, key):
+        """Cached value for any key, e.g. a forward geocoding query"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._conn() is not None:
+                row = self._db.execute("SELECT created, value, accessed FROM geocode WHERE key = ?",
+                                       (key,)).fetchone()
+                if row:
+                    entry = [row[0], json.loads(row[1]), row[2]]
+                    self._remember(key, entry)
+
+            if entry is not None and now - entry[0] > self.ttl:
+                self.expired += 1
+                self._forget(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._memory.move_to_end(key)
+            if self._db is not None and now - entry[2] > TOUCH_INTERVAL:
+                # Keep the on-disk LRU order roughly current without a write per hit
+                entry[2] = now
+                self._db.execute("UPDATE geocode SET accessed = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            return entry[1]
+
+    def put(self, lat, lng, value, zoom=18):
+        self.store(self.key(lat, lng, zoom), value)
+
+    def store(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, [now, value, now])
+            if self._conn() is not None:
+                self._db.execute("INSERT OR REPLACE INTO geocode (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                                 (key, json.dumps(value), now, now))
+                # Evict the least recently used rows beyond max_entries
+                count = self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self._db.execute(
+                        "DELETE FROM geocode WHERE key IN "
+                        "(SELECT key FROM geocode ORDER BY accessed LIMIT ?)", (count - self.max_entries,))
+                    self.evictions += cursor.rowcount
+                self._db.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            if self._db is None:
+                self.evictions += 1
+
+    def _forget(self, key):
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM geocode WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn() is not None:
+                self._db.execute("DELETE FROM geocode")
+                self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+def reverse_geocode_address(lat, lng, zoom=18, cache=None, timeout=None):
+    """Nominatim 'address' dict for the coordinates, or None if the lookup
+    failed. Results, including empty ones, are cached; failures are not."""
+    cache = geocode_cache if cache is None else cache
+    address = cache.get(lat, lng, zoom)
+    if address is not None:
+        return address
+    if http_client is None:
+        return None
+
+    try:
+        response = http_client.get(f"{NOMINATIM_URL}/reverse",
+                                   params={'format': 'json', 'lat': lat, 'lon': lng, 'zoom': zoom, 'addressdetails': 1},
+                                   **({'timeout': timeout} if timeout else {}))
+        if response.status_code != 200:
+            return None
+        address = response.json().get('address', {})
+    except (requests.RequestException, ValueError):
+        return None
+
+    cache.put(lat, lng, address, zoom)
+    return address
+
+def geocode_address(text, cache=None, timeout=None):
+    """(lat, lng) for a free-text address in Kenya from Nominatim, or None.
+    Addresses Nominatim cannot find are cached too, so they are not retried
+    until the entry expires; failed lookups are not cached."""
+    query = " ".join(str(text).split())
+    if not query:
+        return None
+    cache = geocode_cache if cache is None else cache
+    key = f"q:{query.lower()}"
+    coords = cache.lookup(key)
+    if coords is not None:
+        return tuple(coords) or None
+    if http_client is None:
+        return None
+
+    try:
+        response = http_client.get(f"{NOMINATIM_URL}/search",
+                                   params={'format': 'json', 'q': query, 'countrycodes': 'ke', 'limit': 1},
+                                   **({'timeout': timeout} if timeout else {}))
+        if response.status_code != 200:
+            return None
+        results = response.json()
+        coords = [float(results[0]['lat']), float(results[0]['lon'])] if results else []
+    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError):
+        return None
+
+    cache.store(key, coords)
+    return tuple(coords) or None
+
+def ip_location():
+    """Approximate (lat, lng) of this machine from its public IP, or None"""
+    if http_client is None:
+        return None
+    try:
+        response = http_client.get(IP_LOCATION_URL)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        lat, lng = data.get('latitude'), data.get('longitude')
+    except (requests.RequestException, ValueError):
+        return None
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+geocode_cache = GeocodeCache()
+
+if http_client is not None:
+    http_client.configure(urlsplit(NOMINATIM_URL).netloc, timeout=GEOCODE_TIMEOUT, min_interval=NOMINATIM_INTERVAL,
+                          rate_file=NOMINATIM_RATE_FILE)
+    http_client.configure(urlsplit(IP_LOCATION_URL).netloc, timeout=IP_LOCATION_TIMEOUT)
@@ -1,30 +1,199 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import math
 import random
+from hirewise_store import store
+from hirewise_gazetteer import gazetteer
+from hirewise_spatial import EARTH_RADIUS_KM, KM_PER_DEGREE, CachedGeoIndex, GeoIndex, record_coords
+from hirewise_geocode import reverse_geocode_address, ip_location
+from hirewise_tasks import BackgroundTasks
+
+from hirewise_http import http_client
+
+# IP location and reverse geocoding go through the shared HTTP client
+GPS_AVAILABLE = http_client is not None
 
 try:
-    import requests
-    import geocoder
-    GPS_AVAILABLE = True
+    import numpy as np
 except ImportError:
-    GPS_AVAILABLE = False
+    np = None
+
+# Sample GPS coordinates for Nairobi areas
+NAIROBI_AREAS = {
+    "Westlands": {"lat": -1.2676, "lng": 36.8108},
+    "Karen": {"lat": -1.3197, "lng": 36.6859},
+    "Kilimani": {"lat": -1.2921, "lng": 36.7872},
+    "CBD": {"lat": -1.2864, "lng": 36.8172},
+    "Kasarani": {"lat": -1.2258, "lng": 36.8969},
+    "Embakasi": {"lat": -1.3031, "lng": 36.8929}
+}
+
+# Providers listed on the Nearest Providers screen
+NEAREST_LIMIT = 100
+
+# Distance matrix defaults: pairs further apart are left out, and distances
+# are computed in MATRIX_BLOCK x MATRIX_BLOCK tiles to bound memory
+MATRIX_MAX_KM = 5.0
+MATRIX_BLOCK = 512
+
+def haversine_km(lat, lng, lats_rad, lngs_rad, cos_lats):
+    """Distances in km from one point to arrays of points in radians.
+    cos_lats is np.cos(lats_rad), passed in so callers can precompute it."""
+    lat_rad = math.radians(lat)
+    sin_dlat = np.sin((lats_rad - lat_rad) * 0.5)
+    sin_dlng = np.sin((lngs_rad - math.radians(lng)) * 0.5)
+    a = sin_dlat * sin_dlat + math.cos(lat_rad) * cos_lats * sin_dlng * sin_dlng
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def professional_coords(pro_id, pro):
+    """A professional's saved coordinates. Profiles saved before coordinates
+    were stored fall back to their location text in the gazetteer, then the CBD."""
+    if pro.get('lat') is not None and pro.get('lng') is not None:
+        return float(pro['lat']), float(pro['lng'])
+    coords = gazetteer.coords(pro.get('location'))
+    if coords is None:
+        area = NAIROBI_AREAS['CBD']
+        return area['lat'], area['lng']
+    return coords
+
+def distance_matrix(origins, targets, max_km=MATRIX_MAX_KM, block_size=MATRIX_BLOCK):
+    """Sparse distances between two sets of points, yielded in chunks.
+
+    origins and targets are sequences of (id, lat, lng). Yields lists of
+    (origin_id, target_id, km) for every pair within max_km (every pair when
+    max_km is None). Both sets are sorted by latitude, so each block of
+    origins is only compared with the band of targets that can be in range.
+    Within a tile, candidates are picked with one matrix product of unit
+    vectors and only those get an exact haversine distance. Each chunk
+    holds at most block_size * block_size pairs.
+    """
+    if not origins or not targets:
+        return
+    if np is None:
+        yield from _distance_matrix_scalar(origins, targets, max_km, block_size)
+        return
+
+    origin_ids, origin_lats, origin_lats_rad, origin_lngs_rad, origin_cos, origin_xyz = _matrix_arrays(origins)
+    target_ids, target_lats, target_lats_rad, target_lngs_rad, target_cos, target_xyz = _matrix_arrays(targets)
+
+    if max_km is not None:
+        # A degree of latitude is never shorter than KM_PER_DEGREE along the surface
+        lat_margin = max_km / KM_PER_DEGREE
+        # Points within max_km have unit vectors with at least this dot product;
+        # the slack absorbs rounding, and survivors get an exact haversine
+        min_dot = math.cos(min(max_km / EARTH_RADIUS_KM, math.pi)) - 1e-9
+
+    for o_start in range(0, len(origin_ids), block_size):
+        o_end = min(o_start + block_size, len(origin_ids))
+        t_lo, t_hi = 0, len(target_ids)
+        if max_km is not None:
+            t_lo = int(np.searchsorted(target_lats, origin_lats[o_start] - lat_margin, 'left'))
+            t_hi = int(np.searchsorted(target_lats, origin_lats[o_end - 1] + lat_margin, 'right'))
+
+        for t_start in range(t_lo, t_hi, block_size):
+            t_end = min(t_start + block_size, t_hi)
+            if max_km is None:
+                rows, cols = np.indices((o_end - o_start, t_end - t_start)).reshape(2, -1)
+            else:
+                rows, cols = np.nonzero(origin_xyz[o_start:o_end] @ target_xyz[t_start:t_end].T >= min_dot)
+            rows += o_start
+            cols += t_start
+
+            sin_dlat = np.sin((target_lats_rad[cols] - origin_lats_rad[rows]) * 0.5)
+            sin_dlng = np.sin((target_lngs_rad[cols] - origin_lngs_rad[rows]) * 0.5)
+            a = sin_dlat * sin_dlat + origin_cos[rows] * target_cos[cols] * sin_dlng * sin_dlng
+            distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            if max_km is not None:
+                keep = distances <= max_km
+                rows, cols, distances = rows[keep], cols[keep], distances[keep]
+            if len(distances):
+                yield list(zip(origin_ids[rows].tolist(), target_ids[cols].tolist(), distances.tolist()))
+
+def _matrix_arrays(points):
+    """Arrays over (id, lat, lng) points sorted by latitude"""
+    points = sorted(points, key=lambda point: point[1])
+    ids = np.array([point[0] for point in points], dtype=object)
+    lats = np.array([point[1] for point in points], dtype=np.float64)
+    lats_rad = np.radians(lats)
+    lngs_rad = np.radians(np.array([point[2] for point in points], dtype=np.float64))
+    cos_lats = np.cos(lats_rad)
+    xyz = np.column_stack((cos_lats * np.cos(lngs_rad), cos_lats * np.sin(lngs_rad), np.sin(lats_rad)))
+    return ids, lats, lats_rad, lngs_rad, cos_lats, xyz
+
+def _distance_matrix_scalar(origins, targets, max_km, block_size):
+    """distance_matrix() without numpy, using the grid index for the radius search"""
+    index = GeoIndex('@matrix', {target_id: {'lat': lat, 'lng': lng} for target_id, lat, lng in targets})
+    if max_km is None:
+        max_km = math.pi * EARTH_RADIUS_KM
+    chunk_size = block_size * block_size
+    chunk = []
+    for origin_id, lat, lng in origins:
+        chunk.extend((origin_id, target_id, distance) for target_id, distance in index.within(lat, lng, max_km))
+        while len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            chunk = chunk[chunk_size:]
+    if chunk:
+        yield chunk
+
+class ProfessionalArrays:
+    """Professional ids, coordinates and services as contiguous arrays,
+    so distances to all of them can be computed in one vectorized call"""
+
+    def __init__(self, professionals_data, coords_for):
+        self.ids = list(professionals_data)
+        count = len(self.ids)
+        lats = np.empty(count, dtype=np.float64)
+        lngs = np.empty(count, dtype=np.float64)
+        self.service_codes = {}
+        services = np.empty(count, dtype=np.int32)
+        for i, pro in enumerate(professionals_data.values()):
+            lats[i], lngs[i] = coords_for(pro)
+            services[i] = self.service_codes.setdefault(pro.get('service'), len(self.service_codes))
+        self.lats_rad = np.radians(lats)
+        self.lngs_rad = np.radians(lngs)
+        self.cos_lats = np.cos(self.lats_rad)
+        self.services = services
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances(self, lat, lng):
+        return haversine_km(lat, lng, self.lats_rad, self.lngs_rad, self.cos_lats)
+
+    def nearest(self, lat, lng, service_type=None, limit=None):
+        """(index, distance) pairs of the closest professionals, nearest first"""
+        distances = self.distances(lat, lng)
+        candidates = None
+        if service_type and service_type != "All":
+            code = self.service_codes.get(service_type)
+            if code is None:
+                return []
+            candidates = np.flatnonzero(self.services == code)
+            distances = distances[candidates]
+
+        if limit is not None and limit < len(distances):
+            # Partial selection of the k nearest, then sort only those
+            top = np.argpartition(distances, limit - 1)[:limit]
+            order = top[np.argsort(distances[top], kind='stable')]
+        else:
+            order = np.argsort(distances, kind='stable')
+
+        indexes = order if candidates is None else candidates[order]
+        return list(zip(indexes.tolist(), distances[order].tolist()))
 
 class HireWiseGPS:
     def __init__(self):
-        # Sample GPS coordinates for Nairobi areas
-        self.locations = {
-            "Westlands": {"lat": -1.2676, "lng": 36.8108},
-            "Karen": {"lat": -1.3197, "lng": 36.6859},
-            "Kilimani": {"lat": -1.2921, "lng": 36.7872},
-            "CBD": {"lat": -1.2864, "lng": 36.8172},
-            "Kasarani": {"lat": -1.2258, "lng": 36.8969},
-            "Embakasi": {"lat": -1.3031, "lng": 36.8929}
-        }
+        self.locations = NAIROBI_AREAS
+        self.store = store
         
         # Current user location (simulated)
         self.current_location = {"lat": -1.2921, "lng": 36.7872}  # Kilimani
+        
+        # (professionals dict, store version, ProfessionalArrays) of the last search
+        self._arrays = None
+        
+        # Background worker for location lookups, created with the first window
+        self.tasks = None
     
     def calculate_distance(self, lat1, lng1, lat2, lng2):
         """Calculate distance between two GPS coordinates in km"""
@@ -44,32 +213,34 @@ class HireWiseGPS:
     
     def get_precise_address_location(self):
         """Get precise apartment-level GPS location"""
+        address, coords = self.detect_location()
+        self.current_location = coords
+        return address, self.current_location
+    
+    def detect_location(self):
+        """Look up (address, coords) without changing current_location,
+        so it can run in a background worker"""
         if GPS_AVAILABLE:
             try:
-                g = geocoder.ip('me')
-                if g.ok:
-                    lat, lng = g.latlng
-                    address = self.reverse_geocode(lat, lng)
-                    self.current_location = {"lat": lat, "lng": lng}
-                    return address, self.current_location
+                coords = ip_location()
+                if coords is not None:
+                    lat, lng = coords
+                    return self.reverse_geocode(lat, lng), {"lat": lat, "lng": lng}
             except:
                 pass
         
         # Fallback to simulated precise location
         lat = -1.2921 + random.uniform(-0.001, 0.001)
         lng = 36.7872 + random.uniform(-0.001, 0.001)
-        address = self.reverse_geocode(lat, lng)
-        self.current_location = {"lat": lat, "lng": lng}
-        return address, self.current_location
+        return self.reverse_geocode(lat, lng), {"lat": lat, "lng": lng}
     
     def reverse_geocode(self, lat, lng):
         if GPS_AVAILABLE:
             try:
-                url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lng}&zoom=19&addressdetails=1"
-                response = requests.get(url, headers={'User-Agent': 'HireWise/1.0'})
-                data = response.json()
-                
-                address = data.get('address', {})
+                # Cached, and bounded by a timeout
+                address = reverse_geocode_address(lat, lng, zoom=19)
+                if address is None:
+                    raise ValueError("reverse geocoding failed")
                 
                 # Try apartment/unit identifiers
                 apartment = (address.get('apartment') or address.get('unit') or 
@@ -105,8 +276,63 @@ class HireWiseGPS:
         
         return f"Apt {apt}, {building}, {road}"
     
-    def find_nearest_professionals(self, professionals_data, service_type=None):
-        """Find professionals sorted by distance"""
+    def professional_coords(self, pro):
+        return professional_coords(None, pro)
+    
+    def job_distance_matrix(self, max_km=MATRIX_MAX_KM, service_type=None, match_service=True,
+                            block_size=MATRIX_BLOCK):
+        """Distances from every open job to every professional within max_km,
+        yielded in chunks of (job_id, pro_id, km) for dispatch planning.
+        With match_service, jobs are only paired with professionals offering
+        the job's service. Open jobs without coordinates are left out."""
+        professionals = self.store.load('professionals')
+        job_groups = {}
+        for job_id, job in self.store.find('jobs', status='Open').items():
+            if service_type and service_type != "All" and job.get('service') != service_type:
+                continue
+            coords = record_coords(job_id, job)
+            if coords is not None:
+                group = job.get('service') if match_service else service_type
+                job_groups.setdefault(group, []).append((job_id,) + coords)
+        
+        for service, jobs in job_groups.items():
+            pros = [(pro_id,) + professional_coords(pro_id, pro) for pro_id, pro in professionals.items()
+                    if not service or service == "All" or pro.get('service') == service]
+            yield from distance_matrix(jobs, pros, max_km, block_size)
+    
+    def nearby_professionals(self, service_type=None, limit=NEAREST_LIMIT, radius_km=None,
+                             professionals_file=None):
+        """Professionals nearest the current location from the spatial
+        index, only measuring distances in the grid cells around it.
+        Results are cached per geohash cell and service, so refreshing
+        after moving a few metres reuses them until a professional nearby
+        changes. With radius_km, all professionals within that radius instead."""
+        lat = self.current_location["lat"]
+        lng = self.current_location["lng"]
+        
+        def query(index, professionals):
+            accept = None
+            if service_type and service_type != "All":
+                accept = lambda pro_id: professionals[pro_id].get('service') == service_type
+            if radius_km is not None:
+                hits = index.within(lat, lng, radius_km, accept)[:limit]
+            else:
+                hits = index.nearest_cached(lat, lng, limit, accept, service_type if accept else None)
+            return [dict(professionals[pro_id], distance=round(distance, 1), id=pro_id)
+                    for pro_id, distance in hits]
+        
+        if professionals_file:
+            return self.store.query_index_file(professionals_file, '@geo', query, professional_coords,
+                                               CachedGeoIndex)
+        return self.store.query_index('professionals', '@geo', query, professional_coords, CachedGeoIndex)
+    
+    def find_nearest_professionals(self, professionals_data, service_type=None, limit=None, version=None):
+        """Find professionals sorted by distance, optionally only the nearest `limit`.
+        Pass the store version of professionals_data to reuse the coordinate
+        arrays between searches until the data changes."""
+        if np is not None:
+            return self._find_nearest_vectorized(professionals_data, service_type, limit, version)
+        
         current_lat = self.current_location["lat"]
         current_lng = self.current_location["lng"]
         
@@ -114,13 +340,10 @@ class HireWiseGPS:
         
         for pro_id, pro in professionals_data.items():
             # Get professional's location coordinates
-            pro_location = self.locations.get(pro['location'], self.locations['CBD'])
+            pro_lat, pro_lng = self.professional_coords(pro)
             
             # Calculate distance
-            distance = self.calculate_distance(
-                current_lat, current_lng,
-                pro_location['lat'], pro_location['lng']
-            )
+            distance = self.calculate_distance(current_lat, current_lng, pro_lat, pro_lng)
             
             # Filter by service type if specified
             if service_type and service_type != "All" and pro['service'] != service_type:
@@ -132,7 +355,25 @@ class HireWiseGPS:
             professionals_with_distance.append(pro_with_distance)
         
         # Sort by distance
-        return sorted(professionals_with_distance, key=lambda x: x['distance'])
+        professionals_with_distance.sort(key=lambda x: x['distance'])
+        return professionals_with_distance[:limit]
+    
+    def _find_nearest_vectorized(self, professionals_data, service_type, limit, version):
+        cached = self._arrays
+        if (version is not None and cached and cached[0] is professionals_data and cached[1] == version):
+            arrays = cached[2]
+        else:
+            arrays = ProfessionalArrays(professionals_data, self.professional_coords)
+            self._arrays = (professionals_data, version, arrays) if version is not None else None
+        nearest = arrays.nearest(self.current_location["lat"], self.current_location["lng"],
+                                 service_type, limit)
+        
+        # Only the returned professionals are copied
+        results = []
+        for index, distance in nearest:
+            pro_id = arrays.ids[index]
+            results.append(dict(professionals_data[pro_id], distance=round(distance, 1), id=pro_id))
+        return results
     
     def show_gps_professionals(self, root, professionals_file):
         """Show professionals sorted by GPS distance"""
@@ -145,14 +386,17 @@ class HireWiseGPS:
         
         ttk.Label(frame, text="📍 Nearest Service Providers", font=('Arial', 16, 'bold')).pack(pady=10)
         
-        # Current location display
-        current_address, current_coords = self.get_precise_address_location()
+        # Current location display; shows the last known position until
+        # the background lookup below finishes
+        current_coords = self.current_location
         location_frame = ttk.LabelFrame(frame, text="Your Precise Location", padding="10")
         location_frame.pack(fill='x', pady=10)
         
-        ttk.Label(location_frame, text=f"🏠 {current_address}", 
+        address_var = tk.StringVar(value="🏠 Detecting your location...")
+        coords_var = tk.StringVar(value=f"📍 GPS: {current_coords['lat']:.6f}, {current_coords['lng']:.6f}")
+        ttk.Label(location_frame, textvariable=address_var, 
                  font=('Arial', 12, 'bold')).pack(anchor='w')
-        ttk.Label(location_frame, text=f"📍 GPS: {current_coords['lat']:.6f}, {current_coords['lng']:.6f}", 
+        ttk.Label(location_frame, textvariable=coords_var, 
                  font=('Arial', 10)).pack(anchor='w')
         ttk.Label(location_frame, text="🎯 Apartment-level accuracy", 
                  font=('Arial', 9), foreground='green').pack(anchor='w')
@@ -171,7 +415,27 @@ class HireWiseGPS:
         def refresh_list():
             self.update_professionals_list(tree, professionals_file, service_var.get())
         
-        ttk.Button(filter_frame, text="🔄 Refresh Location", command=refresh_list).pack(side='left', padx=10)
+        def location_detected(result):
+            address, coords = result
+            if not gps_window.winfo_exists():
+                return
+            self.current_location = coords
+            address_var.set(f"🏠 {address}")
+            coords_var.set(f"📍 GPS: {coords['lat']:.6f}, {coords['lng']:.6f}")
+            refresh_list()
+        
+        def locate():
+            # Geolocation and reverse geocoding can take seconds; keep the window responsive
+            if self.tasks is None:
+                self.tasks = BackgroundTasks(root)
+            self.tasks.submit(self.detect_location, on_done=location_detected)
+        
+        def refresh_location():
+            address_var.set("🏠 Detecting your location...")
+            refresh_list()
+            locate()
+        
+        ttk.Button(filter_frame, text="🔄 Refresh Location", command=refresh_location).pack(side='left', padx=10)
         
         # Professionals list with distance
         list_frame = ttk.LabelFrame(frame, text="Service Providers by Distance", padding="10")
@@ -194,8 +458,9 @@ class HireWiseGPS:
         
         tree.pack(expand=True, fill='both')
         
-        # Initial load
+        # Initial load from the last known position, then again once located
         self.update_professionals_list(tree, professionals_file, "All")
+        locate()
         
         # Action buttons
         action_frame = ttk.Frame(frame)
@@ -234,12 +499,9 @@ class HireWiseGPS:
         for item in tree.get_children():
             tree.delete(item)
         
-        # Load professionals
-        with open(professionals_file, 'r') as f:
-            professionals = json.load(f)
-        
-        # Get nearest professionals
-        nearest_pros = self.find_nearest_professionals(professionals, service_filter)
+        # Get nearest professionals from the spatial index
+        nearest_pros = self.nearby_professionals(service_filter, NEAREST_LIMIT,
+                                                 professionals_file=professionals_file)
         
         # Populate tree
         for pro in nearest_pros:
@@ -0,0 +1,194 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+DEFAULT_TIMEOUT = 5
+POOL_SIZE = 10
+USER_AGENT = 'HireWise/1.0'
+
+# Consecutive failures that open a host's circuit, and how long it stays open
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30
+# A shared next slot further ahead than this means the clock went back
+MAX_SLOT_AHEAD = 3600
+
+_RequestException = requests.RequestException if requests else OSError
+
+class CircuitOpenError(_RequestException):
+    """Raised instead of calling a host whose circuit is open"""
+
+class CircuitBreaker:
+    """Fails fast after repeated failures instead of waiting out a timeout
+    on every call to a provider that is down.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused for `reset_timeout` seconds. Then one trial call is
+    let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+class RateLimiter:
+    """Spaces calls at least `min_interval` seconds apart across threads.
+
+    With a path, the next free slot is kept in that file under an
+    exclusive lock, so every process using the same file (e.g. each
+    gunicorn worker) shares one budget. Without fcntl the limit is per
+    process.
+    """
+
+    def __init__(self, min_interval, path=None):
+        self.min_interval = min_interval
+        self.path = path if fcntl is not None else None
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            if self.path is None:
+                now = time.monotonic()
+                slot = max(now, self._next)
+                self._next = slot + self.min_interval
+            else:
+                now, slot = self._reserve_shared()
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _reserve_shared(self):
+        """(now, slot) with the slot claimed in the shared file; wall-clock
+        time, since monotonic clocks are not comparable across processes"""
+        with open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                now = time.time()
+                try:
+                    next_slot = float(f.read() or 0)
+                except ValueError:
+                    next_slot = 0.0
+                if next_slot > now + MAX_SLOT_AHEAD:
+                    next_slot = 0.0
+                slot = max(now, next_slot)
+                f.seek(0)
+                f.truncate()
+                f.write(repr(slot + self.min_interval))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return now, slot
+
+class HttpClient:
+    """One pooled keep-alive session for all external lookups.
+
+    Each host gets its own timeout, circuit breaker and optional rate
+    limit; configure() sets them. Connection errors, timeouts, 5xx and 429
+    responses count as failures. Requests to a host with an open circuit
+    raise CircuitOpenError at once.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, failure_threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT):
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeouts = {}
+        self.limiters = {}
+        self.breakers = {}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+
+    def configure(self, host, timeout=None, min_interval=None, rate_file=None):
+        """Set a host's timeout and minimum seconds between requests. With
+        rate_file the spacing is shared by every process using that file."""
+        if timeout is not None:
+            self.timeouts[host] = timeout
+        if min_interval is not None:
+            self.limiters[host] = RateLimiter(min_interval, rate_file)
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} is unavailable; not retrying for now")
+
+        limiter = self.limiters.get(host)
+        if limiter is not None:
+            limiter.wait()
+        kwargs.setdefault('timeout', self.timeouts.get(host, self.timeout))
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def close(self):
+        self.session.close()
+
+http_client = HttpClient() if requests else None
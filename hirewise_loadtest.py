@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+from hirewise_async import raise_open_file_limit
+from hirewise_bench import percentile
+from hirewise_datagen import generate_dataset
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (weight, method, path) per request type; POST bodies come from request_body()
+REQUEST_MIXES = {
+    'read': (
+        (30, 'GET', '/'),
+        (50, 'GET', '/api/professionals'),
+        (10, 'GET', '/api/professionals?service=Plumber&sort=price'),
+        (10, 'GET', '/api/professionals?min_rating=4&sort=name&limit=20'),
+    ),
+    'mixed': (
+        (25, 'GET', '/'),
+        (40, 'GET', '/api/professionals'),
+        (10, 'GET', '/api/professionals?service=Plumber&sort=price'),
+        (5, 'GET', '/api/professionals?min_rating=4&sort=name&limit=20'),
+        (12, 'POST', '/api/jobs'),
+        (8, 'POST', '/api/login'),
+    ),
+}
+DEFAULT_MIX = 'mixed'
+# Logins pick from this many accounts, so most update an existing user
+LOGIN_ACCOUNTS = 1000
+CONCURRENCY_LEVELS = (50, 500, 2000)
+DURATION = 10
+# New connections opened at once; more overflows the listen backlog
+CONNECT_BATCH = 200
+GUNICORN_WORKERS = 4
+GUNICORN_THREADS = 8
+STARTUP_TIMEOUT = 60
+
+def request_body(path, rng):
+    if path == '/api/jobs':
+        return {'service': rng.choice(['Plumber', 'Cleaner', 'Electrician']),
+                'description': f"Load test job {rng.randrange(10**9)}", 'budget': '50-100'}
+    account = rng.randrange(LOGIN_ACCOUNTS)
+    return {'name': f"Load Test {account}", 'email': f"loadtest{account}@example.com",
+            'contact': '0712345678', 'type': 'client'}
+
+def encode_request(host, method, path, rng):
+    if method == 'GET':
+        return (f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+                f"Connection: keep-alive\r\n\r\n").encode('latin-1')
+    body = json.dumps(request_body(path, rng)).encode('utf-8')
+    return (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n").encode('latin-1') + body
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    if status != 304:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+async def _client(host, port, mix, deadline, connect_slots, stats, rng):
+    """One keep-alive client sending requests back to back until the deadline"""
+    reader = writer = None
+    weights = [weight for weight, method, path in mix]
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                async with connect_slots:
+                    reader, writer = await asyncio.open_connection(host, port)
+                stats['connects'] += 1
+            _, method, path = rng.choices(mix, weights)[0]
+            start = time.perf_counter()
+            writer.write(encode_request(host, method, path, rng))
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+            kind = 'reads' if method == 'GET' else 'writes'
+            stats[kind].append(time.perf_counter() - start)
+            if status >= 400:
+                stats['errors'] += 1
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            stats['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+async def _load(host, port, connections, duration, mix, seed):
+    stats = {'reads': [], 'writes': [], 'errors': 0, 'connects': 0}
+    connect_slots = asyncio.Semaphore(CONNECT_BATCH)
+    deadline = time.monotonic() + duration
+    rng = random.Random(seed)
+    await asyncio.gather(*(_client(host, port, mix, deadline, connect_slots, stats,
+                                   random.Random(rng.random()))
+                           for _ in range(connections)))
+    return stats
+
+def _load_process(args):
+    raise_open_file_limit()
+    return asyncio.run(_load(*args))
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+def run_load(url, connections, duration=DURATION, mix=REQUEST_MIXES[DEFAULT_MIX], processes=1, seed=42):
+    """Hold `connections` keep-alive connections to url for `duration`
+    seconds, each sending requests from the weighted mix back to back, and
+    return the latency percentiles and throughput overall and for reads
+    and writes. The client is split across `processes` so a single client
+    process is not the bottleneck."""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    shares = [connections // processes + (i < connections % processes) for i in range(processes)]
+    jobs = [(host, port, share, duration, list(mix), seed + i) for i, share in enumerate(shares) if share]
+    if len(jobs) == 1:
+        results = [_load_process(jobs[0])]
+    else:
+        with Pool(len(jobs)) as pool:
+            results = pool.map(_load_process, jobs)
+
+    reads = [l for r in results for l in r['reads']]
+    writes = [l for r in results for l in r['writes']]
+    summary = summarize(reads + writes)
+    return dict(summary, connections=connections,
+                errors=sum(r['errors'] for r in results),
+                connects=sum(r['connects'] for r in results),
+                requests_per_sec=round(summary['requests'] / duration, 1),
+                reads=summarize(reads), writes=summarize(writes))
+
+def process_tree_rss(pid):
+    """Resident memory in MB of a process and its children (Linux only)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending += [int(child) for child in f.read().split()]
+        except (OSError, ValueError):
+            continue
+    return round(total / 1024, 1) if total else None
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, process, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on port {port} within {timeout}s")
+
+def start_server(kind, data_dir, port, gunicorn_workers=GUNICORN_WORKERS, gunicorn_threads=GUNICORN_THREADS):
+    """Start the Flask app under gunicorn or the asyncio server, serving the
+    JSON store in data_dir"""
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--chdir', data_dir, '--pythonpath', ROOT,
+                   '--workers', str(gunicorn_workers), '--worker-class', 'gthread',
+                   '--threads', str(gunicorn_threads), '--backlog', '2048',
+                   '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'hirewise_web:app']
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'hirewise_async.py'),
+                   '--host', '127.0.0.1', '--port', str(port)]
+    process = subprocess.Popen(command, cwd=data_dir, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process)
+    except Exception:
+        process.kill()
+        raise
+    return process
+
+def compare(size=1000, levels=CONCURRENCY_LEVELS, duration=DURATION, mix=REQUEST_MIXES[DEFAULT_MIX], processes=2,
+            gunicorn_workers=GUNICORN_WORKERS, gunicorn_threads=GUNICORN_THREADS, verbose=True):
+    """Run the same load against gunicorn/Flask and the asyncio server on a
+    generated dataset"""
+    data_dir = tempfile.mkdtemp(prefix='hirewise_loadtest_')
+    results = {}
+    try:
+        generate_dataset(data_dir, size)
+        for kind in ('gunicorn', 'async'):
+            port = free_port()
+            server = start_server(kind, data_dir, port, gunicorn_workers, gunicorn_threads)
+            try:
+                # Warm up caches before measuring
+                run_load(f'http://127.0.0.1:{port}', 10, 1, mix)
+                results[kind] = []
+                for connections in levels:
+                    result = run_load(f'http://127.0.0.1:{port}', connections, duration, mix, processes)
+                    result['server_rss_mb'] = process_tree_rss(server.pid)
+                    results[kind].append(result)
+                    if verbose:
+                        print(f"  {kind:<9} {connections:>6} conns  {result['requests_per_sec']:>9.1f} req/s  "
+                              f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  "
+                              f"write p99 {result['writes']['p99_ms']} ms  "
+                              f"errors {result['errors']}  rss {result['server_rss_mb']} MB")
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the HireWise web servers")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Load test a running server")
+    run_parser.add_argument('url', help="Base URL, e.g. http://127.0.0.1:8000")
+    run_parser.add_argument('--connections', type=int, default=CONCURRENCY_LEVELS[0])
+
+    compare_parser = subparsers.add_parser('compare', help="Compare gunicorn/Flask with the asyncio server")
+    compare_parser.add_argument('--size', type=int, default=1000, help="Generated dataset size")
+    compare_parser.add_argument('--connections', default=','.join(map(str, CONCURRENCY_LEVELS)),
+                                help="Comma-separated connection counts (default %(default)s)")
+    compare_parser.add_argument('--gunicorn-workers', type=int, default=GUNICORN_WORKERS)
+    compare_parser.add_argument('--gunicorn-threads', type=int, default=GUNICORN_THREADS)
+    compare_parser.add_argument('--output', help="Write results as JSON to this file")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--duration', type=float, default=DURATION, help="Seconds per run")
+        sub.add_argument('--processes', type=int, default=2, help="Client processes")
+        sub.add_argument('--mix', choices=sorted(REQUEST_MIXES), default=DEFAULT_MIX,
+                         help="Request mix; 'mixed' includes job posts and logins (default %(default)s)")
+    args = parser.parse_args()
+
+    mix = REQUEST_MIXES[args.mix]
+    raise_open_file_limit()
+    if args.command == 'run':
+        print(json.dumps(run_load(args.url, args.connections, args.duration, mix, args.processes), indent=2))
+    else:
+        levels = [int(n) for n in args.connections.split(',')]
+        results = compare(args.size, levels, args.duration, mix, args.processes,
+                          args.gunicorn_workers, args.gunicorn_threads)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import os
 from datetime import datetime
 import uuid
 import random
+from hirewise_store import store
 
 # Phase 2 Add-on Features for HireWise
 class HireWisePhase2Features:
@@ -16,10 +15,7 @@ class HireWisePhase2Features:
         self.skill_badges_file = "hirewise_skill_badges.json"
         
         # Initialize data files
-        for file in [self.referrals_file, self.video_calls_file, self.ai_suggestions_file, self.skill_badges_file]:
-            if not os.path.exists(file):
-                with open(file, 'w') as f:
-                    json.dump({}, f)
+        store.ensure_files([self.referrals_file, self.video_calls_file, self.ai_suggestions_file, self.skill_badges_file])
     
     def show_video_call_verification(self, professional_email):
         """In-app video call for client-pro verification"""
@@ -47,11 +43,8 @@ class HireWisePhase2Features:
         def start_call():
             messagebox.showinfo("Video Call", f"Connecting to {professional_email}...")
             # Save call record
-            with open(self.video_calls_file, 'r') as f:
-                calls = json.load(f)
-            
             call_id = str(uuid.uuid4())[:8]
-            calls[call_id] = {
+            store.put_file(self.video_calls_file, call_id, {
                 "id": call_id,
                 "client": "current_user_email",
                 "professional": professional_email,
@@ -59,10 +52,7 @@ class HireWisePhase2Features:
                 "duration": "5:30",
                 "verification_result": "Verified",
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.video_calls_file, 'w') as f:
-                json.dump(calls, f)
+            })
         
         def end_call():
             messagebox.showinfo("Call Ended", "Professional verified successfully!")
@@ -228,21 +218,15 @@ class HireWisePhase2Features:
             messagebox.showinfo("Verification", f"Verification request sent to {inst_combo.get()}!\nYou'll receive confirmation within 24 hours.")
             
             # Save verification record
-            with open(self.skill_badges_file, 'r') as f:
-                badges = json.load(f)
-            
             badge_id = str(uuid.uuid4())[:8]
-            badges[badge_id] = {
+            store.put_file(self.skill_badges_file, badge_id, {
                 "id": badge_id,
                 "user": "current_user_email",
                 "institution": inst_combo.get(),
                 "certificate_id": cert_entry.get(),
                 "status": "Pending",
                 "created": datetime.now().isoformat()
-            }
-            
-            with open(self.skill_badges_file, 'w') as f:
-                json.dump(badges, f)
+            })
         
         ttk.Button(verify_frame, text="Submit for Verification", command=verify_skill).pack(pady=10)
     
@@ -0,0 +1,19 @@
+import sys
+
+# Fields of each collection that hold a small set of repeated values
+# (status, service, ...). The stores intern them when they parse or apply a
+# record, so all records share one string object per value.
+INTERNED_FIELDS = {
+    'jobs': ('service', 'budget', 'timing', 'status'),
+    'quotes': ('availability', 'status'),
+    'professionals': ('service', 'price', 'location', 'status'),
+    'users': ('location', 'type')
+}
+
+def intern_fields(record, fields):
+    """Intern the enum-like string values of a record dict in place"""
+    for field in fields:
+        value = record.get(field)
+        if type(value) is str:
+            record[field] = sys.intern(value)
+    return record
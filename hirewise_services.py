@@ -0,0 +1,409 @@
+import base64
+import bisect
+import json
+import re
+import uuid
+from datetime import datetime
+
+from hirewise_gazetteer import gazetteer
+from hirewise_spatial import GeoIndex, record_coords
+from hirewise_store import store
+
+# Jobs shown on the Nearest Jobs screen
+NEAREST_JOBS_LIMIT = 50
+
+# Professional search pages
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+PROFESSIONAL_SORTS = ('rating', 'price', 'name')
+
+def _new_id():
+    return str(uuid.uuid4())[:8]
+
+def open_job_coords(job_id, job):
+    """Coordinates of an open job; assigned and completed jobs are left
+    out of the open-jobs spatial index"""
+    return record_coords(job_id, job) if job.get('status') == 'Open' else None
+
+class JobService:
+    """Posting and listing jobs"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def post_job(self, client, service, description, budget, timing=None, lat=None, lng=None):
+        """Create an open job and return (job_id, job). Without explicit
+        coordinates the job is placed at the client's saved location."""
+        if (lat is None or lng is None) and client:
+            coords = record_coords(None, self.store.get_by_email('users', client)[1] or {})
+            if coords:
+                lat, lng = coords
+        job_id = _new_id()
+        job = {
+            "id": job_id,
+            "client": client,
+            "service": service,
+            "description": description,
+            "budget": budget,
+            "timing": timing,
+            "status": "Open",
+            "lat": lat,
+            "lng": lng,
+            "created": datetime.now().isoformat()
+        }
+        # Fields the caller has no value for (e.g. timing from the web API) are left out
+        job = {key: value for key, value in job.items() if value is not None}
+        self.store.put('jobs', job_id, job)
+        return job_id, job
+
+    def open_jobs(self):
+        return self.store.find('jobs', status='Open')
+
+    def client_jobs(self, client):
+        return self.store.find('jobs', client=client)
+
+    def nearest_open_jobs(self, lat, lng, limit=NEAREST_JOBS_LIMIT, service=None):
+        """The open jobs closest to (lat, lng), nearest first, as job dicts
+        with 'id' and 'distance' (km). Answered from a spatial index over
+        open jobs that every job update keeps current; jobs posted without
+        coordinates are not ranked."""
+        def query(index, jobs):
+            accept = None
+            if service and service != "All":
+                accept = lambda job_id: jobs[job_id].get('service') == service
+            return [dict(jobs[job_id], id=job_id, distance=round(distance, 1))
+                    for job_id, distance in index.nearest(lat, lng, limit, accept)]
+        return self.store.query_index('jobs', '@open_geo', query, open_job_coords, GeoIndex)
+
+    def available_jobs(self):
+        """Open jobs joined to their clients, as (job_id, job, client) tuples"""
+        jobs = self.open_jobs()
+        clients = self.store.get_by_emails('users', [job.get('client', '') for job in jobs.values()])
+        return [(job_id, job, clients.get(job.get('client', ''), (None, {}))[1])
+                for job_id, job in jobs.items()]
+
+class QuoteService:
+    """Sending, listing and accepting quotes"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def send_quote(self, job_id, professional, amount, message, availability):
+        quote_id = _new_id()
+        quote = {
+            "id": quote_id,
+            "job_id": job_id,
+            "professional": professional,
+            "amount": amount,
+            "message": message,
+            "availability": availability,
+            "status": "Sent",
+            "created": datetime.now().isoformat()
+        }
+        self.store.put('quotes', quote_id, quote)
+        return quote_id, quote
+
+    def job_quotes(self, job_id):
+        return self.store.find('quotes', job_id=job_id)
+
+    def professional_quotes(self, professional):
+        """A professional's quotes joined to their jobs and clients,
+        as (quote_id, quote, job, client) tuples"""
+        quotes = self.store.find('quotes', professional=professional)
+        jobs = self.store.get_many('jobs', [quote['job_id'] for quote in quotes.values()])
+        clients = self.store.get_by_emails('users', [job.get('client', '') for job in jobs.values()])
+        rows = []
+        for quote_id, quote in quotes.items():
+            job = jobs.get(quote['job_id'], {})
+            client = clients.get(job.get('client', ''), (None, {}))[1]
+            rows.append((quote_id, quote, job, client))
+        return rows
+
+    def accept_quote(self, job_id, professional):
+        """Assign an open job to a professional, accept their quote and reject
+        the others. Returns False if the job does not exist or was already
+        assigned; the check and the assignment happen under the store's
+        lock, so of two concurrent accepts only one succeeds."""
+        def assign(_, job):
+            if job.get('status', 'Open') != 'Open':
+                return None
+            return dict(job, status='Assigned', assigned_to=professional)
+        if not self.store.update_many('jobs', [job_id], assign):
+            return False
+
+        def decide(_, quote):
+            return dict(quote, status='Accepted' if quote['professional'] == professional else 'Rejected')
+        self.store.update_many('quotes', list(self.job_quotes(job_id)), decide)
+        return True
+
+def price_floor(price):
+    """Lower bound of a price band such as "50-100" or "500+", for sorting"""
+    match = re.match(r"\s*(\d+)", str(price or ""))
+    return int(match.group(1)) if match else float('inf')
+
+def professional_sort_key(sort, pro_id, pro):
+    """Keyset position of a professional in a sort order; ties break on id"""
+    if sort == 'rating':
+        return (-float(pro.get('rating') or 0), pro_id)
+    if sort == 'price':
+        return (price_floor(pro.get('price')), pro_id)
+    return (str(pro.get('name', '')).lower(), pro_id)
+
+def encode_cursor(sort, key):
+    return base64.urlsafe_b64encode(json.dumps([sort] + list(key)).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, sort):
+    """Sort key from an opaque cursor; ValueError if it is malformed or
+    belongs to another sort order"""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    position_type = str if sort == 'name' else (int, float)
+    if (not isinstance(value, list) or len(value) != 3 or value[0] != sort
+            or not isinstance(value[1], position_type) or isinstance(value[1], bool)
+            or not isinstance(value[2], str)):
+        raise ValueError("invalid cursor")
+    return tuple(value[1:])
+
+def professional_facets(pro):
+    """(field, value) pairs a professional is filed under in the catalog;
+    "300+" covers the 300 and 500 price bands as in ProfessionalService.matches"""
+    facets = {('service', pro.get('service')), ('location', pro.get('location')),
+              ('certified', bool(pro.get('certified')))}
+    price = pro.get('price')
+    if isinstance(price, str):
+        facets.add(('price', price))
+        if price.startswith(("300", "500")):
+            facets.add(('price', "300+"))
+    return frozenset(facets)
+
+class ProfessionalCatalog:
+    """Sorted views of the professionals for paged searches.
+
+    Keeps one list of (sort key, id) per sort order, for all professionals
+    and per facet (service, location, price band, certified), sorted on
+    first use and then updated by add()/remove() like the store's other
+    indexes. A page walks the list of the most selective filter the query
+    has, from a bisect to the cursor until it has enough matching rows, so
+    its cost follows the page size rather than the catalog size.
+    """
+
+    def __init__(self, field, data, key=None):
+        self.field = field
+        self.data = data
+        self.orders = {}  # (sort, facet or None) -> sorted [(sort key..., id)]
+        self.entries = {}  # pro_id -> (facets, {sort: key})
+        self.counts = {}  # facet -> number of professionals filed under it
+        for record_id, record in data.items():
+            self.add(record_id, record)
+
+    def add(self, record_id, record):
+        self.remove(record_id)
+        facets = professional_facets(record)
+        keys = {sort: professional_sort_key(sort, record_id, record) for sort in PROFESSIONAL_SORTS}
+        self.entries[record_id] = (facets, keys)
+        for facet in facets:
+            self.counts[facet] = self.counts.get(facet, 0) + 1
+        for facet in (None, *facets):
+            for sort in PROFESSIONAL_SORTS:
+                order = self.orders.get((sort, facet))
+                if order is not None:
+                    bisect.insort(order, keys[sort])
+
+    def remove(self, record_id):
+        entry = self.entries.pop(record_id, None)
+        if entry is None:
+            return
+        facets, keys = entry
+        for facet in facets:
+            self.counts[facet] -= 1
+        for facet in (None, *facets):
+            for sort in PROFESSIONAL_SORTS:
+                order = self.orders.get((sort, facet))
+                if order is None:
+                    continue
+                i = bisect.bisect_left(order, keys[sort])
+                if i < len(order) and order[i] == keys[sort]:
+                    del order[i]
+
+    def _order(self, sort, facet):
+        order = self.orders.get((sort, facet))
+        if order is None:
+            order = self.orders[(sort, facet)] = sorted(
+                keys[sort] for facets, keys in self.entries.values()
+                if facet is None or facet in facets)
+        return order
+
+    def page(self, sort, filters, accept, limit, after=None, min_rating=None):
+        """Up to limit (pro_id, pro) pairs after the `after` key that are
+        filed under every (field, value) in filters and pass accept, and
+        the key of the last one if more rows follow"""
+        facet = None
+        if filters:
+            facet = min(filters, key=lambda f: self.counts.get(f, 0))
+            if not self.counts.get(facet):
+                return [], None
+        order = self._order(sort, facet)
+        start = bisect.bisect_right(order, after) if after is not None else 0
+        rows = []
+        for i in range(start, len(order)):
+            key = order[i]
+            if sort == 'rating' and min_rating is not None and -key[0] < min_rating:
+                # Every later row is rated lower
+                break
+            pro_id = key[-1]
+            if all(f in self.entries[pro_id][0] for f in filters) and accept(self.data[pro_id]):
+                if len(rows) == limit:
+                    return rows, professional_sort_key(sort, *rows[-1])
+                rows.append((pro_id, self.data[pro_id]))
+        return rows, None
+
+class ProfessionalService:
+    """Searching and updating professional profiles"""
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def matches(pro, service="All", location="All", rating="All", price="All"):
+        """Whether a professional passes the Find Professionals filters"""
+        # Profiles without the filtered field never match
+        if service != "All" and pro.get('service') != service:
+            return False
+        if location != "All" and pro.get('location') != location:
+            return False
+        if rating != "All" and (pro.get('rating') is None
+                                or float(pro['rating']) < float(rating.replace("+", ""))):
+            return False
+        if price != "All":
+            pro_price = pro.get('price')
+            if not isinstance(pro_price, str):
+                return False
+            if price == "300+":
+                return pro_price.startswith("300") or pro_price.startswith("500")
+            return pro_price == price
+        return True
+
+    def filter_professionals(self, service="All", location="All", rating="All", price="All"):
+        """(pro_id, pro) pairs matching the filters; "All" disables a filter"""
+        return [(pro_id, pro) for pro_id, pro in self.store.load('professionals').items()
+                if self.matches(pro, service, location, rating, price)]
+
+    def search(self, service="All", location="All", min_rating=None, price="All", certified=None,
+               sort='rating', limit=PAGE_SIZE, cursor=None):
+        """One page of professionals matching the Find Professionals filters,
+        as ([(pro_id, pro)], next_cursor). next_cursor is None on the last
+        page. Pages stay consistent while profiles are added or edited
+        because the cursor records a position in the sort order, not an
+        offset. Raises ValueError for an unknown sort or a bad cursor."""
+        if sort not in PROFESSIONAL_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(PROFESSIONAL_SORTS)}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        after = decode_cursor(cursor, sort) if cursor else None
+        rating = "All" if min_rating is None else f"{float(min_rating)}+"
+
+        # Equality filters narrow the walk to one facet's list; the rating
+        # filter is checked per row and ends the walk in rating order
+        filters = [(field, value) for field, value in
+                   (('service', service), ('location', location), ('price', price))
+                   if value not in (None, "All")]
+        if certified is not None:
+            filters.append(('certified', bool(certified)))
+
+        def accept(pro):
+            return self.matches(pro, rating=rating)
+
+        def query(catalog, professionals):
+            return catalog.page(sort, filters, accept, limit, after,
+                                None if min_rating is None else float(min_rating))
+
+        rows, last = self.store.query_index('professionals', '@catalog', query, factory=ProfessionalCatalog)
+        return rows, encode_cursor(sort, last) if last else None
+
+    def save_profile(self, pro_id, name, location, service, bio, price, id_number="", license="",
+                     lat=None, lng=None):
+        """Create or replace a professional profile and return it.
+        Profiles with an ID number of 8+ characters are certified. Without
+        explicit coordinates the location text is resolved in the offline
+        gazetteer, so searches never have to geocode the profile."""
+        if lat is None or lng is None:
+            lat, lng = gazetteer.coords(location) or (None, None)
+        profile = {
+            "name": name,
+            "service": service,
+            "bio": bio,
+            "price": price,
+            "location": location,
+            "rating": 5.0,
+            "certified": bool(id_number and len(id_number) >= 8),
+            "id_number": id_number,
+            "license": license,
+            "lat": lat,
+            "lng": lng
+        }
+        # Unresolved locations are saved without coordinates
+        profile = {key: value for key, value in profile.items() if value is not None}
+        self.store.put('professionals', pro_id, profile)
+        return profile
+
+class RatingService:
+    """Reviews and average ratings"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def submit_review(self, job_id, reviewer, reviewed, rating, review, is_professional=False,
+                      suggested_rating=None):
+        """Save a review and fold its rating into the reviewed party's average.
+        is_professional means the reviewer is the professional, rating a client."""
+        review_id = _new_id()
+        record = {
+            "id": review_id,
+            "job_id": job_id,
+            "reviewer": reviewer,
+            "reviewed": reviewed,
+            "reviewer_type": "professional" if is_professional else "client",
+            "rating": float(rating),
+            "review": review,
+            "ai_suggested_rating": suggested_rating,
+            "created": datetime.now().isoformat()
+        }
+        self.store.put('reviews', review_id, record)
+        # A client's review rates a professional and vice versa
+        self.update_average_rating(reviewed, float(rating), not is_professional)
+        return review_id, record
+
+    def update_average_rating(self, email, new_rating, is_professional_being_rated):
+        collection = 'professionals' if is_professional_being_rated else 'users'
+
+        user_id = self.store.get_by_email(collection, email)[0]
+        if user_id is None:
+            return None
+
+        # Recomputed under the store's lock so concurrent ratings all count
+        averages = []
+        def add_rating(_, user):
+            current_rating = user.get('rating', 0)
+            rating_count = user.get('rating_count', 0)
+
+            total_rating = (current_rating * rating_count) + new_rating
+            new_count = rating_count + 1
+            averages.append(round(total_rating / new_count, 1))
+            return dict(user, rating=averages[-1], rating_count=new_count)
+
+        if not self.store.update_many(collection, [user_id], add_rating):
+            return None
+        return averages[-1]
+
+class HireWiseServices:
+    """The services over one store, shared by the Tk app, the web API and the benchmarks"""
+
+    def __init__(self, store):
+        self.store = store
+        self.jobs = JobService(store)
+        self.quotes = QuoteService(store)
+        self.professionals = ProfessionalService(store)
+        self.ratings = RatingService(store)
+
+services = HireWiseServices(store)
@@ -0,0 +1,291 @@
+import heapq
+import math
+from collections import OrderedDict
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Grid cell size in degrees, about 280 m at Nairobi's latitude. Small
+# enough that a dense area's cells hold a few hundred providers at 100k.
+CELL_DEGREES = 0.0025
+
+# Geohash length for cached nearest results, cells of about 150 x 150 m:
+# location jitter of a few metres usually stays in the same cell
+GEOHASH_PRECISION = 7
+RESULT_CACHE_SIZE = 1024
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    sin_dlat = math.sin(math.radians(lat2 - lat1) / 2)
+    sin_dlng = math.sin(math.radians(lng2 - lng1) / 2)
+    a = sin_dlat * sin_dlat + math.cos(lat1_rad) * math.cos(lat2_rad) * sin_dlng * sin_dlng
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+def record_coords(record_id, record):
+    """(lat, lng) stored on a record, or None"""
+    lat, lng = record.get('lat'), record.get('lng')
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+def geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Geohash of a point, e.g. 'kzf0tv7' in Nairobi CBD"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    code = []
+    bits = 0
+    value = 0
+    even = True
+    while len(code) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        span, point = (lng_range, lng) if even else (lat_range, lat)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if point >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            code.append(_GEOHASH_BASE32[value])
+            bits = value = 0
+    return ''.join(code)
+
+def geohash_center(code):
+    """(lat, lng) at the centre of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in code:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            span = lng_range if even else lat_range
+            middle = (span[0] + span[1]) / 2
+            if value >> shift & 1:
+                span[0] = middle
+            else:
+                span[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+class GeoIndex:
+    """Grid index over record coordinates for radius and k-nearest queries.
+
+    Records are bucketed into CELL_DEGREES x CELL_DEGREES cells, so a query
+    only measures distances to records in the cells around the query point.
+    `key(record_id, record)` returns a record's (lat, lng), or None to leave
+    it out of the index. It has the same add()/remove() interface as the
+    store's secondary indexes, so the store keeps it current on every put().
+    """
+    __slots__ = ('field', 'key', 'cell_degrees', 'cells', 'by_id', 'bounds')
+
+    def __init__(self, field, data, key=record_coords, cell_degrees=CELL_DEGREES):
+        self.field = field
+        self.key = key
+        self.cell_degrees = cell_degrees
+        self.cells = {}  # (row, col) -> {record_id: (lat, lng)}
+        self.by_id = {}  # record_id -> (lat, lng, cell)
+        self.bounds = None  # (min_row, min_col, max_row, max_col) of cells ever used
+        for record_id, record in data.items():
+            self.add(record_id, record)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def _cell(self, lat, lng):
+        return (math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees))
+
+    def add(self, record_id, record):
+        coords = self.key(record_id, record)
+        current = self.by_id.get(record_id)
+        if current is not None:
+            if coords == current[:2]:
+                return
+            self.remove(record_id)
+        if coords is None:
+            return
+
+        cell = self._cell(*coords)
+        self.cells.setdefault(cell, {})[record_id] = coords
+        self.by_id[record_id] = coords + (cell,)
+
+        row, col = cell
+        if self.bounds is None:
+            self.bounds = (row, col, row, col)
+        else:
+            min_row, min_col, max_row, max_col = self.bounds
+            self.bounds = (min(min_row, row), min(min_col, col), max(max_row, row), max(max_col, col))
+
+    def remove(self, record_id):
+        current = self.by_id.pop(record_id, None)
+        if current is None:
+            return
+        cell = current[2]
+        points = self.cells[cell]
+        del points[record_id]
+        if not points:
+            del self.cells[cell]
+
+    def _ring(self, row, col, ring):
+        """Cells at Chebyshev distance `ring` from (row, col)"""
+        if ring == 0:
+            return [(row, col)]
+        cells = [(row - ring, c) for c in range(col - ring, col + ring + 1)]
+        cells += [(row + ring, c) for c in range(col - ring, col + ring + 1)]
+        cells += [(r, col - ring) for r in range(row - ring + 1, row + ring)]
+        cells += [(r, col + ring) for r in range(row - ring + 1, row + ring)]
+        return cells
+
+    def _max_ring(self, row, col):
+        if self.bounds is None:
+            return -1
+        min_row, min_col, max_row, max_col = self.bounds
+        return max(row - min_row, max_row - row, col - min_col, max_col - col)
+
+    def _ring_min_km(self, lat, ring):
+        """Lower bound on the distance from lat to any point outside the first `ring` rings"""
+        if ring <= 0:
+            return 0.0
+        # Longitude degrees shrink towards the poles; use the narrowest latitude covered
+        widest_lat = min(90.0, abs(lat) + (ring + 1) * self.cell_degrees)
+        km_per_degree = KM_PER_DEGREE * max(math.cos(math.radians(widest_lat)), 1e-6)
+        return ring * self.cell_degrees * km_per_degree
+
+    def within(self, lat, lng, radius_km, accept=None):
+        """(record_id, distance) pairs within radius_km, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lng_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(90.0, abs(lat) + lat_span))), 1e-6))
+        min_row, min_col = self._cell(lat - lat_span, lng - lng_span)
+        max_row, max_col = self._cell(lat + lat_span, lng + lng_span)
+
+        if (max_row - min_row + 1) * (max_col - min_col + 1) <= len(self.cells):
+            cells = (self.cells.get((r, c)) for r in range(min_row, max_row + 1)
+                     for c in range(min_col, max_col + 1))
+        else:
+            # Fewer occupied cells than cells in the box
+            cells = (points for (r, c), points in self.cells.items()
+                     if min_row <= r <= max_row and min_col <= c <= max_col)
+
+        results = []
+        for points in cells:
+            if not points:
+                continue
+            for record_id, (plat, plng) in points.items():
+                if accept is not None and not accept(record_id):
+                    continue
+                distance = haversine(lat, lng, plat, plng)
+                if distance <= radius_km:
+                    results.append((record_id, distance))
+        results.sort(key=lambda item: item[1])
+        return results
+
+    def nearest(self, lat, lng, k, accept=None, max_km=None):
+        """Up to k (record_id, distance) pairs closest to (lat, lng), nearest
+        first, optionally only those accepted and within max_km"""
+        if k <= 0:
+            return []
+        row, col = self._cell(lat, lng)
+        max_ring = self._max_ring(row, col)
+        best = []  # heap of (-distance, record_id) holding the k nearest so far
+
+        def consider(points):
+            for record_id, (plat, plng) in points.items():
+                if accept is not None and not accept(record_id):
+                    continue
+                distance = haversine(lat, lng, plat, plng)
+                if max_km is not None and distance > max_km:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, record_id))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, record_id))
+
+        ring = 0
+        while ring <= max_ring:
+            # Points beyond this ring are at least this far away
+            bound = self._ring_min_km(lat, ring - 1)
+            if (len(best) == k and -best[0][0] <= bound) or (max_km is not None and bound > max_km):
+                break
+            if 8 * ring > len(self.cells):
+                # Sparse data: visit the remaining occupied cells directly
+                for (r, c), points in self.cells.items():
+                    if max(abs(r - row), abs(c - col)) >= ring:
+                        consider(points)
+                break
+            for cell in self._ring(row, col, ring):
+                points = self.cells.get(cell)
+                if points:
+                    consider(points)
+            ring += 1
+
+        return [(record_id, -neg) for neg, record_id in sorted(best, key=lambda item: (-item[0], str(item[1])))]
+
+class CachedGeoIndex(GeoIndex):
+    """GeoIndex that remembers nearest() results per geohash cell.
+
+    nearest_cached() answers every point in a cell from the k nearest
+    records to the cell's centre, with distances measured from the actual
+    point. A cached result only depends on records within its furthest
+    distance of the centre, so add() and remove() drop just the results
+    whose radius covers the changed record's old or new position.
+    """
+    __slots__ = ('precision', 'max_results', 'results', 'hits', 'misses')
+
+    def __init__(self, field, data, key=record_coords, cell_degrees=CELL_DEGREES,
+                 precision=GEOHASH_PRECISION, max_results=RESULT_CACHE_SIZE):
+        self.precision = precision
+        self.max_results = max_results
+        # (geohash, k, cache_key) -> (centre lat, centre lng, radius km or None, record ids)
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        super().__init__(field, data, key, cell_degrees)
+
+    def add(self, record_id, record):
+        before = self.by_id.get(record_id)
+        super().add(record_id, record)
+        # Also invalidate when only other fields changed, e.g. a new service
+        self._invalidate(before)
+        self._invalidate(self.by_id.get(record_id))
+
+    def remove(self, record_id):
+        before = self.by_id.get(record_id)
+        super().remove(record_id)
+        self._invalidate(before)
+
+    def _invalidate(self, point):
+        if point is None or not self.results:
+            return
+        lat, lng = point[0], point[1]
+        stale = [key for key, (clat, clng, radius, _) in self.results.items()
+                 if radius is None or haversine(clat, clng, lat, lng) <= radius]
+        for key in stale:
+            del self.results[key]
+
+    def nearest_cached(self, lat, lng, k, accept=None, cache_key=None):
+        """nearest() for the centre of the point's geohash cell, cached.
+        cache_key must identify the accept filter (e.g. the service name)."""
+        key = (geohash(lat, lng, self.precision), k, cache_key)
+        entry = self.results.get(key)
+        if entry is None:
+            self.misses += 1
+            clat, clng = geohash_center(key[0])
+            found = self.nearest(clat, clng, k, accept)
+            # With fewer than k results any new record could belong in them
+            radius = found[-1][1] if found and len(found) == k else None
+            entry = self.results[key] = (clat, clng, radius, [record_id for record_id, _ in found])
+            if len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+
+        hits = []
+        for record_id in entry[3]:
+            plat, plng = self.by_id[record_id][:2]
+            hits.append((record_id, haversine(lat, lng, plat, plng)))
+        hits.sort(key=lambda item: (item[1], str(item[0])))
+        return hits
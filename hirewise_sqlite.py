@@ -0,0 +1,329 @@
+import argparse
+import json
+import threading
+
+from sqlalchemy import (create_engine, event, inspect, MetaData, Table, Column, Integer, String, Text,
+                        Index, select, delete, update, and_, text)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from hirewise_records import INTERNED_FIELDS
+from hirewise_store import (DATA_FILES, DEFAULT_DATABASE_URL, INDEXED_FIELDS, EMAIL_COLLECTIONS,
+                            HireWiseStore, _Entry, email_key, normalize_email)
+
+# Record fields copied into their own indexed columns
+INDEXED_COLUMNS = dict(INDEXED_FIELDS, messages=INDEXED_FIELDS['messages'] + ('created',))
+
+def build_tables(metadata, collections):
+    tables = {}
+    for name in collections:
+        # version: the collection version that last wrote the row
+        columns = [Column('id', String, primary_key=True), Column('data', Text, nullable=False),
+                   Column('version', Integer, nullable=False, server_default='0')]
+        columns += [Column(field, String) for field in INDEXED_COLUMNS.get(name, ())]
+        indexes = [Index(f'ix_{name}_{field}', field) for field in INDEXED_COLUMNS.get(name, ())]
+        indexes.append(Index(f'ix_{name}_version', 'version'))
+        if name in EMAIL_COLLECTIONS:
+            # Normalized email for case-insensitive account lookups
+            columns.append(Column('email_key', String))
+            indexes.append(Index(f'ix_{name}_email_key', 'email_key'))
+        tables[name] = Table(name, metadata, *columns, *indexes)
+    # Per-collection change counter; reset is the version of the last full rewrite
+    tables['@versions'] = Table('hirewise_versions', metadata,
+                                Column('name', String, primary_key=True),
+                                Column('version', Integer, nullable=False),
+                                Column('reset', Integer, nullable=False))
+    return tables
+
+class HireWiseSQLStore:
+    """SQLite storage backend with the same interface as HireWiseStore.
+
+    Each collection is a table of (id, JSON data) rows, plus indexed
+    columns for the fields the app filters on, so find() on those fields
+    runs as an indexed query instead of a scan. Files that are not one of
+    the known collections (e.g. the phase 2 files) stay in JSON.
+
+    Every write bumps a per-collection counter in the database and stamps
+    the rows it wrote with it. version() returns the counter, and the
+    indexes behind query_index() are kept between calls and caught up by
+    reading only the rows stamped after them, so writes from other
+    processes are seen without rebuilding.
+    """
+
+    def __init__(self, database_url=DEFAULT_DATABASE_URL, data_files=None):
+        self.data_files = dict(DATA_FILES if data_files is None else data_files)
+        self.engine = create_engine(database_url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._sqlite_pragmas)
+
+        self.metadata = MetaData()
+        self.tables = build_tables(self.metadata, self.data_files)
+        self.versions = self.tables.pop('@versions')
+        self.metadata.create_all(self.engine)
+        self._add_version_columns()
+
+        self._names_by_path = {path: name for name, path in self.data_files.items()}
+        self._files = HireWiseStore(data_files={}, log_collections=())
+        self._lock = threading.RLock()
+        self._entries = {}  # name -> _Entry with the indexes built by query_index
+        self._entry_locks = {name: threading.Lock() for name in self.tables}
+
+    def _add_version_columns(self):
+        # Databases created before rows carried a version
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for name in self.tables:
+                if 'version' not in {column['name'] for column in inspector.get_columns(name)}:
+                    conn.execute(text(f'ALTER TABLE "{name}" ADD COLUMN version INTEGER NOT NULL DEFAULT 0'))
+                    conn.execute(text(f'CREATE INDEX IF NOT EXISTS "ix_{name}_version" ON "{name}" (version)'))
+
+    @staticmethod
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers in other workers proceed while one writes
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def path(self, name):
+        return self.data_files[name]
+
+    def _bump(self, conn, name, reset=False):
+        """Increment a collection's version inside a write transaction. The
+        UPDATE comes first so it takes SQLite's write lock before the
+        counter is read, and versions follow commit order across processes."""
+        versions = self.versions
+        conn.execute(sqlite_insert(versions).values(name=name, version=0, reset=0)
+                     .on_conflict_do_nothing(index_elements=['name']))
+        values = {'version': versions.c.version + 1}
+        if reset:
+            values['reset'] = versions.c.version + 1
+        conn.execute(update(versions).where(versions.c.name == name).values(values))
+        return conn.execute(select(versions.c.version).where(versions.c.name == name)).scalar()
+
+    def _row_values(self, name, record_id, record, version=0):
+        values = {'id': record_id, 'data': json.dumps(record), 'version': version}
+        for field in INDEXED_COLUMNS.get(name, ()):
+            value = record.get(field)
+            values[field] = None if value is None else str(value)
+        if name in EMAIL_COLLECTIONS:
+            values['email_key'] = email_key(record_id, record)
+        return values
+
+    def _rows(self, query):
+        with self.engine.connect() as conn:
+            return {row.id: json.loads(row.data) for row in conn.execute(query)}
+
+    def load(self, name):
+        table = self.tables[name]
+        return self._rows(select(table.c.id, table.c.data))
+
+    def save(self, name, data):
+        table = self.tables[name]
+        with self._lock, self.engine.begin() as conn:
+            version = self._bump(conn, name, reset=True)
+            conn.execute(delete(table))
+            if data:
+                conn.execute(table.insert(), [self._row_values(name, k, v, version) for k, v in data.items()])
+
+    def bulk_load(self, name, items, batch_size=10000):
+        """Replace a collection with (record_id, record) pairs from an iterable"""
+        table = self.tables[name]
+        count = 0
+        with self._lock, self.engine.begin() as conn:
+            version = self._bump(conn, name, reset=True)
+            conn.execute(delete(table))
+            batch = []
+            for record_id, record in items:
+                batch.append(self._row_values(name, str(record_id), record, version))
+                if len(batch) >= batch_size:
+                    conn.execute(table.insert(), batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.execute(table.insert(), batch)
+                count += len(batch)
+        return count
+
+    def put(self, name, record_id, record):
+        table = self.tables[name]
+        with self._lock, self.engine.begin() as conn:
+            values = self._row_values(name, record_id, record, self._bump(conn, name))
+            stmt = sqlite_insert(table).values(**values)
+            stmt = stmt.on_conflict_do_update(index_elements=['id'],
+                                              set_={k: v for k, v in values.items() if k != 'id'})
+            conn.execute(stmt)
+
+    def update_many(self, name, record_ids, update, batch_size=500):
+        """Replace records with update(record_id, record) in one transaction"""
+        table = self.tables[name]
+        record_ids = list(record_ids)
+        count = 0
+        with self._lock, self.engine.begin() as conn:
+            version = self._bump(conn, name)
+            for start in range(0, len(record_ids), batch_size):
+                rows = conn.execute(select(table.c.id, table.c.data)
+                                    .where(table.c.id.in_(record_ids[start:start + batch_size])))
+                for row in rows.fetchall():
+                    record = update(row.id, json.loads(row.data))
+                    if record is None:
+                        continue
+                    values = self._row_values(name, row.id, record, version)
+                    conn.execute(table.update().where(table.c.id == row.id)
+                                 .values({k: v for k, v in values.items() if k != 'id'}))
+                    count += 1
+        return count
+
+    def get(self, name, record_id, default=None):
+        table = self.tables[name]
+        with self.engine.connect() as conn:
+            row = conn.execute(select(table.c.data).where(table.c.id == record_id)).first()
+        return json.loads(row.data) if row else default
+
+    def get_by_email(self, name, email):
+        return self.get_by_emails(name, [email]).get(email, (None, None))
+
+    def get_by_emails(self, name, emails, batch_size=500):
+        """get_by_email() for many emails in one query per batch_size keys"""
+        table = self.tables[name]
+        emails = set(emails)
+        keys = list({normalize_email(email) for email in emails})
+        matches = {}  # email_key -> {record_id: record}
+        with self.engine.connect() as conn:
+            for start in range(0, len(keys), batch_size):
+                rows = conn.execute(select(table.c.id, table.c.data, table.c.email_key)
+                                    .where(table.c.email_key.in_(keys[start:start + batch_size])))
+                for row in rows:
+                    matches.setdefault(row.email_key, {})[row.id] = json.loads(row.data)
+        found = {}
+        for email in emails:
+            rows = matches.get(normalize_email(email))
+            if rows:
+                record_id = email if email in rows else next(iter(rows))
+                found[email] = (record_id, rows[record_id])
+        return found
+
+    def get_many(self, name, record_ids, batch_size=500):
+        table = self.tables[name]
+        record_ids = list(set(record_ids))
+        found = {}
+        for start in range(0, len(record_ids), batch_size):
+            found.update(self._rows(select(table.c.id, table.c.data)
+                                    .where(table.c.id.in_(record_ids[start:start + batch_size]))))
+        return found
+
+    def find(self, name, **criteria):
+        indexed = INDEXED_COLUMNS.get(name, ())
+        if not all(field in indexed for field in criteria):
+            data = self.load(name)
+            return {k: v for k, v in data.items()
+                    if all(v.get(field) == value for field, value in criteria.items())}
+
+        table = self.tables[name]
+        query = select(table.c.id, table.c.data)
+        if criteria:
+            query = query.where(and_(*(table.c[field] == str(value) for field, value in criteria.items())))
+        return self._rows(query)
+
+    def compact(self, name):
+        pass
+
+    def query_index(self, name, field, query, key=None, factory=None):
+        """query(index, data) like HireWiseStore.query_index. The data and
+        indexes are kept in memory and brought up to date from the rows
+        written since, by any process, before each query."""
+        with self._entry_locks[name]:
+            entry = self._current_entry(name)
+            return query(entry.index(field, key, factory), entry.data)
+
+    def _current_entry(self, name):
+        table = self.tables[name]
+        entry = self._entries.get(name)
+        with self.engine.connect() as conn:
+            version, reset = self._version_row(conn, name)
+            if entry is not None and entry.stamp >= version:
+                return entry
+            if entry is None or reset > entry.stamp:
+                # First use, or the collection was rewritten and rows may be gone
+                rows = conn.execute(select(table.c.id, table.c.data, table.c.version)).fetchall()
+                entry = _Entry(None, 0, {}, interned=INTERNED_FIELDS.get(name, ()))
+                self._entries[name] = entry
+            else:
+                rows = conn.execute(select(table.c.id, table.c.data, table.c.version)
+                                    .where(table.c.version > entry.stamp)).fetchall()
+            # Rows committed after the version was read are included, so the
+            # entry is at least as new as the newest row it holds
+            entry.stamp = max([version] + [row.version for row in rows])
+            for row in rows:
+                entry.apply(row.id, json.loads(row.data))
+            if self._version_row(conn, name)[1] > reset:
+                # Rewritten while reading; start again from the new contents
+                del self._entries[name]
+                return self._current_entry(name)
+        return entry
+
+    def _version_row(self, conn, name):
+        row = conn.execute(select(self.versions.c.version, self.versions.c.reset)
+                           .where(self.versions.c.name == name)).first()
+        return (row.version, row.reset) if row else (0, 0)
+
+    def version(self, name):
+        """The collection's change counter, shared by every process"""
+        with self.engine.connect() as conn:
+            return self._version_row(conn, name)[0]
+
+    # Path-based access used by modules that know file names rather than
+    # collection names
+    def load_file(self, path):
+        name = self._names_by_path.get(path)
+        return self.load(name) if name else self._files.load_file(path)
+
+    def save_file(self, path, data):
+        name = self._names_by_path.get(path)
+        if name:
+            self.save(name, data)
+        else:
+            self._files.save_file(path, data)
+
+    def put_file(self, path, record_id, record):
+        name = self._names_by_path.get(path)
+        if name:
+            self.put(name, record_id, record)
+        else:
+            self._files.put_file(path, record_id, record)
+
+    def query_index_file(self, path, field, query, key=None, factory=None):
+        name = self._names_by_path.get(path)
+        if name:
+            return self.query_index(name, field, query, key, factory)
+        return self._files.query_index_file(path, field, query, key, factory)
+
+    def version_file(self, path):
+        name = self._names_by_path.get(path)
+        return self.version(name) if name else self._files.version_file(path)
+
+    def invalidate(self, path=None):
+        self._files.invalidate(path)
+
+    def ensure_files(self, paths=None):
+        if paths is not None:
+            self._files.ensure_files([p for p in paths if p not in self._names_by_path])
+
+def migrate(database_url, data_files=None):
+    """Import the JSON data files (and any pending log entries) into the database"""
+    source = HireWiseStore(data_files=data_files)
+    target = HireWiseSQLStore(database_url, data_files=data_files)
+    for name in source.data_files:
+        data = source.load(name)
+        target.save(name, data)
+        print(f"{name}: {len(data)} records")
+    return target
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HireWise SQLite storage tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="Import the hirewise_*.json files into the database")
+    migrate_parser.add_argument('--database-url', default=DEFAULT_DATABASE_URL)
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        migrate(args.database_url)
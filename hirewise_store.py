@@ -0,0 +1,615 @@
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from hirewise_records import INTERNED_FIELDS, intern_fields
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking on Windows; writes are still atomic
+    fcntl = None
+
+# Data files
+DATA_FILES = {
+    'users': 'hirewise_users.json',
+    'jobs': 'hirewise_jobs.json',
+    'professionals': 'hirewise_professionals.json',
+    'quotes': 'hirewise_quotes.json',
+    'messages': 'hirewise_messages.json',
+    'payments': 'hirewise_payments.json',
+    'reviews': 'hirewise_reviews.json',
+    'notifications': 'hirewise_notifications.json'
+}
+
+# Collections written through an append-only log instead of full rewrites
+LOG_COLLECTIONS = ('jobs', 'quotes', 'messages')
+
+# Database used when HIREWISE_STORAGE=sqlite
+DEFAULT_DATABASE_URL = 'sqlite:///hirewise.db'
+
+# Number of log entries after which the log is folded back into the snapshot
+COMPACT_AFTER = 1000
+
+# Record fields with a secondary index, used by find()
+INDEXED_FIELDS = {
+    'jobs': ('status', 'client', 'service'),
+    'quotes': ('job_id', 'professional'),
+    'messages': ('sender', 'receiver'),
+    'payments': ('user',)
+}
+
+# Collections keyed by account email, looked up without regard to case
+EMAIL_COLLECTIONS = ('users', 'professionals')
+
+# Fields in other collections that refer to an account email
+EMAIL_REFERENCES = {
+    'jobs': ('client', 'assigned_to'),
+    'quotes': ('professional',),
+    'messages': ('sender', 'receiver'),
+    'payments': ('user',),
+    'reviews': ('reviewer', 'reviewed')
+}
+
+def normalize_email(email):
+    return str(email).strip().lower()
+
+def email_key(record_id, record):
+    """Normalized email of a users/professionals record"""
+    return normalize_email(record.get('email') or record_id)
+
+def log_path_for(path):
+    """hirewise_jobs.json -> hirewise_jobs.log"""
+    return os.path.splitext(path)[0] + '.log'
+
+class _Index:
+    """Secondary index: field value -> ids of the records holding it"""
+    __slots__ = ('field', 'key', 'by_value', 'by_id')
+
+    def __init__(self, field, data, key=None):
+        self.field = field
+        self.key = key
+        self.by_value = {}  # value -> {record_id: None}, kept in insertion order
+        self.by_id = {}  # record_id -> indexed value
+        for record_id, record in data.items():
+            self.add(record_id, record)
+
+    def add(self, record_id, record):
+        value = self.key(record_id, record) if self.key else record.get(self.field)
+        if record_id in self.by_id:
+            if self.by_id[record_id] == value:
+                return
+            self.remove(record_id)
+        self.by_id[record_id] = value
+        self.by_value.setdefault(value, {})[record_id] = None
+
+    def remove(self, record_id):
+        if record_id not in self.by_id:
+            return
+        value = self.by_id.pop(record_id)
+        ids = self.by_value[value]
+        del ids[record_id]
+        if not ids:
+            del self.by_value[value]
+
+    def ids(self, value):
+        return self.by_value.get(value, {})
+
+# Source of _Entry.version numbers, unique across all entries
+_versions = itertools.count(1)
+
+class _Entry:
+    """Cached state of one data file"""
+    __slots__ = ('path', 'stamp', 'data', 'indexes', 'interned', 'log_path', 'log_ino', 'log_offset', 'log_count',
+                 'version')
+
+    def __init__(self, path, stamp, data, log_path=None, interned=()):
+        self.path = path
+        self.stamp = stamp
+        self.data = data
+        self.interned = interned
+        if interned:
+            # Share one string object per status/service/... value
+            for record in data.values():
+                if isinstance(record, dict):
+                    intern_fields(record, interned)
+        self.indexes = {}  # field -> _Index, built on first use
+        self.log_path = log_path
+        self.log_ino = None
+        self.log_offset = 0
+        self.log_count = 0
+        self.version = next(_versions)
+
+    def index(self, field, key=None, factory=None):
+        index = self.indexes.get(field)
+        if index is None:
+            index = self.indexes[field] = (factory or _Index)(field, self.data, key)
+        return index
+
+    def apply(self, record_id, record):
+        """Store a record and keep the built indexes up to date"""
+        if self.interned and isinstance(record, dict):
+            intern_fields(record, self.interned)
+        self.data[record_id] = record
+        for index in self.indexes.values():
+            index.add(record_id, record)
+        self.version = next(_versions)
+
+class HireWiseStore:
+    """Shared in-memory cache of the parsed HireWise data files.
+
+    Each file is parsed once and kept in memory. The file's mtime and size
+    are checked on every access, so a file is only re-read when another
+    process has changed it. Callers that modify a collection must pass it
+    back to save(), or write single records with put(), so the cache, its
+    indexes and the file stay in step.
+
+    Jobs, quotes and messages also have an append-only JSONL log next to
+    their snapshot file. put() on those collections appends a single line
+    instead of rewriting the whole file; the log is replayed on load and
+    folded back into the snapshot by a background compaction.
+
+    Writes replace files atomically (temp file plus rename) while holding
+    a per-file lock that other processes, e.g. gunicorn workers, share via
+    fcntl, so concurrent writers never drop each other's records.
+    """
+
+    def __init__(self, data_files=None, log_collections=LOG_COLLECTIONS, compact_after=COMPACT_AFTER):
+        self.data_files = dict(DATA_FILES if data_files is None else data_files)
+        self.compact_after = compact_after
+        self._log_paths = {self.data_files[name]: log_path_for(self.data_files[name])
+                           for name in log_collections if name in self.data_files}
+        self._interned = {path: INTERNED_FIELDS[name]
+                          for name, path in self.data_files.items() if name in INTERNED_FIELDS}
+        self._cache = {}  # path -> _Entry
+        self._compacting = set()
+        self._locks = {}  # path -> RLock
+        self._locks_guard = threading.Lock()
+        self._lock_depth = {}
+        self._lock_files = {}
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def path(self, name):
+        return self.data_files[name]
+
+    def load(self, name):
+        """Return a collection by name, e.g. store.load('jobs')"""
+        return self.load_file(self.data_files[name])
+
+    def save(self, name, data):
+        self.save_file(self.data_files[name], data)
+
+    def put(self, name, record_id, record):
+        """Insert or replace a single record"""
+        self.put_file(self.data_files[name], record_id, record)
+
+    def get(self, name, record_id, default=None):
+        """Return one record by id"""
+        return self.load(name).get(record_id, default)
+
+    def find(self, name, **criteria):
+        """Return the records whose fields equal the given values,
+        e.g. store.find('quotes', job_id=job_id).
+
+        Indexed fields are answered from secondary indexes in time
+        proportional to the result size; other fields fall back to a scan.
+        """
+        path = self.data_files[name]
+        indexed = [field for field in criteria if field in INDEXED_FIELDS.get(name, ())]
+        with self._path_lock(path):
+            entry = self._entry(path)
+            data = entry.data
+            if not indexed:
+                candidates = data
+            else:
+                candidates = min((entry.index(field).ids(criteria[field]) for field in indexed), key=len)
+            return {k: data[k] for k in candidates
+                    if all(data[k].get(field) == value for field, value in criteria.items())}
+
+    def get_by_email(self, name, email):
+        """Return (record_id, record) for an account in users or
+        professionals, ignoring case and surrounding spaces in the email.
+        Returns (None, None) if there is no such account.
+        """
+        return self.get_by_emails(name, [email]).get(email, (None, None))
+
+    def get_by_emails(self, name, emails):
+        """get_by_email() for many emails at once, as {email: (record_id,
+        record)}; emails without an account are left out"""
+        path = self.data_files[name]
+        found = {}
+        with self._path_lock(path):
+            entry = self._entry(path)
+            index = entry.index('@email', email_key)
+            for email in set(emails):
+                ids = index.ids(normalize_email(email))
+                if ids:
+                    # Before dedup_emails() has run there may be several
+                    # matches; prefer the exact key
+                    record_id = email if email in ids else next(iter(ids))
+                    found[email] = (record_id, entry.data[record_id])
+        return found
+
+    def get_many(self, name, record_ids):
+        """Return {record_id: record} for the ids that exist"""
+        data = self.load(name)
+        return {record_id: data[record_id] for record_id in set(record_ids) if record_id in data}
+
+    def load_file(self, path):
+        """Return the parsed contents of a JSON data file"""
+        with self._path_lock(path):
+            return self._entry(path).data
+
+    def query_index(self, name, field, query, key=None, factory=None):
+        """Return query(index, data) for a collection's index while holding
+        the collection's lock. The index is built by factory(field, data, key)
+        on first use (a _Index by default) and kept up to date by every
+        put(), e.g. the GeoIndex behind the nearest-provider search."""
+        return self.query_index_file(self.data_files[name], field, query, key, factory)
+
+    def query_index_file(self, path, field, query, key=None, factory=None):
+        with self._path_lock(path):
+            entry = self._entry(path)
+            return query(entry.index(field, key, factory), entry.data)
+
+    def version(self, name):
+        """A number that changes whenever a collection changes, so callers
+        can cache data derived from it. None means the caller cannot cache."""
+        return self.version_file(self.data_files[name])
+
+    def version_file(self, path):
+        with self._path_lock(path):
+            return self._entry(path).version
+
+    def save_file(self, path, data):
+        with self.locked(path):
+            self._write_snapshot(path, data)
+            entry = self._new_entry(path, self._stamp(path), data)
+            if entry.log_path:
+                # The snapshot now holds everything, so the log starts over
+                self._write_atomic(entry.log_path, '')
+                self._sync_log_position(entry)
+            self._cache[path] = entry
+
+    def put_file(self, path, record_id, record):
+        with self.locked(path):
+            # Catch up with other processes before modifying
+            entry = self._entry(path)
+            if entry.log_path is None:
+                entry.apply(record_id, record)
+                self._write_snapshot(path, entry.data)
+                entry.stamp = self._stamp(path)
+                return
+
+            with open(entry.log_path, 'a') as f:
+                f.write(json.dumps({"id": record_id, "record": record}) + "\n")
+            self._replay_log(entry)
+
+            if entry.log_count >= self.compact_after and path not in self._compacting:
+                self._compacting.add(path)
+                threading.Thread(target=self._background_compact, args=(path,), daemon=True).start()
+
+    def update_many(self, name, record_ids, update):
+        """Replace records with update(record_id, record) in one write.
+        update sees the current record under the lock and returns the new
+        record, or None to leave it alone. Returns the number updated."""
+        path = self.data_files[name]
+        with self.locked(path):
+            entry = self._entry(path)
+            changes = []
+            for record_id in record_ids:
+                record = entry.data.get(record_id)
+                if record is not None:
+                    record = update(record_id, record)
+                    if record is not None:
+                        changes.append((record_id, record))
+            if not changes:
+                return 0
+
+            if entry.log_path is None:
+                for record_id, record in changes:
+                    entry.apply(record_id, record)
+                self._write_snapshot(path, entry.data)
+                entry.stamp = self._stamp(path)
+            else:
+                with open(entry.log_path, 'a') as f:
+                    f.write(''.join(json.dumps({"id": record_id, "record": record}) + "\n"
+                                    for record_id, record in changes))
+                self._replay_log(entry)
+            return len(changes)
+
+    def bulk_load(self, name, items):
+        """Replace a collection with (record_id, record) pairs from an
+        iterable, streaming them to disk without holding them all in memory"""
+        path = self.data_files[name]
+        with self.locked(path):
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+            count = 0
+            with os.fdopen(fd, 'w') as f:
+                f.write('{')
+                for record_id, record in items:
+                    if count:
+                        f.write(', ')
+                    f.write(json.dumps(str(record_id)) + ': ' + json.dumps(record))
+                    count += 1
+                f.write('}')
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+
+            log_path = self._log_paths.get(path)
+            if log_path:
+                self._write_atomic(log_path, '')
+            self._cache.pop(path, None)
+        return count
+
+    def compact(self, name):
+        """Fold the collection's log back into its snapshot file"""
+        self.compact_file(self.data_files[name])
+
+    def compact_file(self, path):
+        log_path = self._log_paths.get(path)
+        if log_path is None:
+            return
+
+        # Copy the current state and remember how much of the log it covers
+        with self.locked(path):
+            entry = self._entry(path)
+            data = dict(entry.data)
+            offset, log_ino = entry.log_offset, entry.log_ino
+
+        # The slow part runs without the lock so appends are not blocked
+        tmp_path = self._write_temp(path, json.dumps(data))
+
+        with self.locked(path):
+            entry = self._entry(path)
+            if entry.log_ino != log_ino:
+                # Another writer replaced the log meanwhile; its snapshot wins
+                os.unlink(tmp_path)
+                return
+            os.replace(tmp_path, path)
+
+            # Keep only log lines written after the copy was taken
+            with open(log_path, 'r') as f:
+                f.seek(offset)
+                tail = f.read()
+            self._write_atomic(log_path, tail)
+
+            entry.stamp = self._stamp(path)
+            entry.log_ino = None
+            entry.log_offset = 0
+            entry.log_count = 0
+            self._replay_log(entry)
+
+    @contextmanager
+    def locked(self, path):
+        """Hold a file's write lock, shared with other processes.
+
+        Each data file has its own lock, so writers to different
+        collections never wait on each other.
+        """
+        with self._path_lock(path):
+            depth = self._lock_depth.get(path, 0)
+            if depth == 0 and fcntl is not None:
+                lock_file = open(path + '.lock', 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_files[path] = lock_file
+            self._lock_depth[path] = depth + 1
+            try:
+                yield
+            finally:
+                self._lock_depth[path] = depth
+                if depth == 0 and path in self._lock_files:
+                    lock_file = self._lock_files.pop(path)
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    def _path_lock(self, path):
+        with self._locks_guard:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = self._locks[path] = threading.RLock()
+            return lock
+
+    def _background_compact(self, path):
+        try:
+            self.compact_file(path)
+        except Exception as e:
+            print(f"Error compacting {path}: {e}")
+        finally:
+            self._compacting.discard(path)
+
+    def _entry(self, path):
+        """Return the cached entry for a file, re-reading it if it changed"""
+        stamp = self._stamp(path)
+        entry = self._cache.get(path)
+        if entry is None or entry.stamp != stamp or self._log_rotated(entry):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            entry = self._new_entry(path, stamp, data)
+            self._cache[path] = entry
+
+        if entry.log_path:
+            self._replay_log(entry)
+        return entry
+
+    def _new_entry(self, path, stamp, data):
+        return _Entry(path, stamp, data, self._log_paths.get(path), self._interned.get(path, ()))
+
+    def _log_rotated(self, entry):
+        """True if another process truncated or replaced the log"""
+        if not entry.log_path or entry.log_ino is None:
+            return False
+        try:
+            st = os.stat(entry.log_path)
+        except OSError:
+            return True
+        return st.st_ino != entry.log_ino or st.st_size < entry.log_offset
+
+    def _replay_log(self, entry):
+        """Apply log lines written since the entry's last known offset"""
+        try:
+            st = os.stat(entry.log_path)
+        except OSError:
+            return
+
+        entry.log_ino = st.st_ino
+        if st.st_size == entry.log_offset:
+            return
+
+        with open(entry.log_path, 'rb') as f:
+            f.seek(entry.log_offset)
+            chunk = f.read()
+
+        # Ignore a trailing partial line still being written
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue
+            entry.apply(op['id'], op['record'])
+            entry.log_count += 1
+        entry.log_offset += end
+
+    def _sync_log_position(self, entry):
+        try:
+            st = os.stat(entry.log_path)
+            entry.log_ino, entry.log_offset = st.st_ino, st.st_size
+        except OSError:
+            entry.log_ino, entry.log_offset = None, 0
+        entry.log_count = 0
+
+    def _write_snapshot(self, path, data):
+        self._write_atomic(path, json.dumps(data))
+
+    def _write_atomic(self, path, text):
+        """Replace a file so readers see either the old or the new contents"""
+        os.replace(self._write_temp(path, text), path)
+
+    def _write_temp(self, path, text):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                shutil.copymode(path, tmp_path)
+            except OSError:
+                os.chmod(tmp_path, 0o644)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path
+
+    def invalidate(self, path=None):
+        """Drop cached data so the next access re-reads from disk"""
+        if path is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(path, None)
+
+    def ensure_files(self, paths=None):
+        """Create any missing data files as empty collections"""
+        for path in (paths if paths is not None else self.data_files.values()):
+            try:
+                if not os.path.exists(path):
+                    with open(path, 'w') as f:
+                        json.dump({}, f)
+            except Exception as e:
+                print(f"Error creating file {path}: {e}")
+
+def dedup_emails(store):
+    """One-time migration merging accounts whose emails differ only in case.
+
+    Duplicate users/professionals records are merged into one record keyed
+    by the normalized email (later records win field by field), and email
+    references in jobs, quotes, messages, payments and reviews are rewritten
+    to the normalized form.
+    """
+    accounts = set()
+    for name in EMAIL_COLLECTIONS:
+        data = store.load(name)
+        merged = {}
+        for record_id, record in data.items():
+            key = email_key(record_id, record)
+            combined = merged.setdefault(key, {})
+            combined.update({k: v for k, v in record.items() if v not in (None, '')})
+            if 'email' in combined:
+                combined['email'] = key
+        if list(merged) != list(data):
+            print(f"{name}: {len(data)} -> {len(merged)} records")
+            store.save(name, merged)
+        accounts.update(merged)
+
+    for name, fields in EMAIL_REFERENCES.items():
+        changed = False
+        data = dict(store.load(name))
+        for record_id, record in data.items():
+            updates = {}
+            for field in fields:
+                value = record.get(field)
+                if value and value != normalize_email(value) and normalize_email(value) in accounts:
+                    updates[field] = normalize_email(value)
+            if updates:
+                data[record_id] = dict(record, **updates)
+                changed = True
+        if changed:
+            print(f"{name}: normalized email references")
+            store.save(name, data)
+
+def create_store():
+    """Build the store selected by configuration.
+
+    HIREWISE_STORAGE=json (default) keeps the hirewise_*.json files;
+    HIREWISE_STORAGE=sqlite uses the SQLite backend at HIREWISE_DATABASE_URL.
+    Settings may also come from a .env file.
+    """
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    backend = os.environ.get('HIREWISE_STORAGE', 'json').lower()
+    if backend == 'sqlite':
+        from hirewise_sqlite import HireWiseSQLStore
+        return HireWiseSQLStore(os.environ.get('HIREWISE_DATABASE_URL', DEFAULT_DATABASE_URL))
+    if backend != 'json':
+        raise ValueError(f"Unknown HIREWISE_STORAGE backend: {backend}")
+    return HireWiseStore()
+
+# Global data store instance
+store = create_store()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HireWise data store tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('dedup-emails', help="Merge accounts whose emails differ only in case")
+    subparsers.add_parser('compact', help="Fold the append-only logs into the snapshot files")
+    args = parser.parse_args()
+
+    if args.command == 'dedup-emails':
+        dedup_emails(store)
+    elif args.command == 'compact':
+        for name in LOG_COLLECTIONS:
+            store.compact(name)
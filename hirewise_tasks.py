@@ -0,0 +1,60 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 100
+
+class BackgroundTasks:
+    """Runs blocking work (network lookups) off the Tk main thread.
+
+    submit() hands a call to a small worker pool and returns at once.
+    Finished calls are put on a queue that the main thread drains with
+    root.after(), so on_done/on_error always run on the Tk thread and may
+    touch widgets. Polling only runs while calls are outstanding.
+    """
+
+    def __init__(self, root, max_workers=2, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hirewise-bg')
+        self._results = queue.Queue()
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run func(*args) in the background; call it from the Tk thread"""
+        self._pending += 1
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(lambda f: self._results.put((f, on_done, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    traceback.print_exception(type(error), error, error.__traceback__)
+            except Exception:
+                # A failing callback must not stop delivery of the others
+                traceback.print_exc()
+
+        if self._pending:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
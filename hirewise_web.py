@@ -1,302 +1,176 @@
-from flask import Flask, render_template_string, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session
 import json
 import os
 from datetime import datetime
-import uuid
-
-app = Flask(__name__)
+from functools import wraps
+from hirewise_store import store, DATA_FILES, normalize_email
+from hirewise_services import services, PAGE_SIZE
+from hirewise_gps import HireWiseGPS, MATRIX_MAX_KM
+from hirewise_webcache import ResponseCache
+from hirewise_assets import assets, render
+from hirewise_compress import CompressionMiddleware
+
+# Static files are served hashed and precompressed from /assets/
+app = Flask(__name__, static_folder=None)
 app.secret_key = 'hirewise_secret_key_2024'
-
-# Data files
-DATA_FILES = {
-    'users': 'hirewise_users.json',
-    'jobs': 'hirewise_jobs.json', 
-    'professionals': 'hirewise_professionals.json',
-    'quotes': 'hirewise_quotes.json',
-    'messages': 'hirewise_messages.json'
-}
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+
+response_cache = ResponseCache()
+
+# Largest max_km /api/distance-matrix accepts; the number of pairs grows
+# with its square, so one request cannot ask for the whole city
+MATRIX_MAX_KM_LIMIT = float(os.environ.get('HIREWISE_MATRIX_MAX_KM_LIMIT', 50))
+
+def cached_json(*collections):
+    """Serve a view's successful responses from response_cache until one of
+    the collections it reads changes. Views whose output depends on the
+    session must not use this."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = tuple(store.version(name) for name in collections)
+            if None in versions:
+                # The storage backend cannot tell when data changed
+                return view(*args, **kwargs)
+            
+            key = response_cache.key(request)
+            entry = response_cache.get(key, versions)
+            if entry is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = response_cache.put(key, versions, response.get_data(), response.mimetype)
+            return response_cache.respond(entry, request)
+        return wrapper
+    return decorator
+
+def json_bytes(payload):
+    """payload serialized exactly as jsonify() sends it, for servers that
+    build responses without Flask"""
+    return app.json.response(payload).get_data()
 
 def load_data(file_key):
-    try:
-        with open(DATA_FILES[file_key], 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+    return store.load(file_key)
 
 def save_data(file_key, data):
-    with open(DATA_FILES[file_key], 'w') as f:
-        json.dump(data, f)
+    store.save(file_key, data)
 
 @app.route('/')
 def home():
-    return render_template_string('''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>HireWise - Professional Service Platform</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: Arial, sans-serif; background: #f8f9fa; }
-        .navbar { background: #2c3e50; color: white; padding: 1rem 0; }
-        .nav-container { max-width: 1200px; margin: 0 auto; display: flex; justify-content: space-between; align-items: center; padding: 0 20px; }
-        .logo { font-size: 1.5rem; font-weight: bold; }
-        .nav-links { display: flex; gap: 20px; }
-        .nav-links a { color: white; text-decoration: none; padding: 8px 16px; border-radius: 4px; }
-        .nav-links a:hover { background: #34495e; }
-        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
-        .hero { background: linear-gradient(135deg, #3498db, #2c3e50); color: white; padding: 60px 20px; text-align: center; border-radius: 10px; margin-bottom: 40px; }
-        .hero h1 { font-size: 3rem; margin-bottom: 20px; }
-        .btn { display: inline-block; padding: 12px 24px; background: #27ae60; color: white; text-decoration: none; border-radius: 6px; font-weight: bold; border: none; cursor: pointer; margin: 5px; }
-        .btn:hover { background: #219a52; }
-        .btn-secondary { background: #e74c3c; }
-        .btn-secondary:hover { background: #c0392b; }
-        .section { background: white; margin: 20px 0; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-        .grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 20px 0; }
-        .card { background: #f8f9fa; padding: 20px; border-radius: 8px; border-left: 4px solid #3498db; }
-        .stats { display: flex; justify-content: space-around; text-align: center; flex-wrap: wrap; gap: 20px; }
-        .stat { background: #3498db; color: white; padding: 20px; border-radius: 8px; min-width: 120px; }
-        .form-group { margin: 15px 0; }
-        .form-group label { display: block; margin-bottom: 5px; font-weight: bold; }
-        .form-group input, .form-group select { width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 4px; }
-        .hidden { display: none; }
-        .active { display: block; }
-    </style>
-</head>
-<body>
-    <nav class="navbar">
-        <div class="nav-container">
-            <div class="logo">🔧 HireWise</div>
-            <div class="nav-links">
-                <a href="#" onclick="showSection('home')">Home</a>
-                <a href="#" onclick="showSection('professionals')">Find Professionals</a>
-                <a href="#" onclick="showSection('post-job')">Post Job</a>
-                <a href="#" onclick="showSection('login')">Login</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div id="home" class="section active">
-            <div class="hero">
-                <h1>🔧 HireWise Platform</h1>
-                <p>Professional Service Marketplace - Connect, Hire, Get Work Done</p>
-                <button class="btn" onclick="showSection('professionals')">Find Professionals</button>
-                <button class="btn btn-secondary" onclick="showSection('post-job')">Post a Job</button>
-            </div>
-            
-            <div class="stats">
-                <div class="stat"><h3>500+</h3><p>Professionals</p></div>
-                <div class="stat"><h3>1,200+</h3><p>Jobs Completed</p></div>
-                <div class="stat"><h3>4.8⭐</h3><p>Average Rating</p></div>
-                <div class="stat"><h3>24/7</h3><p>Support</p></div>
-            </div>
-            
-            <div class="grid">
-                <div class="card">
-                    <h3>🔍 Smart Matching</h3>
-                    <p>AI-powered system connects you with the best professionals.</p>
-                </div>
-                <div class="card">
-                    <h3>📍 GPS Location</h3>
-                    <p>Real-time location tracking with building-level precision.</p>
-                </div>
-                <div class="card">
-                    <h3>💳 Secure Payments</h3>
-                    <p>Integrated M-Pesa payments with wallet functionality.</p>
-                </div>
-                <div class="card">
-                    <h3>⭐ Mutual Ratings</h3>
-                    <p>AI-assisted feedback system for quality assurance.</p>
-                </div>
-            </div>
-        </div>
-
-        <div id="professionals" class="section hidden">
-            <h2>Find Professionals</h2>
-            <div id="professionals-list"></div>
-        </div>
-
-        <div id="post-job" class="section hidden">
-            <h2>Post a Job</h2>
-            <form onsubmit="postJob(event)">
-                <div class="form-group">
-                    <label>Service Type:</label>
-                    <select name="service" required>
-                        <option value="">Select Service</option>
-                        <option value="plumber">Plumber</option>
-                        <option value="cleaner">Cleaner</option>
-                        <option value="electrician">Electrician</option>
-                    </select>
-                </div>
-                <div class="form-group">
-                    <label>Description:</label>
-                    <input type="text" name="description" required>
-                </div>
-                <div class="form-group">
-                    <label>Budget (KSH):</label>
-                    <select name="budget" required>
-                        <option value="50-100">50-100</option>
-                        <option value="100-300">100-300</option>
-                        <option value="300+">300+</option>
-                    </select>
-                </div>
-                <button type="submit" class="btn">Post Job</button>
-            </form>
-        </div>
-
-        <div id="login" class="section hidden">
-            <h2>Login / Sign Up</h2>
-            <form onsubmit="loginUser(event)">
-                <div class="form-group">
-                    <label>Name:</label>
-                    <input type="text" name="name" required>
-                </div>
-                <div class="form-group">
-                    <label>Email:</label>
-                    <input type="email" name="email" required>
-                </div>
-                <div class="form-group">
-                    <label>Contact:</label>
-                    <input type="tel" name="contact" required>
-                </div>
-                <div class="form-group">
-                    <label>Account Type:</label>
-                    <select name="type" required>
-                        <option value="client">Client</option>
-                        <option value="professional">Professional</option>
-                    </select>
-                </div>
-                <button type="submit" class="btn">Login / Sign Up</button>
-            </form>
-        </div>
-    </div>
-
-    <script>
-        function showSection(sectionId) {
-            document.querySelectorAll('.section').forEach(s => s.classList.add('hidden'));
-            document.getElementById(sectionId).classList.remove('hidden');
-            
-            if (sectionId === 'professionals') {
-                loadProfessionals();
-            }
-        }
-
-        function loadProfessionals() {
-            fetch('/api/professionals')
-                .then(response => response.json())
-                .then(data => {
-                    const html = data.map(pro => `
-                        <div class="card">
-                            <h3>${pro.name} ${pro.certified ? '✓' : ''}</h3>
-                            <p><strong>Service:</strong> ${pro.service}</p>
-                            <p><strong>Rating:</strong> ${pro.rating}⭐</p>
-                            <p><strong>Price:</strong> KSH ${pro.price}</p>
-                            <button class="btn" onclick="hireProfessional('${pro.name}')">Hire Now</button>
-                        </div>
-                    `).join('');
-                    document.getElementById('professionals-list').innerHTML = html;
-                });
-        }
-
-        function postJob(event) {
-            event.preventDefault();
-            const formData = new FormData(event.target);
-            const jobData = Object.fromEntries(formData);
-            
-            fetch('/api/jobs', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify(jobData)
-            })
-            .then(response => response.json())
-            .then(data => {
-                alert('Job posted successfully!');
-                event.target.reset();
-            });
-        }
-
-        function loginUser(event) {
-            event.preventDefault();
-            const formData = new FormData(event.target);
-            const userData = Object.fromEntries(formData);
-            
-            fetch('/api/login', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify(userData)
-            })
-            .then(response => response.json())
-            .then(data => {
-                alert('Login successful!');
-                showSection('home');
-            });
-        }
+    return render('home.html')
 
-        function hireProfessional(name) {
-            alert(`Hire request sent to ${name}!`);
-        }
-    </script>
-</body>
-</html>
-    ''')
+@app.route('/assets/<name>')
+def static_asset(name):
+    status, headers, body = assets.response(name, request.headers.get('Accept-Encoding'),
+                                            request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
 
 @app.route('/api/professionals')
+@cached_json('professionals')
 def get_professionals():
-    professionals = load_data('professionals')
-    return jsonify([
-        {
-            'name': pro['name'],
-            'service': pro['service'],
-            'rating': pro['rating'],
-            'price': pro['price'],
-            'certified': pro.get('certified', False)
-        }
-        for pro in professionals.values()
-    ])
+    """One page of professionals; pass next_cursor back as cursor for the next"""
+    payload, status = professionals_page(services, request.args)
+    return jsonify(payload), status
+
+def professionals_page(services, args):
+    """(payload, status) for /api/professionals with the given query args"""
+    certified = args.get('certified')
+    try:
+        min_rating = float(args['min_rating']) if args.get('min_rating') else None
+        limit = int(args.get('limit', PAGE_SIZE))
+    except ValueError:
+        return {'error': 'min_rating and limit must be numbers'}, 400
+    try:
+        rows, next_cursor = services.professionals.search(
+            service=args.get('service', 'All'),
+            location=args.get('location', 'All'),
+            min_rating=min_rating,
+            price=args.get('price', 'All'),
+            certified=None if certified is None else certified.lower() in ('1', 'true', 'yes'),
+            sort=args.get('sort', 'rating'),
+            limit=limit,
+            cursor=args.get('cursor'))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    return {
+        'professionals': [
+            {
+                'name': pro['name'],
+                'service': pro['service'],
+                'rating': pro['rating'],
+                'price': pro['price'],
+                'location': pro.get('location'),
+                'certified': pro.get('certified', False)
+            }
+            for pro_id, pro in rows
+        ],
+        'next_cursor': next_cursor
+    }, 200
 
 @app.route('/api/jobs', methods=['POST'])
 def create_job():
     job_data = request.json
-    jobs = load_data('jobs')
     
-    job_id = str(uuid.uuid4())[:8]
-    jobs[job_id] = {
-        'id': job_id,
-        'service': job_data['service'],
-        'description': job_data['description'],
-        'budget': job_data['budget'],
-        'status': 'Open',
-        'created': datetime.now().isoformat()
-    }
+    client = session.get('user', {}).get('email')
+    job_id, job = services.jobs.post_job(client and normalize_email(client), job_data['service'],
+                                         job_data['description'], job_data['budget'])
     
-    save_data('jobs', jobs)
     return jsonify({'success': True, 'job_id': job_id})
 
+@app.route('/api/distance-matrix')
+def distance_matrix():
+    """Distances from open jobs to nearby professionals, streamed as one
+    JSON object per line so large matrices never sit in memory"""
+    try:
+        max_km = float(request.args.get('max_km', MATRIX_MAX_KM))
+    except ValueError:
+        return jsonify({'error': 'max_km must be a number'}), 400
+    if not max_km > 0:  # also false for nan
+        return jsonify({'error': 'max_km must be positive'}), 400
+    if max_km > MATRIX_MAX_KM_LIMIT:
+        return jsonify({'error': f'max_km must be at most {MATRIX_MAX_KM_LIMIT:g}'}), 400
+    service = request.args.get('service')
+    match_service = request.args.get('match_service', 'true').lower() not in ('0', 'false', 'no')
+    
+    gps = HireWiseGPS()
+    gps.store = store
+    
+    def generate():
+        for chunk in gps.job_distance_matrix(max_km, service, match_service):
+            yield ''.join(json.dumps({'job': job_id, 'professional': pro_id, 'km': round(km, 3)}) + '\n'
+                          for job_id, pro_id, km in chunk)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
 @app.route('/api/login', methods=['POST'])
 def login():
     user_data = request.json
-    users = load_data('users')
-    
-    user_id = user_data['email']
-    users[user_id] = {
+    save_login(store, user_data)
+    session['user'] = user_data
+    return jsonify({'success': True})
+
+def save_login(store, user_data):
+    """Create or update the user record for a login. An existing record is
+    updated under the store's lock, keeping its other fields (created,
+    ratings, coordinates) so a concurrent write to it is not lost."""
+    details = {
         'name': user_data['name'],
-        'email': user_data['email'],
         'contact': user_data['contact'],
-        'type': user_data['type'],
-        'created': datetime.now().isoformat()
+        'type': user_data['type']
     }
-    
-    save_data('users', users)
-    session['user'] = user_data
-    return jsonify({'success': True})
+    user_id = store.get_by_email('users', user_data['email'])[0]
+    if user_id is not None and store.update_many('users', [user_id], lambda _, user: dict(user, **details)):
+        return user_id
+    # New accounts are keyed by the normalized email, so logins racing to
+    # create one write the same record
+    user_id = normalize_email(user_data['email'])
+    store.put('users', user_id, dict(details, email=user_id, created=datetime.now().isoformat()))
+    return user_id
 
 if __name__ == '__main__':
     # Initialize data files
-    for file_path in DATA_FILES.values():
-        if not os.path.exists(file_path):
-            with open(file_path, 'w') as f:
-                json.dump({}, f)
+    store.ensure_files()
     
     # Add sample data
     if os.path.getsize(DATA_FILES['professionals']) == 0:
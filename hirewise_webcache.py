@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+RESPONSE_CACHE_SIZE = 512
+# Clients may reuse a response for this many seconds before revalidating
+CACHE_MAX_AGE = 0
+
+class CachedResponse:
+    """Serialized body of a response with its validator"""
+    __slots__ = ('versions', 'body', 'mimetype', 'etag')
+
+    def __init__(self, versions, body, mimetype):
+        self.versions = versions
+        self.body = body
+        self.mimetype = mimetype
+        # Derived from the bytes, so every worker process agrees on it
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+
+class ResponseCache:
+    """Serialized JSON responses keyed by (path, query), valid while the
+    versions of the collections they were built from are unchanged.
+
+    A write to one collection only changes that collection's version, so
+    only responses built from it are rebuilt. Responses carry an ETag and
+    Cache-Control, and If-None-Match requests for an unchanged response get
+    a 304 without the view running.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, max_age=CACHE_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(request):
+        # Parameter order does not matter
+        return request.path, tuple(sorted(request.args.items(multi=True)))
+
+    def get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.versions != versions:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, versions, body, mimetype):
+        entry = CachedResponse(versions, body, mimetype)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def respond(self, entry, request):
+        """The cached response, or 304 if the client already has it"""
+        if request.if_none_match.contains_weak(entry.etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = f"public, max-age={self.max_age}, must-revalidate"
+        return response
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self._entries)
+        }
@@ -0,0 +1,75 @@
+function showSection(sectionId) {
+    document.querySelectorAll('.section').forEach(s => s.classList.add('hidden'));
+    document.getElementById(sectionId).classList.remove('hidden');
+
+    if (sectionId === 'professionals') {
+        loadProfessionals();
+    }
+}
+
+let nextCursor = null;
+
+function loadProfessionals(more) {
+    const url = more && nextCursor
+        ? '/api/professionals?cursor=' + encodeURIComponent(nextCursor)
+        : '/api/professionals';
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            const html = data.professionals.map(pro => `
+                <div class="card">
+                    <h3>${pro.name} ${pro.certified ? '✓' : ''}</h3>
+                    <p><strong>Service:</strong> ${pro.service}</p>
+                    <p><strong>Rating:</strong> ${pro.rating}⭐</p>
+                    <p><strong>Price:</strong> KSH ${pro.price}</p>
+                    <button class="btn" onclick="hireProfessional('${pro.name}')">Hire Now</button>
+                </div>
+            `).join('');
+            const list = document.getElementById('professionals-list');
+            if (more) {
+                list.insertAdjacentHTML('beforeend', html);
+            } else {
+                list.innerHTML = html;
+            }
+            nextCursor = data.next_cursor;
+            document.getElementById('load-more').classList.toggle('hidden', !nextCursor);
+        });
+}
+
+function postJob(event) {
+    event.preventDefault();
+    const formData = new FormData(event.target);
+    const jobData = Object.fromEntries(formData);
+
+    fetch('/api/jobs', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(jobData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        alert('Job posted successfully!');
+        event.target.reset();
+    });
+}
+
+function loginUser(event) {
+    event.preventDefault();
+    const formData = new FormData(event.target);
+    const userData = Object.fromEntries(formData);
+
+    fetch('/api/login', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(userData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        alert('Login successful!');
+        showSection('home');
+    });
+}
+
+function hireProfessional(name) {
+    alert(`Hire request sent to ${name}!`);
+}
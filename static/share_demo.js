@@ -0,0 +1,231 @@
+function showSection(sectionId) {
+    document.querySelectorAll('.section').forEach(s => s.classList.add('hidden'));
+    document.getElementById(sectionId).classList.remove('hidden');
+}
+
+function filterProfessionals() {
+    const filter = document.getElementById('serviceFilter').value;
+    const cards = document.querySelectorAll('.professional-card');
+    cards.forEach(card => {
+        if (filter === 'all' || card.dataset.service === filter) {
+            card.style.display = 'block';
+        } else {
+            card.style.display = 'none';
+        }
+    });
+}
+
+function hireProfessional(name) {
+    document.getElementById('hireText').textContent = `Send a hire request to ${name}?`;
+    document.getElementById('hireModal').style.display = 'block';
+}
+
+function closeModal() {
+    document.getElementById('hireModal').style.display = 'none';
+}
+
+function sendHireRequest() {
+    alert('Hire request sent successfully! The professional will contact you soon.');
+    closeModal();
+}
+
+function postJob(event) {
+    event.preventDefault();
+    alert('Job posted successfully! Professionals will start sending quotes soon.');
+}
+
+let currentUser = null;
+
+function loginUser(event) {
+    event.preventDefault();
+    const form = event.target;
+    const name = form.querySelector('input[type="text"]').value;
+    const email = form.querySelector('input[type="email"]').value;
+    const userType = form.querySelector('select').value;
+
+    currentUser = { name, email, type: userType };
+    showDashboard();
+}
+
+function showDashboard() {
+    document.querySelectorAll('.section').forEach(s => s.classList.add('hidden'));
+
+    const dashboardHtml = `
+        <div class="section active" id="dashboard">
+            <div class="hero">
+                <h1>Welcome, ${currentUser.name}!</h1>
+                <p>${currentUser.type} Dashboard</p>
+                <button class="btn btn-secondary" onclick="logout()">Logout</button>
+            </div>
+
+            <div class="grid">
+                ${currentUser.type === 'client' ? `
+                    <div class="card">
+                        <h3>📝 Post a Job</h3>
+                        <p>Create new job postings and find professionals.</p>
+                        <button class="btn" onclick="showSection('post-job')">Post Job</button>
+                    </div>
+                    <div class="card">
+                        <h3>👥 Find Professionals</h3>
+                        <p>Browse and hire certified professionals.</p>
+                        <button class="btn" onclick="showSection('professionals')">Find Pros</button>
+                    </div>
+                    <div class="card">
+                        <h3>💼 My Jobs</h3>
+                        <p>View your posted jobs and manage quotes.</p>
+                        <button class="btn" onclick="showMyJobs()">My Jobs</button>
+                    </div>
+                    <div class="card">
+                        <h3>💬 Messages</h3>
+                        <p>Chat with professionals and manage communications.</p>
+                        <button class="btn" onclick="showMessages()">Messages</button>
+                    </div>
+                ` : `
+                    <div class="card">
+                        <h3>👤 My Profile</h3>
+                        <p>Manage your professional profile and services.</p>
+                        <button class="btn" onclick="showProfile()">Edit Profile</button>
+                    </div>
+                    <div class="card">
+                        <h3>🔍 Browse Jobs</h3>
+                        <p>Find available jobs and send quotes.</p>
+                        <button class="btn" onclick="showAvailableJobs()">Browse Jobs</button>
+                    </div>
+                    <div class="card">
+                        <h3>📋 My Quotes</h3>
+                        <p>Track your sent quotes and job applications.</p>
+                        <button class="btn" onclick="showMyQuotes()">My Quotes</button>
+                    </div>
+                    <div class="card">
+                        <h3>💬 Messages</h3>
+                        <p>Communicate with clients and manage chats.</p>
+                        <button class="btn" onclick="showMessages()">Messages</button>
+                    </div>
+                `}
+            </div>
+        </div>
+    `;
+
+    document.querySelector('.container').innerHTML += dashboardHtml;
+}
+
+function logout() {
+    currentUser = null;
+    location.reload();
+}
+
+function showMyJobs() {
+    const jobsHtml = `
+        <div class="section active" id="my-jobs">
+            <h2>My Posted Jobs</h2>
+            <div class="professionals-grid">
+                <div class="professional-card">
+                    <h3>Plumbing Repair</h3>
+                    <p><strong>Budget:</strong> KSH 100-300</p>
+                    <p><strong>Status:</strong> Open</p>
+                    <p><strong>Quotes:</strong> 3 received</p>
+                    <button class="btn">View Quotes</button>
+                </div>
+                <div class="professional-card">
+                    <h3>House Cleaning</h3>
+                    <p><strong>Budget:</strong> KSH 50-100</p>
+                    <p><strong>Status:</strong> Assigned</p>
+                    <p><strong>Professional:</strong> Mary Cleaner</p>
+                    <button class="btn">Contact Pro</button>
+                </div>
+            </div>
+            <button class="btn btn-secondary" onclick="showDashboard()">Back to Dashboard</button>
+        </div>
+    `;
+    document.querySelector('.container').innerHTML = jobsHtml;
+}
+
+function showAvailableJobs() {
+    const jobsHtml = `
+        <div class="section active" id="available-jobs">
+            <h2>Available Jobs</h2>
+            <div class="professionals-grid">
+                <div class="professional-card">
+                    <h3>Electrical Wiring</h3>
+                    <p><strong>Client:</strong> John Doe</p>
+                    <p><strong>Budget:</strong> KSH 200-500</p>
+                    <p><strong>Location:</strong> Nairobi</p>
+                    <button class="btn" onclick="sendQuote('Electrical Wiring')">Send Quote</button>
+                </div>
+                <div class="professional-card">
+                    <h3>Carpet Cleaning</h3>
+                    <p><strong>Client:</strong> Jane Smith</p>
+                    <p><strong>Budget:</strong> KSH 50-100</p>
+                    <p><strong>Location:</strong> Mombasa</p>
+                    <button class="btn" onclick="sendQuote('Carpet Cleaning')">Send Quote</button>
+                </div>
+            </div>
+            <button class="btn btn-secondary" onclick="showDashboard()">Back to Dashboard</button>
+        </div>
+    `;
+    document.querySelector('.container').innerHTML = jobsHtml;
+}
+
+function showMyQuotes() {
+    const quotesHtml = `
+        <div class="section active" id="my-quotes">
+            <h2>My Quotes</h2>
+            <div class="professionals-grid">
+                <div class="professional-card">
+                    <h3>Kitchen Repair</h3>
+                    <p><strong>Client:</strong> Alice Johnson</p>
+                    <p><strong>Quote:</strong> KSH 250</p>
+                    <p><strong>Status:</strong> Pending</p>
+                    <p><strong>Location:</strong> Westlands, Nairobi</p>
+                    <button class="btn" onclick="openMaps('Westlands Nairobi')">📍 View Location</button>
+                </div>
+                <div class="professional-card">
+                    <h3>Bathroom Cleaning</h3>
+                    <p><strong>Client:</strong> Bob Wilson</p>
+                    <p><strong>Quote:</strong> KSH 80</p>
+                    <p><strong>Status:</strong> Accepted</p>
+                    <p><strong>Location:</strong> Karen, Nairobi</p>
+                    <button class="btn" onclick="openMaps('Karen Nairobi')">📍 View Location</button>
+                </div>
+            </div>
+            <button class="btn btn-secondary" onclick="showDashboard()">Back to Dashboard</button>
+        </div>
+    `;
+    document.querySelector('.container').innerHTML = quotesHtml;
+}
+
+function showMessages() {
+    const messagesHtml = `
+        <div class="section active" id="messages">
+            <h2>Messages</h2>
+            <div class="card">
+                <h3>Chat with John Plumber</h3>
+                <p><em>"I can fix your sink tomorrow morning. What time works for you?"</em></p>
+                <small>2 hours ago</small>
+            </div>
+            <div class="card">
+                <h3>Chat with Mary Cleaner</h3>
+                <p><em>"Job completed successfully! Please rate my service."</em></p>
+                <small>1 day ago</small>
+            </div>
+            <button class="btn btn-secondary" onclick="showDashboard()">Back to Dashboard</button>
+        </div>
+    `;
+    document.querySelector('.container').innerHTML = messagesHtml;
+}
+
+function sendQuote(jobTitle) {
+    alert(`Quote sent for ${jobTitle}! Client will review and respond soon.`);
+}
+
+function openMaps(location) {
+    window.open(`https://www.google.com/maps/search/${location.replace(' ', '+')}`, '_blank');
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('hireModal');
+    if (event.target === modal) {
+        modal.style.display = 'none';
+    }
+}
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+
+import pytest
+
+import hirewise_gps
+import hirewise_web
+from hirewise_gps import HireWiseGPS, distance_matrix, professional_coords
+from hirewise_spatial import haversine
+from hirewise_store import DATA_FILES, HireWiseStore
+
+# Small blocks so pairs straddle block and latitude band edges
+BLOCK = 7
+
+def random_points(rng, prefix, count, spread=0.05):
+    return [(f"{prefix}{i}", -1.29 + rng.uniform(-spread, spread), 36.82 + rng.uniform(-spread, spread))
+            for i in range(count)]
+
+def brute_force(origins, targets, max_km):
+    pairs = {}
+    for origin_id, origin_lat, origin_lng in origins:
+        for target_id, target_lat, target_lng in targets:
+            km = haversine(origin_lat, origin_lng, target_lat, target_lng)
+            if max_km is None or km <= max_km:
+                pairs[(origin_id, target_id)] = km
+    return pairs
+
+def collect(chunks, block_size=BLOCK):
+    pairs = {}
+    for chunk in chunks:
+        assert 0 < len(chunk) <= block_size * block_size
+        for origin_id, target_id, km in chunk:
+            assert (origin_id, target_id) not in pairs
+            pairs[(origin_id, target_id)] = km
+    return pairs
+
+def assert_same_pairs(pairs, expected):
+    # Pairs within rounding of max_km may land either side of it
+    assert set(pairs) == set(expected)
+    for pair, km in expected.items():
+        assert pairs[pair] == pytest.approx(km, abs=1e-6)
+
+@pytest.fixture(params=['numpy', 'scalar'])
+def backend(request, monkeypatch):
+    if request.param == 'scalar':
+        monkeypatch.setattr(hirewise_gps, 'np', None)
+    elif hirewise_gps.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+@pytest.mark.parametrize('max_km', [0.5, 2.0, 6.0, None])
+def test_distance_matrix_matches_brute_force(backend, max_km):
+    rng = random.Random(7)
+    origins = random_points(rng, 'job', 60)
+    targets = random_points(rng, 'pro', 90)
+    # Duplicate and far-away points
+    targets += [('pro-same', origins[0][1], origins[0][2]), ('pro-far', -1.9, 37.5)]
+    expected = brute_force(origins, targets, max_km)
+    assert_same_pairs(collect(distance_matrix(origins, targets, max_km, BLOCK)), expected)
+
+def test_distance_matrix_with_no_points(backend):
+    assert list(distance_matrix([], [('pro', -1.29, 36.82)], 5.0, BLOCK)) == []
+    assert list(distance_matrix([('job', -1.29, 36.82)], [], 5.0, BLOCK)) == []
+
+@pytest.fixture
+def gps_store(tmp_path):
+    store = HireWiseStore({name: os.path.join(str(tmp_path), filename) for name, filename in DATA_FILES.items()})
+    store.ensure_files()
+    rng = random.Random(11)
+    services = ['Plumber', 'Cleaner', 'Electrician']
+    for job_id, lat, lng in random_points(rng, 'job', 40):
+        store.put('jobs', job_id, {'id': job_id, 'service': rng.choice(services), 'lat': lat, 'lng': lng,
+                                   'status': rng.choice(['Open', 'Open', 'Assigned'])})
+    store.put('jobs', 'job-nowhere', {'id': 'job-nowhere', 'service': 'Plumber', 'status': 'Open'})
+    for pro_id, lat, lng in random_points(rng, 'pro', 60):
+        store.put('professionals', pro_id, {'name': pro_id, 'service': rng.choice(services),
+                                            'lat': lat, 'lng': lng})
+    # Profiles without coordinates fall back to their location text
+    store.put('professionals', 'pro-kilimani', {'name': 'K', 'service': 'Plumber', 'location': 'Kilimani'})
+    gps = HireWiseGPS()
+    gps.store = store
+    return gps
+
+def expected_job_pairs(store, max_km, service_type=None, match_service=True):
+    pros = store.load('professionals')
+    expected = {}
+    for job_id, job in store.load('jobs').items():
+        if job['status'] != 'Open' or 'lat' not in job:
+            continue
+        if service_type and job['service'] != service_type:
+            continue
+        wanted = job['service'] if match_service else service_type
+        targets = [(pro_id,) + professional_coords(pro_id, pro) for pro_id, pro in pros.items()
+                   if not wanted or pro['service'] == wanted]
+        expected.update(brute_force([(job_id, job['lat'], job['lng'])], targets, max_km))
+    return expected
+
+@pytest.mark.parametrize('service_type, match_service', [
+    (None, True), (None, False), ('Plumber', True), ('Plumber', False)])
+def test_job_distance_matrix_matches_brute_force(gps_store, service_type, match_service):
+    pairs = collect(gps_store.job_distance_matrix(3.0, service_type, match_service, BLOCK))
+    assert_same_pairs(pairs, expected_job_pairs(gps_store.store, 3.0, service_type, match_service))
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return hirewise_web.app.test_client()
+
+@pytest.mark.parametrize('max_km', ['abc', '0', '-1', 'nan', '50.1', '1000', 'inf'])
+def test_rejects_out_of_range_max_km(client, max_km):
+    response = client.get(f'/api/distance-matrix?max_km={max_km}')
+    assert response.status_code == 400
+    assert 'max_km' in response.get_json()['error']
+
+def test_streams_the_matrix_up_to_the_limit(client, gps_store, monkeypatch):
+    monkeypatch.setattr(hirewise_web, 'store', gps_store.store)
+    limit = hirewise_web.MATRIX_MAX_KM_LIMIT
+    response = client.get(f'/api/distance-matrix?max_km={limit}&service=Plumber')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    expected = expected_job_pairs(gps_store.store, limit, 'Plumber')
+    assert {(row['job'], row['professional']): row['km'] for row in rows} == {
+        pair: round(km, 3) for pair, km in expected.items()}
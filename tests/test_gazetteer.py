@@ -0,0 +1,47 @@
+import pytest
+
+from hirewise_gazetteer import gazetteer
+
+@pytest.mark.parametrize('text, name', [
+    ('kileleshwa', 'Kileleshwa'),
+    ('dkileleshwa', 'Kileleshwa'),
+    ('Kilimani Estate', 'Kilimani'),
+    ('Westgate Apartments, WAIYAKI WAY', 'Waiyaki Way'),
+    ('Sunrise Apartments, Ngong Rd', 'Ngong Road'),
+    ('Lavingtn', 'Lavington'),
+    ('Block B, mombasa roa', 'Mombasa Road'),
+    ('MUTHAMA', 'Muthama'),
+    ('muthama', 'Muthama'),
+    ('Jabulani Villa, MUTHAM ROAD', 'Mutham Road'),
+    ('Apt A1, Jabulani Villa, MUTHAM ROAD', 'Mutham Road'),
+    ('Garden Estate, THIKA ROAD', 'Garden Estate'),
+    ('Thika Road', 'Thika Road'),
+])
+def test_resolves_known_places(text, name):
+    assert gazetteer.resolve(text).name == name
+
+@pytest.mark.parametrize('text', [
+    'Building, ROAD',
+    'ROAD',
+    'X, Foo Road',
+    'Locating...',
+    'Location detection failed',
+    '',
+])
+def test_generic_words_and_placeholders_match_nothing(text):
+    assert gazetteer.resolve(text) is None
+
+@pytest.mark.parametrize('text', [
+    # A road named after an estate is not the estate's centre
+    'Westlands Road',
+    # Close in spelling to Muthaiga, Muthama and Kariobangi but not them
+    'Muthaka',
+    'Kariokor',
+    'Rhapta Lane',
+])
+def test_near_misses_match_nothing(text):
+    assert gazetteer.resolve(text) is None
+
+@pytest.mark.parametrize('text', ['thika', 'Thika Town', 'Mombasa', 'Some Place, Nakuru'])
+def test_places_outside_nairobi_match_nothing(text):
+    assert gazetteer.resolve(text) is None
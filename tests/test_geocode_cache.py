@@ -0,0 +1,100 @@
+import pytest
+
+import hirewise_geocode
+from hirewise_geocode import GeocodeCache, geocode_address, reverse_geocode_address
+from hirewise_http import HttpClient
+
+ADDRESS = {'road': 'Ngong Road', 'suburb': 'Kilimani', 'city': 'Nairobi'}
+
+@pytest.fixture
+def nominatim(stub_server, monkeypatch):
+    """The stub server standing in for Nominatim, through a fresh client"""
+    def handler(path, params):
+        if path == '/reverse':
+            return 200, {'address': ADDRESS}
+        if path == '/search':
+            if 'nowhere' in params['q'].lower():
+                return 200, []
+            return 200, [{'lat': '-1.2921', 'lon': '36.8219'}]
+        return 404, {}
+    stub_server.handler = handler
+    monkeypatch.setattr(hirewise_geocode, 'NOMINATIM_URL', stub_server.url)
+    monkeypatch.setattr(hirewise_geocode, 'http_client', HttpClient(timeout=2))
+    return stub_server
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(hirewise_geocode.time, 'time', lambda: now[0])
+    return now
+
+def test_reverse_lookup_hit(nominatim, tmp_path):
+    cache = GeocodeCache(str(tmp_path / 'geocode.db'))
+    assert reverse_geocode_address(-1.29211, 36.82194, cache=cache) == ADDRESS
+    # Within the rounding precision: same building, no second request
+    assert reverse_geocode_address(-1.29213, 36.82191, cache=cache) == ADDRESS
+    assert len(nominatim.requests) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_not_found_is_cached(nominatim):
+    cache = GeocodeCache(None)
+    assert geocode_address("Nowhere Estate", cache=cache) is None
+    assert geocode_address("nowhere   estate", cache=cache) is None
+    assert len(nominatim.requests) == 1
+    assert geocode_address("Kilimani", cache=cache) == (-1.2921, 36.8219)
+
+def test_failed_lookup_is_not_cached(nominatim):
+    cache = GeocodeCache(None)
+    nominatim.handler = lambda path, params: (503, {})
+    assert reverse_geocode_address(-1.3, 36.8, cache=cache) is None
+    nominatim.handler = lambda path, params: (200, {'address': ADDRESS})
+    assert reverse_geocode_address(-1.3, 36.8, cache=cache) == ADDRESS
+    assert len(nominatim.requests) == 2
+
+def test_entries_expire_after_ttl(nominatim, clock, tmp_path):
+    cache = GeocodeCache(str(tmp_path / 'geocode.db'), ttl=60)
+    reverse_geocode_address(-1.3, 36.8, cache=cache)
+    clock[0] += 59
+    reverse_geocode_address(-1.3, 36.8, cache=cache)
+    assert len(nominatim.requests) == 1
+
+    clock[0] += 2
+    reverse_geocode_address(-1.3, 36.8, cache=cache)
+    assert len(nominatim.requests) == 2
+    assert cache.stats()['expired'] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = GeocodeCache(None, max_entries=2)
+    cache.put(-1.1, 36.1, {'road': 'a'})
+    cache.put(-1.2, 36.2, {'road': 'b'})
+    assert cache.get(-1.1, 36.1) == {'road': 'a'}
+    cache.put(-1.3, 36.3, {'road': 'c'})
+
+    assert cache.get(-1.2, 36.2) is None
+    assert cache.get(-1.1, 36.1) == {'road': 'a'}
+    assert cache.get(-1.3, 36.3) == {'road': 'c'}
+    assert cache.stats()['evictions'] == 1
+
+def test_disk_cache_is_bounded(clock, tmp_path):
+    cache = GeocodeCache(str(tmp_path / 'geocode.db'), max_entries=3)
+    for i in range(5):
+        clock[0] += 1
+        cache.put(-1.0 - i / 10, 36.0, {'road': str(i)})
+
+    reopened = GeocodeCache(str(tmp_path / 'geocode.db'), max_entries=3)
+    assert [reopened.get(-1.0 - i / 10, 36.0) for i in range(5)] == \
+        [None, None, {'road': '2'}, {'road': '3'}, {'road': '4'}]
+
+def test_results_survive_reopening(nominatim, tmp_path):
+    path = str(tmp_path / 'geocode.db')
+    reverse_geocode_address(-1.3, 36.8, cache=GeocodeCache(path))
+    geocode_address("Nowhere Estate", cache=GeocodeCache(path))
+    assert len(nominatim.requests) == 2
+
+    reopened = GeocodeCache(path)
+    assert reverse_geocode_address(-1.3, 36.8, cache=reopened) == ADDRESS
+    assert geocode_address("Nowhere Estate", cache=reopened) is None
+    assert len(nominatim.requests) == 2
+    assert reopened.stats()['hits'] == 2
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from hirewise_http import CircuitOpenError, HttpClient, RateLimiter
+
+RESET_TIMEOUT = 0.3
+
+@pytest.fixture
+def client():
+    client = HttpClient(timeout=2, failure_threshold=3, reset_timeout=RESET_TIMEOUT)
+    yield client
+    client.close()
+
+def test_breaker_opens_after_threshold(stub_server, client):
+    stub_server.handler = lambda path, params: (503, {})
+    for _ in range(3):
+        assert client.get(stub_server.url + '/down').status_code == 503
+    assert client.breaker(stub_server.host).state == 'open'
+
+    # Open: fails fast without touching the server
+    with pytest.raises(CircuitOpenError):
+        client.get(stub_server.url + '/down')
+    assert len(stub_server.requests) == 3
+
+def test_breaker_half_opens_then_closes_on_success(stub_server, client):
+    stub_server.handler = lambda path, params: (500, {})
+    for _ in range(3):
+        client.get(stub_server.url + '/flaky')
+    time.sleep(RESET_TIMEOUT + 0.05)
+    breaker = client.breaker(stub_server.host)
+    assert breaker.state == 'half-open'
+
+    stub_server.handler = lambda path, params: (200, {'ok': True})
+    assert client.get(stub_server.url + '/flaky').json() == {'ok': True}
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+
+def test_failed_trial_reopens(stub_server, client):
+    stub_server.handler = lambda path, params: (500, {})
+    for _ in range(3):
+        client.get(stub_server.url + '/flaky')
+    time.sleep(RESET_TIMEOUT + 0.05)
+
+    assert client.get(stub_server.url + '/flaky').status_code == 500
+    assert client.breaker(stub_server.host).state == 'open'
+    with pytest.raises(CircuitOpenError):
+        client.get(stub_server.url + '/flaky')
+    assert len(stub_server.requests) == 4
+
+def test_timeouts_count_as_failures(stub_server, client):
+    def slow(path, params):
+        time.sleep(0.5)
+        return 200, {}
+    stub_server.handler = slow
+    client.configure(stub_server.host, timeout=0.1)
+
+    for _ in range(3):
+        with pytest.raises(requests.Timeout):
+            client.get(stub_server.url + '/slow')
+    start = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.get(stub_server.url + '/slow')
+    assert time.monotonic() - start < 0.05
+
+def test_client_errors_do_not_open_the_breaker(stub_server, client):
+    stub_server.handler = lambda path, params: (404, {})
+    for _ in range(5):
+        assert client.get(stub_server.url + '/missing').status_code == 404
+    assert client.breaker(stub_server.host).state == 'closed'
+
+def test_rate_limit_spaces_requests(stub_server, client):
+    times = []
+    def handler(path, params):
+        times.append(time.monotonic())
+        return 200, {}
+    stub_server.handler = handler
+    client.configure(stub_server.host, min_interval=0.1)
+
+    threads = [threading.Thread(target=client.get, args=(stub_server.url + '/search',)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    times.sort()
+    assert len(times) == 5
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # Allow for scheduling jitter between the limiter and the server
+    assert min(gaps) > 0.08
+    assert times[-1] - times[0] >= 0.38
+
+def test_rate_limiter_does_not_delay_spaced_calls():
+    limiter = RateLimiter(0.05)
+    limiter.wait()
+    time.sleep(0.06)
+    start = time.monotonic()
+    limiter.wait()
+    assert time.monotonic() - start < 0.01
+
+def _shared_waits(path, calls, start, times):
+    limiter = RateLimiter(0.05, path)
+    start.wait()
+    for _ in range(calls):
+        limiter.wait()
+        times.append(time.time())
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_shared_rate_limit_spaces_calls_across_processes(tmp_path):
+    context = multiprocessing.get_context('fork')
+    path = str(tmp_path / 'rate.lock')
+    start = context.Event()
+    times = context.Manager().list()
+    processes = [context.Process(target=_shared_waits, args=(path, 4, start, times)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    start.set()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    times = sorted(times)
+    assert len(times) == 12
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # One budget for all three processes, not one each
+    assert min(gaps) > 0.04
+    assert times[-1] - times[0] >= 0.5
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+
+from hirewise_sqlite import HireWiseSQLStore
+from hirewise_store import DATA_FILES
+
+def open_store(tmp_path):
+    data_files = {name: os.path.join(str(tmp_path), filename) for name, filename in DATA_FILES.items()}
+    return HireWiseSQLStore(f"sqlite:///{tmp_path / 'hirewise.db'}", data_files)
+
+def open_jobs(store):
+    return store.query_index('jobs', 'status', lambda index, data: sorted(index.ids('Open')))
+
+def test_index_follows_writes_from_other_stores(tmp_path):
+    reader, writer = open_store(tmp_path), open_store(tmp_path)
+    writer.save('jobs', {'j1': {'status': 'Open'}, 'j2': {'status': 'Closed'}})
+    assert open_jobs(reader) == ['j1']
+    version = reader.version('jobs')
+
+    writer.put('jobs', 'j3', {'status': 'Open'})
+    writer.update_many('jobs', ['j1'], lambda record_id, record: dict(record, status='Closed'))
+    assert reader.version('jobs') == version + 2
+    assert open_jobs(reader) == ['j3']
+    assert reader.load('jobs') == reader.query_index('jobs', 'status', lambda index, data: data)
+
+def test_rewrite_drops_removed_records(tmp_path):
+    reader, writer = open_store(tmp_path), open_store(tmp_path)
+    writer.save('jobs', {'j1': {'status': 'Open'}, 'j2': {'status': 'Open'}})
+    assert open_jobs(reader) == ['j1', 'j2']
+
+    writer.save('jobs', {'j2': {'status': 'Open'}})
+    assert open_jobs(reader) == ['j2']
+
+def test_unchanged_collection_reuses_the_index(tmp_path):
+    store = open_store(tmp_path)
+    store.save('jobs', {'j1': {'status': 'Open'}})
+    first = store.query_index('jobs', 'status', lambda index, data: index)
+    assert store.query_index('jobs', 'status', lambda index, data: index) is first
+    store.put('users', 'a@example.com', {'email': 'a@example.com'})
+    assert store.query_index('jobs', 'status', lambda index, data: index) is first
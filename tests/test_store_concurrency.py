@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+
+import pytest
+
+import hirewise_web
+from hirewise_services import HireWiseServices
+from hirewise_store import DATA_FILES, HireWiseStore, log_path_for, normalize_email
+
+WRITERS = 4
+LOGINS_PER_WRITER = 100
+JOBS_PER_LOGIN = 3
+# Accounts every writer logs in to at once, each with its own casing; the
+# first SEEDED_ACCOUNTS exist beforehand with fields a login must keep
+SHARED_ACCOUNTS = 10
+SEEDED_ACCOUNTS = 5
+RATINGS_PER_WRITER = 50
+CONTESTED_JOBS = 20
+PRO_EMAIL = 'rated.pro@example.com'
+
+def data_files(tmp_dir):
+    return {name: os.path.join(tmp_dir, filename) for name, filename in DATA_FILES.items()}
+
+def open_store(backend, tmp_dir, compact_after=50):
+    if backend == 'sqlite':
+        from hirewise_sqlite import HireWiseSQLStore
+        return HireWiseSQLStore(f"sqlite:///{os.path.join(tmp_dir, 'hirewise.db')}", data_files(tmp_dir))
+    # A low compaction threshold makes compactions run while others append
+    return HireWiseStore(data_files(tmp_dir), compact_after=compact_after)
+
+def user_email(worker, i):
+    return f"User{worker}-{i}@Example.com"
+
+def shared_email(i, worker):
+    # Same account, different casing and spacing per writer
+    email = f"shared{i}@example.com"
+    return f" {email.upper()} " if worker % 2 else email.title()
+
+def worker_pro(worker):
+    return f"pro{worker}@example.com"
+
+def seed(store):
+    store.ensure_files()
+    for i in range(SEEDED_ACCOUNTS):
+        store.put('users', f"shared{i}@example.com", {
+            'name': 'Seeded', 'email': f"shared{i}@example.com", 'contact': '0700000000',
+            'type': 'client', 'created': 'seeded', 'rating': 4.5, 'rating_count': 2,
+            'lat': -1.29, 'lng': 36.82})
+    store.put('professionals', PRO_EMAIL, {'name': 'Rated Pro', 'email': PRO_EMAIL, 'service': 'Plumber'})
+    for job in range(CONTESTED_JOBS):
+        store.put('jobs', f"contested{job}", {'id': f"contested{job}", 'client': 'someone@example.com',
+                                              'service': 'Plumber', 'status': 'Open'})
+        for worker in range(WRITERS):
+            store.put('quotes', f"q{job}-{worker}", {'id': f"q{job}-{worker}", 'job_id': f"contested{job}",
+                                                      'professional': worker_pro(worker), 'status': 'Sent'})
+
+def login(client, email, name):
+    response = client.post('/api/login', json={'name': name, 'email': email,
+                                                'contact': '0712345678', 'type': 'client'})
+    assert response.status_code == 200
+
+def writer(backend, tmp_dir, worker, start):
+    store = open_store(backend, tmp_dir)
+    services = HireWiseServices(store)
+    # The app's views use the module's store; point them at this one
+    hirewise_web.store = store
+    hirewise_web.services = services
+    client = hirewise_web.app.test_client()
+    start.wait()
+
+    for i in range(LOGINS_PER_WRITER):
+        login(client, user_email(worker, i), f"User {worker}-{i}")
+        for j in range(JOBS_PER_LOGIN):
+            response = client.post('/api/jobs', json={'service': 'Plumber', 'budget': '50-100',
+                                                      'description': f"job {worker}-{i}-{j}"})
+            assert response.status_code == 200
+    for i in range(SHARED_ACCOUNTS):
+        login(client, shared_email(i, worker), f"Writer {worker}")
+    for i in range(RATINGS_PER_WRITER):
+        services.ratings.update_average_rating(PRO_EMAIL.upper() if i % 2 else PRO_EMAIL, 5.0, True)
+    for job in range(CONTESTED_JOBS):
+        services.quotes.accept_quote(f"contested{job}", worker_pro(worker))
+
+def run_writers(backend, tmp_dir):
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    start = context.Event()
+    processes = [context.Process(target=writer, args=(backend, tmp_dir, worker, start))
+                 for worker in range(WRITERS)]
+    for process in processes:
+        process.start()
+    start.set()
+    for process in processes:
+        process.join(timeout=300)
+        assert process.exitcode == 0
+
+def assert_nothing_lost(store):
+    jobs = store.load('jobs')
+    posted = {job['description']: job for job in jobs.values() if not job['id'].startswith('contested')}
+    assert len(posted) == WRITERS * LOGINS_PER_WRITER * JOBS_PER_LOGIN
+    assert set(posted) == {f"job {worker}-{i}-{j}" for worker in range(WRITERS)
+                           for i in range(LOGINS_PER_WRITER) for j in range(JOBS_PER_LOGIN)}
+    # Each job belongs to the session's user, by normalized email
+    for description, job in posted.items():
+        worker, i, _ = description.split(' ')[1].split('-')
+        assert job['client'] == normalize_email(user_email(worker, i))
+
+    users = store.load('users')
+    assert len(users) == WRITERS * LOGINS_PER_WRITER + SHARED_ACCOUNTS
+    for i in range(SHARED_ACCOUNTS):
+        user = users[f"shared{i}@example.com"]
+        assert user['name'].startswith('Writer ')
+        if i < SEEDED_ACCOUNTS:
+            # A login updates the account's details and keeps the rest
+            assert user['created'] == 'seeded'
+            assert (user['rating'], user['rating_count'], user['lat']) == (4.5, 2, -1.29)
+
+    pro = store.get('professionals', PRO_EMAIL)
+    assert pro['rating_count'] == WRITERS * RATINGS_PER_WRITER
+    assert pro['rating'] == 5.0
+
+    # Every contested job went to exactly one professional, whose quote
+    # alone is accepted
+    for job in range(CONTESTED_JOBS):
+        assigned = jobs[f"contested{job}"]
+        assert assigned['status'] == 'Assigned'
+        quotes = store.find('quotes', job_id=f"contested{job}")
+        accepted = [quote['professional'] for quote in quotes.values() if quote['status'] == 'Accepted']
+        assert accepted == [assigned['assigned_to']]
+        assert sum(quote['status'] == 'Rejected' for quote in quotes.values()) == WRITERS - 1
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_parallel_writers_lose_nothing(backend, tmp_path):
+    tmp_dir = str(tmp_path)
+    seed(open_store(backend, tmp_dir))
+    run_writers(backend, tmp_dir)
+    # A fresh store reads everything back from disk
+    assert_nothing_lost(open_store(backend, tmp_dir))
+
+def test_compaction_keeps_every_record(tmp_path):
+    tmp_dir = str(tmp_path)
+    seed(open_store('json', tmp_dir))
+    run_writers('json', tmp_dir)
+
+    store = open_store('json', tmp_dir)
+    store.compact_file(store.path('jobs'))
+    with open(log_path_for(store.path('jobs'))) as f:
+        assert f.read() == ''
+    assert_nothing_lost(open_store('json', tmp_dir))
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from hirewise_services import HireWiseServices
+from hirewise_store import DATA_FILES, HireWiseStore
+
+@pytest.fixture(params=['json', 'sqlite'])
+def store(request, tmp_path):
+    files = {name: os.path.join(str(tmp_path), filename) for name, filename in DATA_FILES.items()}
+    if request.param == 'sqlite':
+        from hirewise_sqlite import HireWiseSQLStore
+        store = HireWiseSQLStore(f"sqlite:///{tmp_path / 'hirewise.db'}", files)
+    else:
+        store = HireWiseStore(files)
+    store.ensure_files()
+    return store
+
+def test_get_by_emails_matches_get_by_email(store):
+    store.put('users', 'ann@example.com', {'name': 'Ann', 'email': 'ann@example.com'})
+    store.put('users', 'Bob@Example.com', {'name': 'Bob', 'email': 'Bob@Example.com'})
+    # Duplicates from before dedup_emails(); the exact key wins
+    store.put('users', 'bob@example.com', {'name': 'bob', 'email': 'bob@example.com'})
+    emails = ['ann@example.com', ' ANN@example.com ', 'Bob@Example.com', 'bob@example.com', 'nobody@example.com', '']
+    found = store.get_by_emails('users', emails)
+    assert set(found) == set(emails) - {'nobody@example.com', ''}
+    for email in emails:
+        assert found.get(email, (None, None)) == store.get_by_email('users', email)
+    assert found['bob@example.com'][1]['name'] == 'bob'
+
+def test_get_many(store):
+    for job_id in ('a', 'b', 'c'):
+        store.put('jobs', job_id, {'id': job_id, 'status': 'Open'})
+    assert store.get_many('jobs', ['a', 'c', 'a', 'missing']) == {
+        'a': {'id': 'a', 'status': 'Open'}, 'c': {'id': 'c', 'status': 'Open'}}
+    assert store.get_many('jobs', []) == {}
+
+def test_joins_use_each_client_record(store):
+    services = HireWiseServices(store)
+    store.put('users', 'client@example.com', {'name': 'Client', 'email': 'client@example.com'})
+    with_client, _ = services.jobs.post_job('client@example.com', 'Plumber', 'Fix a tap', '50-100')
+    without_client, _ = services.jobs.post_job('gone@example.com', 'Plumber', 'Fix a pipe', '50-100')
+    services.quotes.send_quote(with_client, 'pro@example.com', '80', 'On it', 'Today')
+    services.quotes.send_quote(without_client, 'pro@example.com', '90', 'On it', 'Today')
+
+    clients = {job_id: client for job_id, _, client in services.jobs.available_jobs()}
+    assert clients == {with_client: store.get('users', 'client@example.com'), without_client: {}}
+    rows = services.quotes.professional_quotes('pro@example.com')
+    assert {quote['job_id']: (job['description'], client.get('name')) for _, quote, job, client in rows} == {
+        with_client: ('Fix a tap', 'Client'), without_client: ('Fix a pipe', None)}